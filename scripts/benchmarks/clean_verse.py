@@ -0,0 +1,109 @@
+"""
+Compare the check_migration text normalization on the Yuttadhammo verses: the previous
+chain of `str.replace` calls, single `str.translate` pass, the compiled normalizer and
+its batch API.
+
+Usage:
+    python scripts/benchmarks/clean_verse.py -c sutta_processor_config.yaml
+    python scripts/benchmarks/clean_verse.py -c sutta_processor_config.yaml -r 5
+
+Every variant has to give the same result as the previous chain.
+"""
+import argparse
+import time
+
+from sutta_processor.application.use_cases.check_migration import (
+    MIGRATION_PROFILE,
+    clean_verse,
+    clean_verses,
+)
+from sutta_processor.shared.config import Config
+
+
+def chained_clean_verse(verse):
+    verse = (
+        verse.rstrip()
+        .lower()
+        .replace("—", " ")
+        .replace(":", " ")
+        .replace("…", " ")
+        .replace(".", " ")
+        .replace("(", " ")
+        .replace(")", " ")
+        .replace("ṅ", "ṁ")
+        .replace("“", " ")
+        .replace("”", " ")
+        .replace("–", " ")
+        .replace("-", " ")
+        .replace("?", " ")
+        .replace(",", " ")
+        .replace(";", " ")
+        .replace("0", " ")
+        .replace("1", " ")
+        .replace("2", " ")
+        .replace("3", " ")
+        .replace("4", " ")
+        .replace("5", " ")
+        .replace("6", " ")
+        .replace("7", " ")
+        .replace("8", " ")
+        .replace("9", " ")
+        .replace("☑", " ")
+        .replace("๐", " ")
+        .replace("×", " ")
+        .replace("☒", " ")
+        .replace("*", "")
+        .replace("|", " ")
+        .replace("#", " ")
+        .replace("[", " ")
+        .replace("]", " ")
+        .replace("»", "")
+        .replace("«", "")
+        .replace("’", "")
+        .replace("‘", "")
+    )
+    return " ".join(verse.split())
+
+
+TRANSLATE_TABLE = str.maketrans(dict(MIGRATION_PROFILE.compile().steps))
+
+
+def translated_clean_verse(verse):
+    return " ".join(verse.lower().translate(TRANSLATE_TABLE).split())
+
+
+VARIANTS = {
+    "chained replace": lambda verses: [chained_clean_verse(v) for v in verses],
+    "str.translate": lambda verses: [translated_clean_verse(v) for v in verses],
+    "clean_verse": lambda verses: [clean_verse(v) for v in verses],
+    "clean_verses": clean_verses,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-c", "--config", required=True)
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    cfg = Config.from_yaml(f_pth=args.config)
+    verses = [verses.verse for verses in cfg.repo.yutta.get_aggregate().index.values()]
+    expected = VARIANTS["chained replace"](verses)
+    print(f"verses: {len(verses)}, distinct: {len(set(verses))}")
+    print(f"{'variant':<16} {'best s':>8} {'us/verse':>9} {'speedup':>8}")
+    base = None
+    for name, variant in VARIANTS.items():
+        if variant(verses) != expected:
+            raise RuntimeError(f"'{name}' gives different result than the chained replace")
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            variant(verses)
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        base = base or best
+        print(f"{name:<16} {best:>8.3f} {best / len(verses) * 1e6:>9.2f} {base / best:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
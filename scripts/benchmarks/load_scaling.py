@@ -0,0 +1,86 @@
+"""
+Measure how loading of the bilara-data aggregates scales with the number of workers.
+
+Usage:
+    python scripts/benchmarks/load_scaling.py -c sutta_processor_config.yaml
+    python scripts/benchmarks/load_scaling.py -c sutta_processor_config.yaml -w 1 2 4 8 -t root html
+
+Every run is compared with the single process load, so the benchmark fails loudly
+if the parallel load gives different index order or different ok/error counters.
+"""
+import argparse
+import time
+
+from sutta_processor.application.domain_models import (
+    BilaraCommentAggregate,
+    BilaraHtmlAggregate,
+    BilaraReferenceAggregate,
+    BilaraRootAggregate,
+    BilaraTranslationAggregate,
+    BilaraVariantAggregate,
+)
+from sutta_processor.application.domain_models.loader import FileAggregateLoader
+from sutta_processor.shared.config import Config
+
+TREES = {
+    "root": (BilaraRootAggregate, "bilara_root_path"),
+    "html": (BilaraHtmlAggregate, "bilara_html_path"),
+    "comment": (BilaraCommentAggregate, "bilara_comment_path"),
+    "variant": (BilaraVariantAggregate, "bilara_variant_path"),
+    "translation": (BilaraTranslationAggregate, "bilara_translation_path"),
+    "reference": (BilaraReferenceAggregate, "reference_root_path"),
+}
+
+
+def load(cfg: Config, tree: str, workers: int):
+    aggregate_cls, path_attr = TREES[tree]
+    kwargs = {
+        "exclude_dirs": cfg.exclude_dirs,
+        "root_pth": getattr(cfg, path_attr),
+        "loader": FileAggregateLoader(workers=workers),
+    }
+    if aggregate_cls is BilaraRootAggregate:
+        kwargs["root_langs"] = cfg.bilara_root_langs
+    start = time.perf_counter()
+    aggregate = aggregate_cls.from_path(**kwargs)
+    return aggregate, time.perf_counter() - start
+
+
+def get_signature(aggregate) -> tuple:
+    index = aggregate.index
+    if isinstance(aggregate, BilaraTranslationAggregate):
+        keys = tuple((lang, tuple(lang_index)) for lang, lang_index in index.items())
+    else:
+        keys = tuple(index)
+    files = tuple(str(f.f_pth) for f in aggregate.file_aggregates)
+    return keys, files
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-c", "--config", required=True)
+    parser.add_argument("-w", "--workers", type=int, nargs="*", default=[1, 2, 4, 8])
+    parser.add_argument("-t", "--trees", nargs="*", default=list(TREES), choices=list(TREES))
+    args = parser.parse_args()
+
+    cfg = Config.from_yaml(f_pth=args.config)
+    rows = []
+    for tree in args.trees:
+        baseline, base_time = load(cfg=cfg, tree=tree, workers=1)
+        base_signature = get_signature(baseline)
+        for workers in args.workers:
+            if workers == 1:
+                elapsed = base_time
+            else:
+                aggregate, elapsed = load(cfg=cfg, tree=tree, workers=workers)
+                if get_signature(aggregate) != base_signature:
+                    raise RuntimeError(f"[{tree}] Different result with '{workers}' workers")
+            rows.append((tree, workers, elapsed, base_time / elapsed if elapsed else 0))
+
+    print(f"{'tree':<12} {'workers':>7} {'seconds':>9} {'speedup':>8}")
+    for tree, workers, elapsed, speedup in rows:
+        print(f"{tree:<12} {workers:>7} {elapsed:>9.2f} {speedup:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
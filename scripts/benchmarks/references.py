@@ -0,0 +1,101 @@
+"""
+Compare classification of the reference parts: the previous way of trying every id
+constructor and catching the errors against the prefix table of `ReferenceParser`.
+
+Usage:
+    python scripts/benchmarks/references.py -c sutta_processor_config.yaml
+    python scripts/benchmarks/references.py -p bilara-data/reference -r 5
+
+Both ways have to give the same type for every part.
+"""
+import argparse
+import json
+import time
+from collections import Counter
+from pathlib import Path
+
+from sutta_processor.application.value_objects import (
+    BaseUID,
+    MsId,
+    Nya,
+    PtsCs,
+    PtsPli,
+    ReferenceParser,
+    ScID,
+)
+from sutta_processor.shared.exceptions import (
+    MsIdError,
+    NyaError,
+    PtsCsError,
+    PtsPliError,
+    ScIdError,
+)
+
+ERRORS = {ScID: ScIdError, PtsPli: PtsPliError, PtsCs: PtsCsError, Nya: NyaError, MsId: MsIdError}
+
+
+def tried_parts(reference: str) -> list:
+    parts = []
+    for part in reference.split(","):
+        part = BaseUID(part.strip())
+        if not part:
+            continue
+        for id_class, error in ERRORS.items():
+            try:
+                part = id_class(part)
+            except error:
+                pass
+        parts.append(part)
+    return parts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("-c", "--config", help="Take reference_root_path from the config")
+    group.add_argument("-p", "--path", type=Path, help="Directory with the reference files")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="Best of that many runs")
+    args = parser.parse_args()
+
+    if args.path:
+        root_pth = args.path
+    else:
+        from sutta_processor.shared.config import Config
+
+        root_pth = Config.from_yaml(f_pth=args.config).reference_root_path
+    references = []
+    for f_pth in sorted(Path(root_pth).glob("**/*.json")):
+        with open(f_pth) as f:
+            references.extend(json.load(f).values())
+    parts_count = sum(reference.count(",") + 1 for reference in references)
+    print(f"segments: {len(references)}, parts: {parts_count}")
+
+    timings = {}
+    for name, parse in (
+        ("try constructors", tried_parts),
+        ("prefix table", lambda reference: ReferenceParser.parse(reference).parts),
+    ):
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            results = [parse(reference) for reference in references]
+            best = min(best, time.perf_counter() - start)
+        timings[name] = (best, results)
+
+    (tried_time, expected), (table_time, parsed) = timings.values()
+    for expected_parts, parts in zip(expected, parsed):
+        if [(type(p), p) for p in expected_parts] != [(type(p), p) for p in parts]:
+            raise RuntimeError(f"Different parts: {expected_parts} vs {parts}")
+
+    unrecognized = Counter()
+    for reference in references:
+        for part in ReferenceParser.parse(reference).unrecognized:
+            unrecognized[part.reference_root] += 1
+    for name, (elapsed, _) in timings.items():
+        print(f"{name:<16} {elapsed:>8.3f}s")
+    print(f"speedup: {tried_time / table_time:.1f}x")
+    print(f"unrecognized parts: {dict(unrecognized.most_common())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,419 @@
+"""
+Write a synthetic bilara-data tree to benchmark the use cases on a corpus of any size.
+
+Usage:
+    python scripts/benchmarks/synthetic_corpus.py -o /tmp/corpus
+    python scripts/benchmarks/synthetic_corpus.py -o /tmp/corpus -s 10 -l 4 -m 0.05
+
+Writes root, html, comment, variant, translation (in `--languages` languages) and
+reference trees to `<out>/bilara-data`, the Yuttadhammo html the root text is compared
+with to `<out>/ms_yuttadhammo`, and a config with empty false positives to run the use
+cases from `<out>`. Generated trees (and the cache of the previous run) are removed
+first.
+
+Suttas have headers at ':0.x', sections baked into ranges ('mn13:23-28.6'), file
+ranges ('an1.1-10') and three level vinaya ids. Scale 1 gives about 600 suttas and
+23k root segments, everything grows linearly with the scale. The same seed and scale
+always give the same files.
+
+A `--mistakes` fraction of the suttas gets one of the mistakes the checks look for,
+so the reporting is measured too. They are counted in `<out>/manifest.json`.
+"""
+import argparse
+import json
+import random
+import shutil
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+import attr
+from ruamel import yaml
+
+from sutta_processor.shared.config import ExcludeRepo
+
+PALI_WORDS = (
+    "evaṁ me sutaṁ ekaṁ samayaṁ bhagavā sāvatthiyaṁ viharati jetavane anāthapiṇḍikassa "
+    "ārāme tatra kho bhikkhū āmantesi bhikkhavo bhadante te paccassosuṁ etadavoca dhammaṁ "
+    "vo desessāmi taṁ suṇātha sādhukaṁ manasi karotha bhāsissāmi rūpaṁ vedanā saññā "
+    "saṅkhārā viññāṇaṁ aniccaṁ dukkhaṁ anattā cittaṁ samādhi paññā sīlaṁ nibbānaṁ maggo "
+    "ariyo aṭṭhaṅgiko sammādiṭṭhi pajānāti passati hoti natthi atthi yathābhūtaṁ kāyo loko "
+    "pathavī āpo tejo vāyo ca na pi api yo so idha"
+).split()
+TRANSLATED_WORDS = (
+    "so I have heard at one time the Buddha was staying near in monastery there he "
+    "addressed mendicants they replied teach you this listen and pay attention speak form "
+    "feeling perception choices consciousness impermanent suffering not-self mind "
+    "immersion wisdom ethics extinguishment path noble eightfold right view understands "
+    "sees is there body world earth water fire air and not also who that here"
+).split()
+TITLES = "Mūlapariyāya Sabbāsava Dhammadāyāda Bhayabherava Anaṅgaṇa Vattha Sallekha".split()
+# Languages the translation aggregate knows
+LANGUAGES = (
+    ("en", "sujato"),
+    ("de", "sabbamitta"),
+    ("pt", "laera-quaresma"),
+    ("id", "anggara"),
+    ("jpn", "kaz"),
+    ("vi", "minhchau"),
+    ("pl", "hardao"),
+    ("cs", "vaclav"),
+    ("my", "tinmyint"),
+)
+MISTAKES = (
+    "missing_html",
+    "header_without_0",
+    "unordered_segments",
+    "empty_verse",
+    "surplus_comment",
+    "surplus_translation",
+    "unknown_variant",
+    "wrong_variant",
+    "duplicated_reference",
+    "nya_not_aligned",
+    "migration_difference",
+)
+
+
+def is_baked(uid: str) -> bool:
+    return "-" in uid.split(":")[1]
+
+
+@attr.s(frozen=True, auto_attribs=True)
+class Collection:
+    name: str
+    title: str
+    # Directory under the tree, eg. 'sutta/mn'
+    directory: str
+    # Book of the Yuttadhammo ms ids, eg. 'ms2M3_1'
+    ms_book: str
+    # Number of suttas (or groups of them) at scale 1
+    count: int
+    sections: Tuple[int, int]
+    segments: Tuple[int, int]
+    # Suttas in a group: 'sn3.12' is the 12th sutta of the 3rd group
+    group_size: int = 0
+    # Fraction of the suttas that are a file range, eg. 'an1.1-10'
+    file_ranges: float = 0.0
+    # Fraction of the sections that are baked into a range, eg. 'mn13:23-28.6'
+    baked_sections: float = 0.0
+    # Paragraphs in a section, for the three level ids 'pli-tv-bu-vb-pj1:1.2.3'
+    paragraphs: Tuple[int, int] = (0, 0)
+    # Nya reference at the start of every section, it has to be equal to the section
+    nya: bool = False
+
+
+COLLECTIONS = (
+    Collection("dn", "Dīgha Nikāya", "sutta/dn", "1D", 34, (8, 30), (3, 12), baked_sections=0.05),
+    Collection("mn", "Majjhima Nikāya", "sutta/mn", "2M", 152, (5, 25), (2, 10), baked_sections=0.05),
+    Collection("sn", "Saṁyutta Nikāya", "sutta/sn", "3S", 20, (1, 4), (2, 8), group_size=12, nya=True),
+    Collection("an", "Aṅguttara Nikāya", "sutta/an", "4A", 11, (1, 5), (2, 6), group_size=20, file_ranges=0.2),
+    Collection(
+        "pli-tv-bu-vb-pj",
+        "Vinaya Piṭaka",
+        "vinaya/pli-tv-bu-vb/pli-tv-bu-vb-pj",
+        "1V",
+        20,
+        (2, 8),
+        (2, 6),
+        paragraphs=(1, 4),
+    ),
+)
+
+
+@attr.s(auto_attribs=True)
+class Sutta:
+    key: str
+    directory: str
+    ms_book: str
+    # Segments of the Yuttadhammo paragraphs, in the file order
+    paragraphs: List[List[str]] = attr.ib(factory=list)
+    root: Dict[str, str] = attr.ib(factory=dict)
+    html: Dict[str, str] = attr.ib(factory=dict)
+    comment: Dict[str, str] = attr.ib(factory=dict)
+    variant: Dict[str, str] = attr.ib(factory=dict)
+    reference: Dict[str, str] = attr.ib(factory=dict)
+    # {(lang, author): {uid: verse}}
+    translation: Dict[Tuple[str, str], Dict[str, str]] = attr.ib(factory=dict)
+    # {ms id: verse}
+    yutta: Dict[str, str] = attr.ib(factory=dict)
+
+    @property
+    def body_uids(self) -> List[str]:
+        return [uid for segments in self.paragraphs for uid in segments]
+
+
+class CorpusGenerator:
+    def __init__(self, scale: int = 1, languages: int = 2, mistakes: float = 0.02, seed: int = 0):
+        self.scale = scale
+        self.languages = LANGUAGES[: max(1, languages)]
+        self.mistakes = mistakes
+        self.rng = random.Random(seed)
+        self.mistakes_count = Counter()
+        # Volume and page of the next PTS reference, by collection
+        self.pts_pages: Dict[str, List[int]] = {}
+
+    def get_sentence(self, words=PALI_WORDS) -> str:
+        sentence = " ".join(self.rng.choices(words, k=self.rng.randint(3, 12)))
+        return f"{sentence[0].upper()}{sentence[1:]}{self.rng.choice('..,;?')} "
+
+    def get_keys(self, collection: Collection) -> List[str]:
+        count = collection.count * self.scale
+        if not collection.group_size:
+            return [f"{collection.name}{n}" for n in range(1, count + 1)]
+        keys = []
+        for group in range(1, count + 1):
+            n = 1
+            while n <= collection.group_size:
+                if self.rng.random() < collection.file_ranges:
+                    end = n + self.rng.randint(1, 9)
+                    keys.append(f"{collection.name}{group}.{n}-{end}")
+                    n = end + 1
+                else:
+                    keys.append(f"{collection.name}{group}.{n}")
+                    n += 1
+        return keys
+
+    def iter_suttas(self) -> Iterator[Sutta]:
+        """Suttas one by one, so only one is kept in memory at any scale."""
+        for collection in COLLECTIONS:
+            for number, key in enumerate(self.get_keys(collection=collection), start=1):
+                sutta = self.get_sutta(collection=collection, key=key, number=number)
+                if self.rng.random() < self.mistakes:
+                    self.add_mistake(sutta=sutta)
+                yield sutta
+
+    def get_section_ids(self, collection: Collection) -> List[str]:
+        """'1', '2', '3-5', '6', ..."""
+        ids = []
+        section, last = 1, self.rng.randint(*collection.sections)
+        while section <= last:
+            if self.rng.random() < collection.baked_sections:
+                end = section + self.rng.randint(1, 5)
+                ids.append(f"{section}-{end}")
+                section = end + 1
+            else:
+                ids.append(str(section))
+                section += 1
+        return ids
+
+    def get_sutta(self, collection: Collection, key: str, number: int) -> Sutta:
+        sutta = Sutta(key=key, directory=collection.directory, ms_book=f"{collection.ms_book}{number}")
+        title = f"{self.rng.choice(TITLES)}sutta"
+        sutta.root[f"{key}:0.1"] = f"{collection.title} {number} "
+        sutta.root[f"{key}:0.2"] = f"{number}. {title} "
+        sutta.html[f"{key}:0.1"] = f"<article id='{key}'><header><ul><li class='division'>{{}}</li></ul>"
+        sutta.html[f"{key}:0.2"] = "<h1 class='sutta-title'>{}</h1></header>"
+
+        for section in self.get_section_ids(collection=collection):
+            if collection.paragraphs[1]:
+                paragraphs = self.rng.randint(*collection.paragraphs)
+                prefixes = [f"{section}.{p}" for p in range(1, paragraphs + 1)]
+            else:
+                prefixes = [section]
+            for prefix in prefixes:
+                count = self.rng.randint(*collection.segments)
+                sutta.paragraphs.append([f"{key}:{prefix}.{n}" for n in range(1, count + 1)])
+
+        is_verse = False
+        for paragraph_no, segments in enumerate(sutta.paragraphs, start=1):
+            is_verse = not is_verse and self.rng.random() < 0.1
+            opening, line_end, closing = ("<p>", "", "</p>")
+            if is_verse:
+                opening, line_end, closing = ("<blockquote class='gatha'><p>", "<br>", "</p></blockquote>")
+            for uid in segments:
+                sutta.root[uid] = self.get_sentence()
+                sutta.html[uid] = "{}" + line_end
+            sutta.html[segments[0]] = opening + sutta.html[segments[0]]
+            sutta.html[segments[-1]] = "{}" + closing
+
+            ms_id = f"ms{sutta.ms_book}_{paragraph_no}"
+            sutta.yutta[ms_id] = "".join(sutta.root[uid] for uid in segments).strip()
+            references = [f"sc{paragraph_no}"]
+            if collection.nya:
+                references.append(f"nya{segments[0].split(':')[1].split('.')[0]}")
+            sutta.reference[segments[0]] = ", ".join(references + [ms_id])
+            self.add_pts_references(sutta=sutta, collection=collection, segments=segments)
+        sutta.html[uid] += "</article>"
+
+        for uid in sutta.body_uids:
+            if is_baked(uid=uid):
+                # Sequence check can't follow gaps around baked sections, in the real
+                # comment and variant files they are listed as false positives
+                continue
+            if self.rng.random() < 0.05:
+                sutta.comment[uid] = self.get_sentence(words=TRANSLATED_WORDS).strip()
+            if self.rng.random() < 0.04:
+                word = self.rng.choice(sutta.root[uid].split()).strip(".,;?").lower()
+                sutta.variant[uid] = f"{word} → {word}ṁ (bj, pts1ed)"
+        for n, language in enumerate(self.languages):
+            # Only the first language is translated fully
+            if n and self.rng.random() < 0.4:
+                continue
+            sutta.translation[language] = {
+                uid: self.get_sentence(words=TRANSLATED_WORDS) for uid in sutta.root
+            }
+        return sutta
+
+    def add_pts_references(self, sutta: Sutta, collection: Collection, segments: List[str]):
+        volume, page = self.pts_pages.setdefault(collection.name, [1, 1])
+        for uid in segments:
+            if self.rng.random() < 0.15:
+                page += 1
+                if page > 400:
+                    volume, page = volume + 1, 1
+                reference = sutta.reference.get(uid)
+                pts = f"pts-vp-pli{volume}.{page}"
+                sutta.reference[uid] = f"{reference}, {pts}" if reference else pts
+        self.pts_pages[collection.name] = [volume, page]
+
+    def add_mistake(self, sutta: Sutta):
+        mistake = self.rng.choice(MISTAKES)
+        self.mistakes_count[mistake] += 1
+        uids = [uid for uid in sutta.body_uids if not is_baked(uid=uid)] or sutta.body_uids
+        uid = self.rng.choice(uids)
+        surplus_uid = f"{sutta.key}:999.1"
+        if mistake == "missing_html":
+            del sutta.html[uid]
+        elif mistake == "header_without_0":
+            sutta.html[uid] = "<h2>{}</h2>"
+        elif mistake == "unordered_segments":
+            items = list(sutta.root.items())
+            i = self.rng.randrange(2, len(items) - 1)
+            items[i], items[i + 1] = items[i + 1], items[i]
+            sutta.root = dict(items)
+        elif mistake == "empty_verse":
+            sutta.root[uid] = " "
+        elif mistake == "surplus_comment":
+            sutta.comment[surplus_uid] = "Comment of a segment that is not in the root."
+        elif mistake == "surplus_translation":
+            for translation in sutta.translation.values():
+                translation[surplus_uid] = "Segment that is not in the root. "
+        elif mistake == "unknown_variant":
+            sutta.variant[uid] = "variant without the arrow"
+        elif mistake == "wrong_variant":
+            sutta.variant[uid] = "xyzzy → xyzzī (bj)"
+        elif mistake == "duplicated_reference":
+            for duplicated_uid in (uid, self.rng.choice(uids)):
+                reference = sutta.reference.get(duplicated_uid)
+                pts = "pts-vp-pli999.1"
+                sutta.reference[duplicated_uid] = f"{reference}, {pts}" if reference else pts
+        elif mistake == "nya_not_aligned":
+            reference = sutta.reference.get(uid)
+            sutta.reference[uid] = f"{reference}, nya999" if reference else "nya999"
+        elif mistake == "migration_difference":
+            ms_id = self.rng.choice(list(sutta.yutta))
+            sutta.yutta[ms_id] = f"{sutta.yutta[ms_id]} {self.rng.choice(PALI_WORDS)}"
+        # New segments go where they belong, not at the end of the file
+        for name in ("variant", "reference"):
+            index = getattr(sutta, name)
+            setattr(sutta, name, {uid: index[uid] for uid in sutta.root if uid in index})
+
+
+def write_json(f_pth: Path, data: dict):
+    f_pth.parent.mkdir(parents=True, exist_ok=True)
+    with open(f_pth, "w") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def write_yutta_html(f_pth: Path, sutta: Sutta):
+    """Same structure as the converted Yuttadhammo files, one paragraph per div.q"""
+    lines = ["<html>", f'<div class="i">{sutta.ms_book} {sutta.key}</div>']
+    for paragraph_no, (ms_id, verse) in enumerate(sutta.yutta.items(), start=1):
+        xml_id = f"p_{ms_id[2:]}"
+        lines.append(f'<div class="q" id="{xml_id}"> <div class="p">')
+        lines.append(f'<span class="pN">{paragraph_no}</span>{verse} </div>\n</div>')
+    lines.append("</html>")
+    f_pth.parent.mkdir(parents=True, exist_ok=True)
+    f_pth.write_text("\n".join(lines))
+
+
+def write_config(out: Path):
+    config = {
+        "bilara_root_path": "./bilara-data/root/",
+        "bilara_root_langs": ["pli/ms/"],
+        "bilara_html_path": "./bilara-data/html",
+        "bilara_comment_path": "./bilara-data/comment",
+        "bilara_variant_path": "./bilara-data/variant",
+        "bilara_translation_path": "./bilara-data/translation",
+        "reference_root_path": "./bilara-data/reference/pli/ms",
+        "ms_yuttadhammo_path": "./ms_yuttadhammo",
+        "exclude_dirs": ["name", "xplayground", "vri", "site", "blurb"],
+        "exclude_filepath": "./false_positives.yaml",
+        "yutta_corpus_path": "./.cache/yutta_corpus.bin",
+        "migration_differences_path": "./bilara-data/migration_differences",
+        "cache_dir": "./.cache",
+        "debug_dir": "./debug",
+        "log_level": 20,
+    }
+    with open(out / "sutta_processor_config.yaml", "w") as f:
+        yaml.safe_dump(config, f, default_flow_style=False)
+    with open(out / "false_positives.yaml", "w") as f:
+        yaml.safe_dump({field.name: [] for field in attr.fields(ExcludeRepo)}, f, default_flow_style=False)
+
+
+def write_corpus(out: Path, suttas: Iterator[Sutta]) -> Counter:
+    bilara = out / "bilara-data"
+    counts = Counter()
+    for sutta in suttas:
+        trees = {
+            "root/pli/ms": ("root-pli-ms", sutta.root),
+            "html/pli/ms": ("html", sutta.html),
+            "comment/en/sujato": ("comment-en-sujato", sutta.comment),
+            "variant/pli/ms": ("variant-pli-ms", sutta.variant),
+            "reference/pli/ms": ("reference", sutta.reference),
+        }
+        for (lang, author), translation in sutta.translation.items():
+            trees[f"translation/{lang}/{author}"] = (f"translation-{lang}-{author}", translation)
+        for tree_dir, (suffix, data) in trees.items():
+            if not data:
+                continue
+            f_pth = bilara / tree_dir / sutta.directory / f"{sutta.key}_{suffix}.json"
+            write_json(f_pth=f_pth, data=data)
+            tree = tree_dir.split("/")[0]
+            counts[f"{tree}_files"] += 1
+            counts[f"{tree}_segments"] += len(data)
+        write_yutta_html(f_pth=out / "ms_yuttadhammo/html" / sutta.directory / f"{sutta.key}.html", sutta=sutta)
+        counts["suttas"] += 1
+        counts["yutta_files"] += 1
+        counts["yutta_verses"] += len(sutta.yutta)
+    return counts
+
+
+def generate(out: Path, scale: int = 1, languages: int = 2, mistakes: float = 0.02, seed: int = 0) -> dict:
+    out = Path(out)
+    for name in ("bilara-data", "ms_yuttadhammo", ".cache", "debug"):
+        shutil.rmtree(out / name, ignore_errors=True)
+    out.mkdir(parents=True, exist_ok=True)
+
+    generator = CorpusGenerator(scale=scale, languages=languages, mistakes=mistakes, seed=seed)
+    counts = write_corpus(out=out, suttas=generator.iter_suttas())
+    write_config(out=out)
+    manifest = {
+        "arguments": {"scale": scale, "languages": languages, "mistakes": mistakes, "seed": seed},
+        "translations": [f"{lang}/{author}" for lang, author in generator.languages],
+        **dict(sorted(counts.items())),
+        "mistakes": dict(sorted(generator.mistakes_count.items())),
+    }
+    write_json(f_pth=out / "manifest.json", data=manifest)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-o", "--out", type=Path, required=True, help="Directory of the corpus")
+    parser.add_argument("-s", "--scale", type=int, default=1, help="1, 10, 50, ...")
+    parser.add_argument("-l", "--languages", type=int, default=2, help=f"Up to {len(LANGUAGES)}")
+    parser.add_argument("-m", "--mistakes", type=float, default=0.02, help="Fraction of the suttas")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    manifest = generate(
+        out=args.out, scale=args.scale, languages=args.languages, mistakes=args.mistakes, seed=args.seed
+    )
+    print(json.dumps(manifest, ensure_ascii=False, indent=2))
+    print(f"Run from '{args.out}': sutta-processor -e run_all_checks -c sutta_processor_config.yaml")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Run every use case of `use_cases.__all__` on synthetic corpora of growing scale, and
+report the time and memory of every run.
+
+Usage:
+    python scripts/benchmarks/use_cases.py -o /tmp/corpora
+    python scripts/benchmarks/use_cases.py -o /tmp/corpora -s 1 10 50 -u run_all_checks check_migration
+    python scripts/benchmarks/use_cases.py -o /tmp/corpora -s 1 10 --warm -r 3
+
+Corpora are written by `synthetic_corpus.py` to `<out>/scale<N>`, and reused while the
+manifest matches the arguments. Every use case runs in its own process from the corpus
+directory, so the loaded data of one run doesn't make the next one faster. The cache
+(parsed files, compiled Yuttadhammo corpus, check_migration results) is removed before
+every run, with `--warm` it's kept after one run that is not measured.
+
+Use cases that write to the corpus run on a copy of it. check_all_changes gets all
+the files of the first `--changed` suttas. The synthetic corpus has no Yuttadhammo xml,
+so convert_yutta_html only finds there is nothing to convert.
+
+Max RSS is the peak resident memory that `wait4` gives for the use case process. Results
+are printed and saved to `<out>/use_cases.json`, run logs go to `<corpus>/benchmark`.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+from synthetic_corpus import generate
+
+from sutta_processor.application import use_cases
+
+CONFIG_FILENAME = "sutta_processor_config.yaml"
+# They save the files they fix
+WRITERS = ("renumber_uids",)
+TREES = ("root", "html", "comment", "variant", "translation", "reference")
+
+
+def get_corpus(out: Path, scale: int, args: argparse.Namespace) -> Path:
+    corpus_pth = out / f"scale{scale}"
+    arguments = {"scale": scale, "languages": args.languages, "mistakes": args.mistakes, "seed": args.seed}
+    try:
+        with open(corpus_pth / "manifest.json") as f:
+            is_generated = json.load(f).get("arguments") == arguments
+    except (OSError, ValueError):
+        is_generated = False
+    if not is_generated:
+        start = time.perf_counter()
+        generate(out=corpus_pth, **arguments)
+        print(f"Generated '{corpus_pth}' in {time.perf_counter() - start:.1f}s")
+    return corpus_pth
+
+
+def get_changed_files(corpus_pth: Path, suttas: int) -> List[str]:
+    """All files of the first suttas, relative to bilara-data as in a commit."""
+    bilara_pth = corpus_pth / "bilara-data"
+    root_files = sorted((bilara_pth / "root").glob("**/*.json"))[:suttas]
+    prefixes = tuple(f"{f_pth.name.split('_')[0]}_" for f_pth in root_files)
+    changed = []
+    for tree in TREES:
+        for f_pth in sorted((bilara_pth / tree).glob("**/*.json")):
+            if f_pth.name.startswith(prefixes):
+                changed.append(str(f_pth.relative_to(bilara_pth)))
+    return changed
+
+
+def run_use_case(corpus_pth: Path, name: str, files: List[str]) -> dict:
+    cmd = [sys.executable, "-m", "sutta_processor.run_app", "-c", CONFIG_FILENAME, "-e", name]
+    if files:
+        cmd += ["-f", *files]
+    log_pth = corpus_pth / "benchmark" / f"{name}.log"
+    log_pth.parent.mkdir(exist_ok=True)
+    with open(log_pth, "w") as log_file:
+        start = time.perf_counter()
+        process = subprocess.Popen(cmd, cwd=corpus_pth, stdout=log_file, stderr=subprocess.STDOUT)
+        _, status, rusage = os.wait4(process.pid, 0)
+        wall = time.perf_counter() - start
+    # Reaped by wait4 already, so Popen doesn't wait for it again
+    process.returncode = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+    return {
+        "exit": process.returncode,
+        "wall_s": round(wall, 3),
+        "cpu_s": round(rusage.ru_utime + rusage.ru_stime, 3),
+        # Kilobytes on Linux
+        "max_rss_mib": round(rusage.ru_maxrss / 1024, 1),
+    }
+
+
+def benchmark(corpus_pth: Path, name: str, args: argparse.Namespace) -> dict:
+    if name in WRITERS:
+        run_pth = corpus_pth.with_name(f"{corpus_pth.name}-{name}")
+        shutil.rmtree(run_pth, ignore_errors=True)
+        shutil.copytree(corpus_pth, run_pth)
+    else:
+        run_pth = corpus_pth
+    files = get_changed_files(corpus_pth=run_pth, suttas=args.changed) if name == "check_all_changes" else []
+
+    if args.warm:
+        run_use_case(corpus_pth=run_pth, name=name, files=files)
+    results = []
+    for _ in range(args.repeat):
+        if not args.warm:
+            shutil.rmtree(run_pth / ".cache", ignore_errors=True)
+        results.append(run_use_case(corpus_pth=run_pth, name=name, files=files))
+    best = min(results, key=lambda result: result["wall_s"])
+    best["max_rss_mib"] = max(result["max_rss_mib"] for result in results)
+    if name in WRITERS:
+        shutil.rmtree(run_pth, ignore_errors=True)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-o", "--out", type=Path, required=True, help="Directory of the corpora")
+    parser.add_argument("-s", "--scales", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("-u", "--use-cases", nargs="+", default=use_cases.__all__)
+    parser.add_argument("-r", "--repeat", type=int, default=1, help="Best of that many runs")
+    parser.add_argument("-l", "--languages", type=int, default=2)
+    parser.add_argument("-m", "--mistakes", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--changed", type=int, default=20, help="Suttas for check_all_changes")
+    parser.add_argument("--warm", action="store_true", help="Measure with the cache filled")
+    args = parser.parse_args()
+    unknown = set(args.use_cases).difference(use_cases.__all__)
+    if unknown:
+        parser.error(f"Unknown use cases: {sorted(unknown)}, choices: {use_cases.__all__}")
+
+    results = []
+    print(f"{'scale':>5} {'use case':<32} {'exit':>4} {'wall s':>8} {'cpu s':>8} {'RSS MiB':>8} {'vs first':>8}")
+    for scale in args.scales:
+        corpus_pth = get_corpus(out=args.out, scale=scale, args=args)
+        with open(corpus_pth / "manifest.json") as f:
+            segments = json.load(f)["root_segments"]
+        for name in args.use_cases:
+            result = {"scale": scale, "use_case": name, "root_segments": segments}
+            result.update(benchmark(corpus_pth=corpus_pth, name=name, args=args))
+            results.append(result)
+            first = next(r for r in results if r["use_case"] == name)
+            ratio = result["wall_s"] / first["wall_s"] if first["wall_s"] else 0.0
+            print(
+                f"{scale:>5} {name:<32} {result['exit']:>4} {result['wall_s']:>8.2f} "
+                f"{result['cpu_s']:>8.2f} {result['max_rss_mib']:>8.1f} {ratio:>7.1f}x"
+            )
+
+    results_pth = args.out / "use_cases.json"
+    with open(results_pth, "w") as f:
+        json.dump({"args": {k: str(v) for k, v in vars(args).items()}, "results": results}, f, indent=2)
+    print(f"Saved: '{results_pth}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Compare memory used by the segment records of a full load: the previous attrs
+classes with `__dict__` against the current slotted verses classes.
+
+Usage:
+    python scripts/benchmarks/verses_memory.py -c sutta_processor_config.yaml
+    python scripts/benchmarks/verses_memory.py -c sutta_processor_config.yaml -t root reference
+
+JSON files are read and UIDs are interned before measuring, so only the verses and
+the records that hold them are counted.
+"""
+import argparse
+import gc
+import json
+import tracemalloc
+
+import attr
+
+from sutta_processor.application.domain_models.bilara_comments.root import CommentVerses
+from sutta_processor.application.domain_models.bilara_html.root import HtmlVerses
+from sutta_processor.application.domain_models.bilara_reference.root import (
+    ReferenceVerses,
+)
+from sutta_processor.application.domain_models.bilara_root.root import Verses
+from sutta_processor.application.domain_models.bilara_translation.root import (
+    TranslationVerses,
+)
+from sutta_processor.application.domain_models.bilara_variant.root import VariantVerses
+from sutta_processor.application.value_objects import (
+    UID,
+    RawUID,
+    RawVerse,
+    References,
+    Verse,
+)
+from sutta_processor.shared.config import Config
+from sutta_processor.shared.exceptions import SegmentIdError
+
+
+@attr.s(frozen=True, auto_attribs=True)
+class OldVerses:
+    uid: UID = attr.ib(converter=UID, init=False)
+    verse: Verse = attr.ib(converter=Verse)
+
+    raw_uid: RawUID = attr.ib(converter=RawUID)
+
+    def __attrs_post_init__(self):
+        object.__setattr__(self, "uid", UID(self.raw_uid))
+
+
+@attr.s(frozen=True, auto_attribs=True)
+class OldRootVerses(OldVerses):
+    raw_verse: RawVerse = attr.ib(converter=RawVerse, init=False)
+
+    def __attrs_post_init__(self):
+        super().__attrs_post_init__()
+        object.__setattr__(self, "raw_verse", RawVerse(self.verse))
+
+
+@attr.s(frozen=True, auto_attribs=True)
+class OldReferenceVerses(OldVerses):
+    uid: UID = attr.ib(init=False)
+    verse: Verse
+
+    references: References = attr.ib(init=False)
+
+    def __attrs_post_init__(self):
+        object.__setattr__(self, "references", References(self.verse))
+        object.__setattr__(self, "verse", Verse(self.verse))
+        object.__setattr__(self, "uid", UID(self.raw_uid))
+
+
+# tree: (old verses, new verses)
+TREES = {
+    "root": (OldRootVerses, Verses),
+    "html": (OldVerses, HtmlVerses),
+    "comment": (OldVerses, CommentVerses),
+    "variant": (OldVerses, VariantVerses),
+    "translation": (OldVerses, TranslationVerses),
+    "reference": (OldReferenceVerses, ReferenceVerses),
+}
+
+
+def read_tree(cfg: Config, tree: str) -> list:
+    all_data = []
+    for scanned in cfg.repo.bilara.scanner.get_tree(tree=tree):
+        try:
+            with open(scanned.f_pth) as f:
+                all_data.append(json.load(f))
+        except Exception:
+            continue
+    return all_data
+
+
+def build_index(all_data: list, verses_cls, is_old: bool) -> dict:
+    index = {}
+    for data in all_data:
+        for k, v in data.items():
+            try:
+                if is_old:
+                    verses = verses_cls(raw_uid=k, verse=v)
+                else:
+                    verses = verses_cls(uid=k, verse=v)
+            except (SegmentIdError, ValueError):
+                continue
+            index[verses.uid] = verses
+    return index
+
+
+def measure(all_data: list, verses_cls, is_old: bool) -> (int, int):
+    gc.collect()
+    tracemalloc.start()
+    index = build_index(all_data=all_data, verses_cls=verses_cls, is_old=is_old)
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return used, len(index)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-c", "--config", required=True)
+    parser.add_argument("-t", "--trees", nargs="*", default=list(TREES), choices=list(TREES))
+    args = parser.parse_args()
+
+    cfg = Config.from_yaml(f_pth=args.config)
+    print(f"{'tree':<12} {'segments':>9} {'old MiB':>9} {'new MiB':>9} {'B/seg old':>10} "
+          f"{'B/seg new':>10} {'saved':>7}")
+    total_old = total_new = 0
+    for tree in args.trees:
+        old_cls, new_cls = TREES[tree]
+        all_data = read_tree(cfg=cfg, tree=tree)
+        build_index(all_data=all_data, verses_cls=new_cls, is_old=False)
+        old, count = measure(all_data=all_data, verses_cls=old_cls, is_old=True)
+        new, _ = measure(all_data=all_data, verses_cls=new_cls, is_old=False)
+        total_old += old
+        total_new += new
+        count = count or 1
+        saved = (1 - new / old) * 100 if old else 0
+        print(f"{tree:<12} {count:>9} {old / 2**20:>9.1f} {new / 2**20:>9.1f} "
+              f"{old / count:>10.0f} {new / count:>10.0f} {saved:>6.1f}%")
+    saved = (1 - total_new / total_old) * 100 if total_old else 0
+    print(f"{'total':<12} {'':>9} {total_old / 2**20:>9.1f} {total_new / 2**20:>9.1f} "
+          f"{'':>10} {'':>10} {saved:>6.1f}%")
+
+
+if __name__ == "__main__":
+    main()
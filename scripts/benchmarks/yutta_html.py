@@ -0,0 +1,82 @@
+"""
+Compare span unwrapping of the Yuttadhammo html pages: the previous findall and
+`str.replace` passes (quadratic in the number of spans) against the single scan of
+`YuttaExtractor.unwrap_spans`. Whole page parsing and verse extraction is timed too.
+
+Usage:
+    python scripts/benchmarks/yutta_html.py -c sutta_processor_config.yaml
+    python scripts/benchmarks/yutta_html.py -p data/ms_yuttadhammo/html
+
+Both ways have to give the same html for every file.
+"""
+import argparse
+import re
+import time
+from pathlib import Path
+
+from lxml.etree import fromstring
+
+from sutta_processor.application.domain_models.ms_yuttadhammo.extractors import (
+    YuttaExtractor,
+)
+from sutta_processor.shared.config import Config
+
+
+def replaced_unwrap_spans(html: str) -> str:
+    for span in re.findall('<span class="firstLetter">.</span>', html):
+        html = html.replace(span, span[26:-7], 1)
+    for span in re.findall('<span class="gathaQuote">.+?(?=>)>', html):
+        html = html.replace(span, span[25:-7], 1)
+    for span in re.findall('<span class="bold">.+?(?=>)>', html):
+        html = html.replace(span, span[19:-7], 1)
+    return html
+
+
+def get_index(page) -> dict:
+    nodes = YuttaExtractor.get_id_nodes(page=page)
+    return {YuttaExtractor.get_ms_id(node=n): YuttaExtractor.get_verse(node=n) for n in nodes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("-c", "--config", help="Take ms_yuttadhammo_path from the config")
+    group.add_argument("-p", "--path", type=Path, help="Directory with the html files")
+    args = parser.parse_args()
+
+    root_pth = args.path or Config.from_yaml(f_pth=args.config).ms_yuttadhammo_path
+    f_pths = sorted(Path(root_pth).glob("**/*.html"))
+    pages = [f_pth.read_text() for f_pth in f_pths]
+    spans = sum(page.count("<span class=") for page in pages)
+    print(f"files: {len(pages)}, MiB: {sum(map(len, pages)) / 2**20:.1f}, spans: {spans}")
+
+    timings = {"replace passes": 0.0, "unwrap_spans": 0.0, "parse + extract": 0.0}
+    best_pth, best_ratio = None, 0.0
+    for f_pth, page in zip(f_pths, pages):
+        start = time.perf_counter()
+        expected = replaced_unwrap_spans(html=page)
+        replaced = time.perf_counter() - start
+
+        start = time.perf_counter()
+        unwrapped = YuttaExtractor.unwrap_spans(html=page)
+        scanned = time.perf_counter() - start
+        if unwrapped != expected:
+            raise RuntimeError("unwrap_spans gives different html than the replace passes")
+
+        start = time.perf_counter()
+        get_index(page=fromstring(unwrapped.replace("<br>", "<br/>")))
+        timings["parse + extract"] += time.perf_counter() - start
+
+        timings["replace passes"] += replaced
+        timings["unwrap_spans"] += scanned
+        if scanned and replaced / scanned > best_ratio:
+            best_ratio, best_pth = replaced / scanned, f_pth
+
+    for name, elapsed in timings.items():
+        print(f"{name:<16} {elapsed:>8.3f}s")
+    speedup = timings["replace passes"] / timings["unwrap_spans"]
+    print(f"unwrapping speedup: {speedup:.1f}x, best file: {best_ratio:.1f}x '{best_pth}'")
+
+
+if __name__ == "__main__":
+    main()
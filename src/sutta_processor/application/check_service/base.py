@@ -1,11 +1,18 @@
 import inspect
 import logging
+from typing import Callable
 
 from sutta_processor.shared.config import Config
+from sutta_processor.shared.profiler import profiler
 
 log = logging.getLogger(__name__)
 
 
+def profiled_check(fn: Callable) -> Callable:
+    """Check entry point, measured in the run profile."""
+    return profiler.profiled(kind="check")(fn)
+
+
 class ServiceBase:
     def __init__(self, cfg: Config):
         self.cfg = cfg
@@ -1,8 +1,6 @@
-import json
 import logging
 from collections import Counter, defaultdict
-from pathlib import Path
-from typing import Dict, Set
+from typing import Dict, Optional, Set, Tuple
 
 from sutta_processor.application.domain_models import (
     BilaraHtmlAggregate,
@@ -14,9 +12,18 @@ from sutta_processor.application.domain_models.base import BaseFileAggregate
 from sutta_processor.application.domain_models.bilara_reference.root import (
     ReferenceVerses,
 )
-from sutta_processor.application.value_objects import UID, BaseTextKey, MsId
+from sutta_processor.application.value_objects import (
+    UID,
+    BaseTextKey,
+    MsId,
+    References,
+)
 from sutta_processor.shared.config import Config
-from sutta_processor.shared.exceptions import MsIdError, MultipleIdFoundError
+from sutta_processor.shared.exceptions import MultipleIdFoundError
+from sutta_processor.shared.findings import WARNING, findings
+
+from .base import ServiceBase, profiled_check
+from .reference_index import ReferenceIndex
 
 log = logging.getLogger(__name__)
 
@@ -29,14 +36,11 @@ class ReferenceEngine:
 
     _ERR_MSG = "Lost data, some indexes were duplicated after merging file: '{f_pth}'"
 
-    def __init__(self, cfg: Config):
-        self.cfg = cfg
-        raw_index: dict = self.get_raw_index_from_path(
-            reference_root_path=cfg.reference_root_path
-        )
-        self.uid_index = self.get_uid_index(raw_index=raw_index)
+    def __init__(self, reference: BilaraReferenceAggregate):
+        references_index = self.get_references_index(reference=reference)
+        self.uid_index = self.get_uid_index(references_index=references_index)
         self.ms_id_index = self.get_ms_id_index(uid_index=self.uid_index)
-        self.uid_reference = self.get_uid_reference(raw_index=raw_index)
+        self.uid_reference = self.get_uid_reference(references_index=references_index)
 
         if len(self.uid_index) != len(self.ms_id_index):
             msg = "uid->pali and pali->uid indexes are different lengths. '%s' vs '%s'"
@@ -52,98 +56,98 @@ class ReferenceEngine:
             if len(uid_set) != 1:
                 msg = "Pali_ms_id '%s' is referencing several SuttaCentral uid: %s"
                 log.error(msg, pali_id, uid_set)
+                message = f"Pali_ms_id '{pali_id}' is referencing several SuttaCentral uid"
+                for uid in sorted(uid_set):
+                    findings.add(check=cls.__name__, message=message, uid=uid)
 
         return dict(pali_id_index)
 
     # LOOK AT ME
     @classmethod
-    def get_uid_index(cls, raw_index: dict) -> Dict[UID, MsId]:
-        def get_pali_ms_id(reference_value: str) -> MsId:
-            """
-            :param reference_value: sc2, pts-cs1.1, pts-vp-en1.1, pts-vp-pli3.1, ms1V_2
-            """
-            pali_id_set = set()
-            for item in reference_value.split(","):
-                try:
-                    pali_id_set.add(MsId(item.strip()))
-                except MsIdError:
-                    # Filter out any non MsIds
-                    pass
-
+    def get_uid_index(cls, references_index: Dict[UID, References]) -> Dict[UID, MsId]:
+        def get_pali_ms_id(references: References) -> MsId:
+            # Filter out any non MsIds
+            pali_id_set = {part for part in references if isinstance(part, MsId)}
             return pali_id_set.pop()
 
         index = {}
-        for uid, sources in raw_index.items():  # type: str, str
+        for uid, references in references_index.items():
             try:
-                index[UID(uid)] = get_pali_ms_id(reference_value=sources)
+                index[uid] = get_pali_ms_id(references=references)
             except MultipleIdFoundError:
                 msg = "SuttaCentral uid '%s' is referencing several pali sources: %s"
-                log.error(msg, uid, sources)
+                log.error(msg, uid, references.data)
+                message = "Referencing several pali sources"
+                findings.add(check=cls.__name__, message=message, uid=uid)
             except KeyError:
                 # No reference found for that UID
                 pass
         return index
 
     @classmethod
-    def get_raw_index_from_path(cls, reference_root_path: Path) -> dict:
+    def get_references_index(
+        cls, reference: BilaraReferenceAggregate
+    ) -> Dict[UID, References]:
         """
+        References parsed when the files were loaded, the json is not read again.
+
         :return: {
-          "pli-tv-bu-vb-pj1:1.1.0": "sc1, ms1V_1",
-          "pli-tv-bu-vb-pj1:1.1.1": "sc2, pts-cs1.1, pts-vp-en1.1, pts-vp-pli3.1, ms1V_2",
-          "pli-tv-bu-vb-pj1:1.2.1": "pts-vp-pli3.2, sc3, pts-cs1.2, ms1V_3",
-          "pli-tv-bu-vb-pj1:1.3.1": "sc5, pts-cs1.3, ms1V_5",
+          "pli-tv-bu-vb-pj1:1.1.0": {"sc1", "ms1V_1"},
+          "pli-tv-bu-vb-pj1:1.1.1": {"sc2", "pts-cs1.1", "pts-vp-en1.1", "pts-vp-pli3.1", "ms1V_2"},
           ...
           }
         """
-        raw_index = {}
+        references_index = {}
         len_before = 0
-        for f_pth in reference_root_path.glob("**/*.json"):
-            with open(f_pth) as f:
-                try:
-                    data = json.load(f)
-                except Exception as e:
-                    log.error("Error loading file '%s'. Error: %s", f_pth, e)
-                    raise
-
-            raw_index.update(data)
-            len_after = len(raw_index)
-            if len_after - len_before != len(data):
-                raise RuntimeError(cls._ERR_MSG.format(f_pth=f_pth))
+        for file_aggregate in reference.file_aggregates:
+            references_index.update(
+                (uid, verses.references) for uid, verses in file_aggregate.index.items()
+            )
+            len_after = len(references_index)
+            if len_after - len_before != len(file_aggregate.index):
+                raise RuntimeError(cls._ERR_MSG.format(f_pth=file_aggregate.f_pth))
             len_before = len_after
-        return raw_index
+        return references_index
 
     @classmethod
-    def get_uid_reference(cls, raw_index: Dict[str, str]) -> Dict[UID, Set[str]]:
-        def get_sources_set(reference_value: str) -> Set[str]:
-            """
-            :param reference_value: sc2, pts-cs1.1, pts-vp-en1.1, pts-vp-pli3.1, ms1V_2
-            """
-            pali_id_set = set()
-            for item in reference_value.split(","):
-                pali_id_set.add(item.strip())
-            return pali_id_set
-
-        index = {}
-        for uid, sources in raw_index.items():  # type: str, str
-            index[UID(uid)] = get_sources_set(reference_value=sources)
-        return index
+    def get_uid_reference(
+        cls, references_index: Dict[UID, References]
+    ) -> Dict[UID, Set[str]]:
+        return {uid: set(references) for uid, references in references_index.items()}
 
 
-class SCReferenceService:
-    reference_engine: ReferenceEngine
+class SCReferenceService(ServiceBase):
+    _reference_engine: Optional[ReferenceEngine]
+    # (aggregate, its index) of the last checked reference aggregate
+    _reference_index: Optional[Tuple[BilaraReferenceAggregate, ReferenceIndex]]
     _MS_REF_MISS_COUNT = (
         "[%s] There are '%s' MsId that are not found in the reference file"
     )
-    _MS_REF_MISS = "[%s] Missing MsId from reference: %s"
     _MS_WRONG_COUNT = "[%s] There are '%s' wrong MsId in the reference data"
-    _MS_WRONG = "[%s] Wrong MsId is the reference data: %s"
     _UID_WRONG_COUNT = "[%s] There are '%s' wrong SC UID in the reference data"
-    _UID_WRONG = "[%s] Wrong SC UID is the reference data: %s"
 
     def __init__(self, cfg: Config):
-        self.cfg = cfg
-        self.reference_engine = ReferenceEngine(cfg=cfg)
+        super().__init__(cfg=cfg)
+        self._reference_engine = None
+        self._reference_index = None
 
+    @property
+    def reference_engine(self) -> ReferenceEngine:
+        """Built on first use from the reference aggregate loaded by the repo."""
+        if self._reference_engine is None:
+            reference = self.cfg.repo.bilara.get_reference()
+            self._reference_engine = ReferenceEngine(reference=reference)
+        return self._reference_engine
+
+    def get_reference_index(self, reference: BilaraReferenceAggregate) -> ReferenceIndex:
+        """Built once for the aggregate, the reference checks share it."""
+        if self._reference_index is None or self._reference_index[0] is not reference:
+            references_index = ReferenceEngine.get_references_index(reference=reference)
+            index = ReferenceIndex(references_index=references_index)
+            self._reference_index = (reference, index)
+        return self._reference_index[1]
+
+    @profiled_check
     def get_duplicated_ms_id(self, reference: BilaraReferenceAggregate):
         def get_reference_counts() -> Counter:
             c: Counter = Counter()
@@ -170,12 +174,21 @@ class SCReferenceService:
             duplicated_ms_id = get_surplus_ref(c=counter)
 
             if duplicated_ms_id:
-                omg = "[%s] There are '%s' duplicated ms_id in bilara references: %s"
-                log.error(omg, self.name, len(duplicated_ms_id[2]), duplicated_ms_id[2])
+                omg = "[%s] There are '%s' duplicated ms_id in bilara references"
+                log.error(omg, self.name, len(duplicated_ms_id[2]))
+                surplus = {ms_id for ms_ids in duplicated_ms_id.values() for ms_id in ms_ids}
                 duplicated_ms_id.pop(2)
                 if duplicated_ms_id:
                     omg = "[%s] There are multiple ms_id in bilara references: %s"
                     log.error(omg, self.name, duplicated_ms_id)
+                for uid, verse in reference.index.items():
+                    for ms_id in sorted(surplus.intersection(verse.references)):
+                        findings.add(
+                            check=self.name,
+                            message=f"Duplicated ms_id '{ms_id}'",
+                            uid=uid,
+                            file=reference.get_file(uid=uid),
+                        )
 
     @classmethod
     def get_references_stem(cls, reference: BilaraReferenceAggregate) -> list:
@@ -186,64 +199,100 @@ class SCReferenceService:
         log.error("Reference stems: %s", reference_stems)
         return reference_stems
 
+    @profiled_check
     def get_wrong_pts_cs_no(self, reference: BilaraReferenceAggregate):
         ignore = {"pts-cs75", "pts-cs1.10", "pts-cs7", "pts-cs8", "pts-cs12"}
-        for verses in reference.index.values():  # type: ReferenceVerses
-            if not verses.uid.key.raw.startswith("dn"):
-                continue
-            elif not verses.references.pts_cs:
-                # No pts_cs reference in the reference list so skip it
-                continue
-            elif verses.references.pts_cs in ignore:
+        index = self.get_reference_index(reference=reference)
+        # Only the dn segments with pts_cs references, each checked by its last one
+        pts_cs_refs = index.get_references_in_range(start="dn", family="pts-cs")
+        for uid in dict.fromkeys(uid for uid, _ in pts_cs_refs):
+            pts_cs = index.uid_references[uid].pts_cs
+            if not pts_cs or pts_cs in ignore or uid.key.seq.raw.startswith(pts_cs.pts_no):
                 continue
-            if not verses.uid.key.seq.raw.startswith(verses.references.pts_cs.pts_no):
-                log.error(
-                    "[%s] wrong uid '%s' for pts_cs number: %s",
-                    self.name,
-                    verses.uid,
-                    verses.references.pts_cs,
-                )
-
+            log.error("[%s] wrong uid '%s' for pts_cs number: %s", self.name, uid, pts_cs)
+            findings.add(
+                check=self.name,
+                message=f"Wrong uid for pts_cs number '{pts_cs}'",
+                uid=uid,
+                file=reference.get_file(uid=uid),
+            )
+
+    @profiled_check
     def get_missing_ms_id_from_reference(self, aggregate: YuttaAggregate):
         diff = sorted(
             {k for k in aggregate.index if k not in self.reference_engine.ms_id_index}
         )
         if diff:
             log.error(self._MS_REF_MISS_COUNT, self.__class__.__name__, len(diff))
-            log.error(self._MS_REF_MISS, self.__class__.__name__, diff)
+        for ms_id in diff:
+            message = "MsId not found in the reference data"
+            findings.add(check=self.name, message=message, uid=ms_id)
         return diff
 
+    @profiled_check
     def log_wrong_ms_id_in_reference_data(self, aggregate: YuttaAggregate):
         diff = sorted(
             {k for k in self.reference_engine.ms_id_index if k not in aggregate.index}
         )
         if diff:
-            log.error(self._MS_REF_MISS, self.__class__.__name__, len(diff))
-            log.error(self._MS_WRONG, self.__class__.__name__, diff)
+            log.error(self._MS_WRONG_COUNT, self.__class__.__name__, len(diff))
+        for ms_id in diff:
+            message = "MsId not found in the Yuttadhammo data"
+            findings.add(check=self.name, message=message, uid=ms_id)
 
+    @profiled_check
     def log_wrong_uid_in_reference_data(self, bilara: BilaraRootAggregate):
         diff = sorted(
             {k for k in self.reference_engine.uid_index if k not in bilara.index}
         )
         if diff:
             log.error(self._UID_WRONG_COUNT, self.__class__.__name__, len(diff))
-            log.error(self._UID_WRONG, self.__class__.__name__, diff)
-
-    @classmethod
-    def get_wrong_segments_based_on_nya(cls, reference: BilaraReferenceAggregate):
-        wrong_keys = set()
-        for uid, ref_verses in reference.index.items():
-            nya_id = ref_verses.references.nya
-            if not nya_id:
-                continue
-            is_uid_ok = nya_id == f"nya{uid.key.seq[0]}"
-            if not is_uid_ok:
-                wrong_keys.add(uid)
+        for uid in diff:
+            message = f"Not in the '{bilara.name()}' data"
+            findings.add(check=self.name, message=message, uid=uid)
+
+    @profiled_check
+    def get_wrong_segments_based_on_nya(self, reference: BilaraReferenceAggregate):
+        index = self.get_reference_index(reference=reference)
+        # Only the segments with nya references, each checked by its last one
+        wrong_nya = {}
+        for uid in dict.fromkeys(uid for _, uid in index.get_uids_in_range(start="nya")):
+            nya_id = index.uid_references[uid].nya
+            if nya_id and nya_id != f"nya{uid.key.seq[0]}":
+                wrong_nya[uid] = nya_id
+        wrong_keys = set(wrong_nya)
         if wrong_keys:
-            omg = "[RefEngine] There are '%s' nya ref not aligned with uid: %s"
-            log.error(omg, len(wrong_keys), wrong_keys)
+            omg = "[RefEngine] There are '%s' nya ref not aligned with uid"
+            log.error(omg, len(wrong_keys))
+        for uid in sorted(wrong_keys):
+            findings.add(
+                check=self.name,
+                message=f"Not aligned with '{wrong_nya[uid]}'",
+                uid=uid,
+                file=reference.get_file(uid=uid),
+            )
         return wrong_keys
 
-    @property
-    def name(self):
-        return self.__class__.__name__
+    @profiled_check
+    def get_unrecognized_references(self, reference: BilaraReferenceAggregate):
+        """Reference parts of unknown id types, reported once per family with the first segment."""
+        counts: Counter = Counter()
+        first_parts: Dict[str, Tuple[UID, str]] = {}
+        for uid, verse in reference.index.items():
+            for part in verse.references.unrecognized:
+                family, _ = ReferenceIndex.get_family(reference=part)
+                counts[family] += 1
+                first_parts.setdefault(family, (uid, part))
+        if counts:
+            omg = "[%s] There are '%s' unrecognized references: %s"
+            log.warning(omg, self.name, sum(counts.values()), dict(counts.most_common()))
+        for family, count in sorted(counts.items()):
+            uid, part = first_parts[family]
+            findings.add(
+                check=self.name,
+                message=f"Unrecognized reference family '{family}' ('{count}' parts), eg. '{part}'",
+                uid=uid,
+                file=reference.get_file(uid=uid),
+                severity=WARNING,
+            )
+        return counts
@@ -0,0 +1,77 @@
+import logging
+import math
+from collections import Counter, defaultdict
+from typing import Dict, List, Sequence, Tuple
+
+from sutta_processor.application.value_objects import VerseTokens
+
+log = logging.getLogger(__name__)
+
+# Token with its occurrence number in the verse: ('ti', 0), ('ti', 1), ...
+Element = Tuple[str, int]
+
+
+class TokensCandidateIndex:
+    """
+    Narrow the entries to those that can reach `SequenceMatcher.quick_ratio`
+    above the threshold, without scoring all of them.
+
+    quick_ratio is `2 * M / (len(a) + len(b))`, where M is the size of the multiset
+    intersection of tokens. Numbering repeated tokens turns the multisets into sets,
+    so it's a set similarity join with prefix filtering: when the ratio is above `t`,
+    both sides have to share more than `t / (2 - t) * len` elements. With elements
+    of every verse ordered from the rarest, two verses with that many elements in
+    common always share one of the first `len - min_overlap + 1` elements. Only those
+    prefixes are indexed and looked up, and lengths that can't reach the ratio are
+    dropped. The result is the superset of entries above the threshold.
+    """
+
+    EPS = 1e-9
+
+    def __init__(self, entries: Sequence[VerseTokens], threshold: float):
+        self.threshold = threshold
+        self.overlap_ratio = threshold / (2 - threshold)
+        all_elements = [self.get_elements(tokens=tokens) for tokens in entries]
+        self.frequency: Counter = Counter(e for elements in all_elements for e in elements)
+        self.lengths: List[int] = [len(tokens) for tokens in entries]
+        self.empty: List[int] = [i for i, length in enumerate(self.lengths) if not length]
+
+        self.index: Dict[Element, List[int]] = defaultdict(list)
+        for i, elements in enumerate(all_elements):
+            for element in self.get_prefix(elements=elements):
+                self.index[element].append(i)
+        self.index = dict(self.index)
+        msg = "Indexed '%s' entries, '%s' distinct tokens"
+        log.debug(msg, len(entries), len(self.index))
+
+    @classmethod
+    def get_elements(cls, tokens: VerseTokens) -> List[Element]:
+        seen: Counter = Counter()
+        elements = []
+        for token in tokens:
+            elements.append((token, seen[token]))
+            seen[token] += 1
+        return elements
+
+    def get_min_overlap(self, length: int) -> int:
+        return math.floor(self.overlap_ratio * length - self.EPS) + 1
+
+    def get_prefix(self, elements: List[Element]) -> List[Element]:
+        length = len(elements)
+        if not length:
+            return []
+        elements = sorted(elements, key=lambda e: (self.frequency.get(e, 0), e))
+        return elements[: length - self.get_min_overlap(length=length) + 1]
+
+    def get_candidates(self, tokens: VerseTokens) -> List[int]:
+        """Positions of the candidate entries, in the order they were given."""
+        length = len(tokens)
+        if not length:
+            # Only empty entries give quick_ratio 1.0 for empty tokens
+            return self.empty
+        min_len = length * self.overlap_ratio - self.EPS
+        max_len = length / self.overlap_ratio + self.EPS
+        candidates = set()
+        for element in self.get_prefix(elements=self.get_elements(tokens=tokens)):
+            candidates.update(self.index.get(element, ()))
+        return sorted(i for i in candidates if min_len <= self.lengths[i] <= max_len)
@@ -15,8 +15,10 @@ from sutta_processor.application.domain_models import (
 from sutta_processor.application.domain_models.base import BaseRootAggregate, BaseVerses
 from sutta_processor.application.value_objects.uid import UID, UidKey
 from sutta_processor.shared.config import Config
+from sutta_processor.shared.exclusion import ExclusionMatcher
+from sutta_processor.shared.findings import findings
 
-from .base import ServiceBase
+from .base import ServiceBase, profiled_check
 from .bd_reference import SCReferenceService
 from .text_check import CheckText
 from .uid_renumber import UidRenumber
@@ -26,23 +28,24 @@ log = logging.getLogger(__name__)
 
 class CheckHtml(ServiceBase):
     _MISSING_UIDS = "[%s] There are '%s' UIDs that are in '%s' but missing in the html"
-    _MISSING_UIDS_LIST = "[%s] Missing UIDs from html: %s"
     _SURPLUS_UIDS = "[%s] There are '%s' uids in '%s' that are not in the '%s' data"
-    _SURPLUS_UIDS_LIST = "[%s] Surplus '%s' UIDs: %s"
 
+    @profiled_check
     def get_missing_segments(
         self, html_aggregate: BilaraHtmlAggregate, base_aggregate: BaseRootAggregate
     ) -> set:
-        base_uids = set(base_aggregate.index.keys())
-        html_uids = set(html_aggregate.index.keys())
-        html_missing = base_uids - html_uids.union(
-            self.cfg.exclude.get_missing_segments
-        )
+        excluded = self.cfg.exclude.for_check("get_missing_segments")
+        html_index = html_aggregate.index
+        html_missing = {
+            uid for uid in base_aggregate.index if uid not in html_index and uid not in excluded
+        }
         if html_missing:
             log.error(
                 self._MISSING_UIDS, self.name, len(html_missing), base_aggregate.name()
             )
-            log.error(self._MISSING_UIDS_LIST, self.name, sorted(html_missing))
+        for uid in sorted(html_missing):
+            file = base_aggregate.get_file(uid=uid)
+            findings.add(check=self.name, message="Missing in the html", uid=uid, file=file)
         return html_missing
 
     def get_surplus_segments(
@@ -73,27 +76,30 @@ class CheckHtml(ServiceBase):
                 check_aggregate.name(),
                 base_aggregate.name(),
             )
-            log.error(
-                self._SURPLUS_UIDS_LIST,
-                self.name,
-                check_aggregate.name(),
-                sorted(html_wrong),
-            )
+        message = f"Not in the '{base_aggregate.name()}' data"
+        for uid in html_wrong:
+            file = check_aggregate.get_file(uid=uid)
+            findings.add(check=self.name, message=message, uid=uid, file=file)
         return set(html_wrong)
 
+    @profiled_check
     def is_0_in_header_uid(self, aggregate: BilaraHtmlAggregate) -> Set[UID]:
         error_uids = set()
         prog = re.compile(r"<h\d")
+        excluded = self.cfg.exclude.for_check("headers_without_0")
         for uid, verses in aggregate.index.items():
-            if uid in self.cfg.exclude.headers_without_0:
+            if uid in excluded:
                 continue
             elif prog.match(verses.verse) and 0 not in uid.key.seq:
                 omg = "[%s] Possible header not starting the section: '%s'"
                 log.error(omg, self.name, uid)
+                message = "Possible header not starting the section"
+                file = aggregate.get_file(uid=uid)
+                findings.add(check=self.name, message=message, uid=uid, file=file)
                 error_uids.add(uid)
         if error_uids:
-            omg = "[%s] There are '%s' headers that don't start new section: %s"
-            log.error(omg, self.name, len(error_uids), sorted(error_uids))
+            omg = "[%s] There are '%s' headers that don't start new section"
+            log.error(omg, self.name, len(error_uids))
         return error_uids
 
 
@@ -101,7 +107,6 @@ class CheckTranslation(ServiceBase):
     _SURPLUS_UIDS = (
         "[%s] There are '%s' UIDs in '%s' lang that are not in the '%s' data"
     )
-    _SURPLUS_UIDS_LIST = "[%s] Surplus UIDs in the '%s' lang: %s"
 
     def get_surplus_segments(
         self,
@@ -122,9 +127,10 @@ class CheckTranslation(ServiceBase):
                     lang,
                     base_aggregate.name(),
                 )
-                log.error(
-                    self._SURPLUS_UIDS_LIST, self.name, lang, sorted(tran_surplus)
-                )
+            message = f"Not in the '{base_aggregate.name()}' data"
+            for uid in sorted(tran_surplus):
+                file = translation_aggregate.get_file(uid=uid, lang=lang)
+                findings.add(check=self.name, message=message, uid=uid, file=file)
         return base_uids
 
 
@@ -143,9 +149,12 @@ class CheckVariant(ServiceBase):
         replaced_cq = replaced_sq.replace('“', '').replace('”', '')
         return replaced_cq.lower()
 
+    @profiled_check
     def get_wrong_uid_with_arrow(
         self, aggregate: BilaraVariantAggregate, base_aggregate: BaseRootAggregate,
     ) -> Set[UID]:
+        check = self.name
+        excluded = self.cfg.exclude.for_check("get_wrong_uid_with_arrow")
         missing_word_keys = set()
 
         for uid, verses in aggregate.index.items():
@@ -157,27 +166,35 @@ class CheckVariant(ServiceBase):
             try:
                 base_verse: str = base_aggregate.index[uid].verse
             except KeyError:
-                if uid not in self.cfg.exclude.get_wrong_uid_with_arrow:
-                    log.error(self._MISSING_KEY, self.name, uid, base_aggregate.name())
+                if uid not in excluded:
+                    log.error(self._MISSING_KEY, check, uid, base_aggregate.name())
+                    message = f"Key not found in '{base_aggregate.name()}'"
+                    file = aggregate.get_file(uid=uid)
+                    findings.add(check=check, message=message, uid=uid, file=file)
                     missing_word_keys.add(uid)
                 continue
 
             if (word not in self._custom_strip(text=base_verse)) and (
-                uid not in self.cfg.exclude.get_wrong_uid_with_arrow
+                uid not in excluded
             ):
-                log.error(self._MISSING_WORD, self.name, word, {uid: base_verse})
+                log.error(self._MISSING_WORD, check, word, {uid: base_verse})
+                message = f"Word '{word}' not found in the base verse"
+                file = aggregate.get_file(uid=uid)
+                findings.add(check=check, message=message, uid=uid, file=file)
                 missing_word_keys.add(uid)
 
         if missing_word_keys:
-            omg = "[%s] Wrong word count: '%s' uids: '%s'"
-            log.error(omg, self.name, len(missing_word_keys), missing_word_keys)
+            omg = "[%s] Wrong word count: '%s'"
+            log.error(omg, check, len(missing_word_keys))
         return missing_word_keys
 
+    @profiled_check
     def get_unknown_variants(self, aggregate: BilaraVariantAggregate) -> Set[UID]:
         unknown_keys = set()
+        excluded = self.cfg.exclude.for_check("get_unknown_variants")
         for uid, verses in aggregate.index.items():
             word, *rest = verses.verse.split("→")
-            if rest or uid in self.cfg.exclude.get_unknown_variants:
+            if rest or uid in excluded:
                 continue
             unknown_keys.add(uid)
 
@@ -187,12 +204,14 @@ class CheckVariant(ServiceBase):
             values = {k: aggregate.index[k].verse for k in unknown_keys}
             pretty_values = pprint.pformat(values, width=200)
             log.error("[%s] Not valid keys: \n%s", self.name, pretty_values)
+        for uid in sorted(unknown_keys):
+            file = aggregate.get_file(uid=uid)
+            findings.add(check=self.name, message="Not validated", uid=uid, file=file)
         return unknown_keys
 
 
 class CheckService(ServiceBase):
     _SURPLUS_UIDS = "[%s] There are '%s' uids in '%s' that are not in the '%s' data"
-    _SURPLUS_UIDS_LIST = "[%s] Surplus '%s' UIDs: %s"
 
     def __init__(self, cfg: Config):
         super().__init__(cfg=cfg)
@@ -200,10 +219,11 @@ class CheckService(ServiceBase):
         self.html = CheckHtml(cfg=cfg)
         self.translation = CheckTranslation(cfg=cfg)
         self.variant = CheckVariant(cfg=cfg)
-        self.text = CheckText(cfg=cfg)
+        self.text = CheckText(cfg=cfg, reference=self.reference)
         self.sequence = SequenceCheck(cfg=cfg)
         self.renumber = UidRenumber(cfg=cfg)
 
+    @profiled_check
     def get_comment_surplus_segments(
         self,
         check_aggregate: BilaraCommentAggregate,
@@ -214,10 +234,11 @@ class CheckService(ServiceBase):
             function_log_name=function_log_name,
             check_aggregate=check_aggregate,
             base_aggregate=base_aggregate,
-            excluded=self.cfg.exclude.get_comment_surplus_segments,
+            excluded=self.cfg.exclude.for_check("get_comment_surplus_segments"),
         )
         return result
 
+    @profiled_check
     def get_surplus_segments(
         self,
         check_aggregate: BaseRootAggregate,
@@ -242,11 +263,12 @@ class CheckService(ServiceBase):
         function_log_name,
         check_aggregate: BaseRootAggregate,
         base_aggregate: BaseRootAggregate,
-        excluded: Set[str],
+        excluded: ExclusionMatcher,
     ) -> set:
-        base_uids = set(base_aggregate.index.keys())
-        comm_uids = set(check_aggregate.index.keys())
-        comm_surplus = comm_uids - base_uids.union(excluded)
+        base_index = base_aggregate.index
+        comm_surplus = {
+            uid for uid in check_aggregate.index if uid not in base_index and uid not in excluded
+        }
         if comm_surplus:
             log.error(
                 self._SURPLUS_UIDS,
@@ -255,54 +277,64 @@ class CheckService(ServiceBase):
                 check_aggregate.name(),
                 base_aggregate.name(),
             )
-            log.error(
-                self._SURPLUS_UIDS_LIST,
-                function_log_name,
-                check_aggregate.name(),
-                sorted(comm_surplus),
-            )
+        message = f"Not in the '{base_aggregate.name()}' data"
+        for uid in sorted(comm_surplus):
+            file = check_aggregate.get_file(uid=uid)
+            findings.add(check=function_log_name, message=message, uid=uid, file=file)
         return comm_surplus
 
+    @profiled_check
     def check_uid_sequence_in_file(self, aggregate: BilaraRootAggregate):
+        check = self.name
         error_keys = set()
         previous_elem = UidKey(":0-0")
+        excluded = self.cfg.exclude.for_check("check_uid_sequence_in_file")
         for uid in aggregate.index:
-            if uid in self.cfg.exclude.check_uid_sequence_in_file:
+            if uid in excluded:
                 pass
             elif not uid.key.is_next(previous=previous_elem):
                 error_keys.add(uid)
                 msg = "[%s] Sequence error. Previous: '%s' current: '%s'"
-                log.error(msg, self.name, previous_elem.raw, uid)
+                log.error(msg, check, previous_elem.raw, uid)
+                message = f"Sequence error, previous: '{previous_elem.raw}'"
+                file = aggregate.get_file(uid=uid)
+                findings.add(check=check, message=message, uid=uid, file=file)
             previous_elem = uid.key
         if error_keys:
-            msg = "[%s] There are '%s' sequence key errors: %s"
-            log.error(msg, self.name, len(error_keys), error_keys)
+            msg = "[%s] There are '%s' sequence key errors"
+            log.error(msg, check, len(error_keys))
 
+    @profiled_check
     def get_duplicated_verses_next_to_each_other(
         self, aggregate: BilaraRootAggregate
     ) -> set:
+        check = self.name
         error_keys = set()
         prev_verses = ""
+        excluded = self.cfg.exclude.for_check("get_duplicated_verses_next_to_each_other")
         for uid, verses in aggregate.index.items():  # type: UID, BaseVerses
             verse = verses.verse.strip()
             if not verse:
                 continue
             if (
                 verse == prev_verses
-                and uid not in self.cfg.exclude.get_duplicated_verses_next_to_each_other
+                and uid not in excluded
             ):
                 error_keys.add(uid)
                 msg = "[%s] Same verses next to each other. '%s': '%s'"
-                log.error(msg, self.name, uid, verse)
+                log.error(msg, check, uid, verse)
+                message = "Same verse as the previous segment"
+                file = aggregate.get_file(uid=uid)
+                findings.add(check=check, message=message, uid=uid, file=file)
             prev_verses = verse
         if error_keys:
             msg = "[%s] There are '%s' duplicated verses error"
-            log.error(msg, self.name, len(error_keys))
-            msg = "[%s] dupes UIDs: %s"
-            log.error(msg, self.name, sorted(error_keys))
+            log.error(msg, check, len(error_keys))
         return error_keys
 
+    @profiled_check
     def get_empty_verses(self, aggregate: BilaraRootAggregate) -> set:
+        check = self.name
         error_keys = set()
         pattern = r"(\(\s\)|^\s$)"
         prog = re.compile(pattern)
@@ -311,15 +343,16 @@ class CheckService(ServiceBase):
             if result:
                 error_keys.add(uid)
                 msg = "[%s] Key has blank value: '%s': '%s'"
-                log.error(msg, self.name, uid, verses.verse)
+                log.error(msg, check, uid, verses.verse)
+                file = aggregate.get_file(uid=uid)
+                findings.add(check=check, message="Blank value", uid=uid, file=file)
 
         if error_keys:
             msg = "[%s] There are '%s' blank verses error"
-            log.error(msg, self.name, len(error_keys))
-            msg = "[%s] blank UIDs: %s"
-            log.error(msg, self.name, sorted(error_keys))
+            log.error(msg, check, len(error_keys))
         return error_keys
 
+    @profiled_check
     def get_unordered_segments(self, aggregate: BaseRootAggregate):
         if isinstance(aggregate, BilaraTranslationAggregate):
             wrong_uids = set()
@@ -329,23 +362,36 @@ class CheckService(ServiceBase):
                 if unordered_seg:
                     omg = "[%s] There are '%s' unordered segments for lang: '%s'"
                     log.error(omg, self.name, len(unordered_seg), lang)
+                self._add_unordered_findings(
+                    check=self.name, aggregate=aggregate, uids=unordered_seg, lang=lang
+                )
                 wrong_uids.update(unordered_seg)
             return wrong_uids
 
         unordered_seg = self.sequence.get_unordered_segments(index=aggregate.index)
         if unordered_seg:
-            omg = "[%s] There are '%s' unordered segments: %s"
-            log.error(omg, self.name, len(unordered_seg), sorted(unordered_seg))
+            omg = "[%s] There are '%s' unordered segments"
+            log.error(omg, self.name, len(unordered_seg))
+        self._add_unordered_findings(check=self.name, aggregate=aggregate, uids=unordered_seg)
         return unordered_seg
 
+    @classmethod
+    def _add_unordered_findings(
+        cls, check: str, aggregate: BaseRootAggregate, uids: Set[UID], lang: str = None
+    ):
+        for uid in sorted(uids):
+            file = aggregate.get_file(uid=uid, lang=lang)
+            findings.add(check=check, message="Segment out of order", uid=uid, file=file)
+
 
 class SequenceCheck(ServiceBase):
     def get_unordered_segments(self, index: Dict[UID, BaseVerses]) -> Set[UID]:
         wrong_uid = set()
         previous = UidKey(":0-0")
+        excluded = self.cfg.exclude.for_check("get_unordered_segments")
         for uid in index:
             current = uid.key
-            if uid in self.cfg.exclude.get_unordered_segments:
+            if uid in excluded:
                 pass
             elif not self.is_key_in_seq(previous, current):
                 omg = "[%s] Sequence error. Previous: '%s' current: '%s'"
@@ -0,0 +1,113 @@
+import logging
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from sutta_processor.application.value_objects import UID, References
+from sutta_processor.shared.natural_key import NaturalKey, get_natural_key
+
+log = logging.getLogger(__name__)
+
+
+class SortedKeys:
+    """Values sorted by natural key, for ranges of keys and their sub keys."""
+
+    def __init__(self, items: List[Tuple[NaturalKey, str, str]]):
+        items.sort(key=lambda item: item[0])
+        self.keys = [key for key, _, _ in items]
+        self.items = [(a, b) for _, a, b in items]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def get_range(self, start: str, end: str) -> List[Tuple[str, str]]:
+        """Items from start up to end, with everything under end, eg. 'mn1' has 'mn1:1.1'."""
+        start_key, end_key = get_natural_key(start), get_natural_key(end)
+        lo = bisect_left(self.keys, start_key)
+        hi = max(lo, bisect_left(self.keys, end_key))
+        end_len = len(end_key)
+        while hi < len(self.keys) and self.keys[hi][:end_len] == end_key:
+            hi += 1
+        return self.items[lo:hi]
+
+
+class ReferenceIndex:
+    """
+    References by family (sc, pts-cs, pts-vp-pli, pts-vp-en, nya, ms, ...), with
+    lookups both ways and range queries on natural keys, eg. all segments citing
+    'pts-vp-pli3' or all PTS pages of 'mn1:1.1'-'mn1:5.3'.
+
+    Built once per reference aggregate by SCReferenceService, the nya and pts_cs checks
+    read only their family instead of scanning every segment.
+    """
+
+    split_family = re.compile(r"(\D*)(.*)")
+
+    reference_uids: Dict[str, Tuple[UID, ...]]
+    uid_references: Dict[UID, References]
+    families: Dict[str, SortedKeys]
+    uids: SortedKeys
+
+    def __init__(self, references_index: Dict[UID, References]):
+        reference_uids = defaultdict(list)
+        family_items = defaultdict(list)
+        uid_items = []
+        for uid, references in references_index.items():
+            uid_key = get_natural_key(uid)
+            reference_keys = sorted((get_natural_key(ref), ref) for ref in references)
+            for reference_key, reference in reference_keys:
+                reference_uids[reference].append(uid)
+                # Key of the number: ('pts-vp-pli', 3, '.', 1) -> ('', 3, '.', 1)
+                number_key = ("",) + reference_key[1:]
+                family_items[reference_key[0]].append((number_key, reference, uid))
+                uid_items.append((uid_key, uid, reference))
+
+        self.reference_uids = {k: tuple(v) for k, v in reference_uids.items()}
+        self.uid_references = references_index
+        self.families = {k: SortedKeys(items=v) for k, v in family_items.items()}
+        self.uids = SortedKeys(items=uid_items)
+        msg = "* [%s] Indexed '%s' references in '%s' families"
+        log.info(msg, self.__class__.__name__, len(self.uids), len(self.families))
+
+    @classmethod
+    def get_family(cls, reference: str) -> Tuple[str, str]:
+        """'pts-vp-pli3.1' -> ('pts-vp-pli', '3.1')"""
+        return cls.split_family.fullmatch(reference).groups()
+
+    def get_uids(self, reference: str) -> Tuple[UID, ...]:
+        """Segments citing exactly that reference, eg. 'nya120'."""
+        return self.reference_uids.get(reference, ())
+
+    def get_references(self, uid: UID, family: str = None) -> List[str]:
+        references = self.uid_references.get(uid, ())
+        if family is None:
+            return sorted(references, key=get_natural_key)
+        refs = (ref for ref in references if self.get_family(reference=ref)[0] == family)
+        return sorted(refs, key=get_natural_key)
+
+    def get_uids_in_range(self, start: str, end: Optional[str] = None) -> List[Tuple[str, UID]]:
+        """
+        (reference, uid) in reference order. Both ends are in the same family:
+        ('pts-vp-pli3') -> everything on page 3, ('pts-vp-pli3', 'pts-vp-pli5.2') -> pages 3-5.2
+        """
+        end = end or start
+        family, start_number = self.get_family(reference=start)
+        end_family, end_number = self.get_family(reference=end)
+        if family != end_family:
+            raise ValueError(f"Range '{start}'-'{end}' spans different families")
+        elif family not in self.families:
+            return []
+        return self.families[family].get_range(start=start_number, end=end_number)
+
+    def get_references_in_range(
+        self, start: str, end: Optional[str] = None, family: str = None
+    ) -> List[Tuple[UID, str]]:
+        """
+        (uid, reference) in segment order, optionally only of one family:
+        ('mn1:1.1', 'mn1:5.3', family='pts-vp-pli') -> PTS pages of these segments
+        """
+        items = self.uids.get_range(start=start, end=end or start)
+        if family is None:
+            return items
+        return [(uid, ref) for uid, ref in items if self.get_family(reference=ref)[0] == family]
@@ -0,0 +1,192 @@
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple
+
+import attr
+
+from sutta_processor.shared.profiler import profiler
+
+log = logging.getLogger(__name__)
+
+# {thread id: [(handler, record), ...]} of the threads running scheduled tasks
+_TASK_RECORDS: Dict[int, List[Tuple[logging.Handler, logging.LogRecord]]] = {}
+
+
+class TaskLogFilter(logging.Filter):
+    """
+    Holds back records logged by the task threads, for the handler it's added to.
+    Findings are let through, FindingsHandler streams them as they are found.
+    """
+
+    def __init__(self, handler: logging.Handler):
+        super().__init__()
+        self.handler = handler
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        records = _TASK_RECORDS.get(threading.get_ident())
+        if records is None or hasattr(record, "finding"):
+            return True
+        records.append((self.handler, record))
+        return False
+
+
+@attr.s(auto_attribs=True)
+class Task:
+    name: str
+    run: Callable
+    # Names of the tasks that have to be done first
+    inputs: Tuple[str, ...] = ()
+    is_load: bool = False
+
+    start: float = 0.0
+    end: float = 0.0
+    records: list = attr.ib(factory=list, repr=False)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class CheckScheduler:
+    """
+    Runs aggregate loads and the checks that consume them, every check starts as soon
+    as its inputs are loaded.
+
+    Loads run one at a time (they share the repo, the scanner and the cache, and
+    parse in their own process pool with `load_workers`), checks run on a pool of
+    `workers` threads. Log records of every task are held back and emitted in the
+    order the tasks were added, so the report is the same for any number of workers.
+    Findings are not held back, they are written in the order they are found.
+    """
+
+    _RUN_INFO = "* [%s] Ran '%s' tasks in %.3fs with '%s' workers"
+    _TASK_INFO = "* [%s]   %-32s %8.3fs -> %8.3fs (%.3fs)"
+    _PATH_INFO = "* [%s] Critical path %.3fs: %s"
+
+    def __init__(self, workers: int = 1):
+        self.workers = max(1, workers or 1)
+        self.tasks: Dict[str, Task] = {}
+        self.start = 0.0
+
+    def add_load(self, name: str, load: Callable):
+        self._add(task=Task(name=name, run=load, is_load=True))
+
+    def add_check(self, name: str, check: Callable, inputs: Tuple[str, ...] = ()):
+        self._add(task=Task(name=name, run=check, inputs=tuple(inputs)))
+
+    def _add(self, task: Task):
+        if task.name in self.tasks:
+            raise ValueError(f"Task '{task.name}' is already added")
+        unknown = [name for name in task.inputs if name not in self.tasks]
+        if unknown:
+            raise ValueError(f"Inputs of '{task.name}' have to be added first: {unknown}")
+        self.tasks[task.name] = task
+
+    def run(self):
+        handlers = logging.getLogger().handlers
+        filters = [TaskLogFilter(handler=handler) for handler in handlers]
+        for handler, task_filter in zip(handlers, filters):
+            handler.addFilter(task_filter)
+        self.start = time.perf_counter()
+        try:
+            self._run()
+        finally:
+            for handler, task_filter in zip(handlers, filters):
+                handler.removeFilter(task_filter)
+        self.log_summary(end=time.perf_counter())
+
+    def _run(self):
+        pending = list(self.tasks.values())
+        done = set()
+        running: Dict[Future, Task] = {}
+        emitted = 0
+        error: Optional[BaseException] = None
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while pending or running:
+                is_loading = any(task.is_load for task in running.values())
+                for task in list(pending):
+                    if error or not done.issuperset(task.inputs):
+                        continue
+                    elif task.is_load and is_loading:
+                        continue
+                    is_loading = is_loading or task.is_load
+                    pending.remove(task)
+                    running[executor.submit(self.run_task, task)] = task
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    task = running.pop(future)
+                    if future.exception() is None:
+                        done.add(task.name)
+                    elif error is None:
+                        error = future.exception()
+                emitted = self.emit(emitted=emitted, done=done)
+        if error is not None:
+            # Give whatever was found before the failure
+            for task in list(self.tasks.values())[emitted:]:
+                self.replay(task=task)
+            raise error
+
+    def run_task(self, task: Task):
+        _TASK_RECORDS[threading.get_ident()] = task.records
+        task.start = time.perf_counter()
+        try:
+            kind = "load_task" if task.is_load else "check_task"
+            with profiler.measure(kind=kind, name=task.name):
+                task.run()
+        finally:
+            task.end = time.perf_counter()
+            _TASK_RECORDS.pop(threading.get_ident(), None)
+
+    def emit(self, emitted: int, done: set) -> int:
+        """Emit records of the finished tasks, up to the first one that is not done."""
+        tasks = list(self.tasks.values())
+        while emitted < len(tasks) and tasks[emitted].name in done:
+            self.replay(task=tasks[emitted])
+            emitted += 1
+        return emitted
+
+    @classmethod
+    def replay(cls, task: Task):
+        for handler, record in task.records:
+            handler.handle(record)
+        task.records.clear()
+
+    def get_critical_path(self) -> Tuple[float, List[Task]]:
+        """
+        Longest chain of task durations along the inputs. Loads run one after another,
+        so every load waits also for the one before it.
+        """
+        loads = sorted((t for t in self.tasks.values() if t.is_load), key=lambda t: t.start)
+        waits_for = {task.name: list(task.inputs) for task in self.tasks.values()}
+        for load_before, load in zip(loads, loads[1:]):
+            waits_for[load.name].append(load_before.name)
+
+        path_time: Dict[str, float] = {}
+        previous: Dict[str, Optional[str]] = {}
+        for task in sorted(self.tasks.values(), key=lambda t: t.start):
+            before = max(waits_for[task.name], key=lambda n: path_time[n], default=None)
+            path_time[task.name] = task.duration + (path_time[before] if before else 0.0)
+            previous[task.name] = before
+        name = max(path_time, key=lambda n: path_time[n])
+        total = path_time[name]
+        path = []
+        while name:
+            path.append(self.tasks[name])
+            name = previous[name]
+        return total, path[::-1]
+
+    def log_summary(self, end: float):
+        name = self.__class__.__name__
+        log.info(self._RUN_INFO, name, len(self.tasks), end - self.start, self.workers)
+        for task in sorted(self.tasks.values(), key=lambda t: t.start):
+            label = f"load {task.name}" if task.is_load else task.name
+            start, task_end = task.start - self.start, task.end - self.start
+            log.info(self._TASK_INFO, name, label, start, task_end, task.duration)
+        path_time, path = self.get_critical_path()
+        chain = " -> ".join(f"{task.name} ({task.duration:.3f}s)" for task in path)
+        log.info(self._PATH_INFO, name, path_time, chain)
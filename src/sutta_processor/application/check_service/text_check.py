@@ -21,8 +21,9 @@ from sutta_processor.application.value_objects import (
 from sutta_processor.shared.exceptions import NoTokensError
 
 from ..domain_models.bilara_root.root import Verses
-from .base import ServiceBase
+from .base import ServiceBase, profiled_check
 from .bd_reference import SCReferenceService
+from .candidates import TokensCandidateIndex
 from .tokenizer import VersetTokenizer
 
 log = logging.getLogger(__name__)
@@ -39,7 +40,11 @@ class TextMatcher:
     # TODO: Check which ms_ids didn't found a match
     # TODO: Check which...
 
+    MATCH_RATIO = 0.7
+
     roots_uid_tokens_index: Dict[RootUID, RootUidTokens]
+    roots_uid_tokens: List[RootUidTokens]
+    candidate_index: TokensCandidateIndex
 
     def __init__(self, root: BilaraRootAggregate, pali: YuttaAggregate):
         def get_unmatched_root_index() -> Dict[RootUID, RootUidTokens]:
@@ -67,6 +72,11 @@ class TextMatcher:
         self.pali = pali
 
         self.roots_uid_tokens_index = get_unmatched_root_index()
+        self.roots_uid_tokens = list(self.roots_uid_tokens_index.values())
+        self.candidate_index = TokensCandidateIndex(
+            entries=[root_tokens.tokens for root_tokens in self.roots_uid_tokens],
+            threshold=self.MATCH_RATIO,
+        )
 
     def get_missing_root_text_from_ms(self) -> set:
 
@@ -74,14 +84,13 @@ class TextMatcher:
             # ms_id, verses = item  # type: MsId, YuttaVerses
             # if "ms25Cn_738" not in uids:
             #     continue
-            if i > 30:
-                break
             try:
                 self.process_yutta_verse(i=i, verses=verses)
             except Exception as e:
                 log.exception(e)
-        log.error("-" * 80)
-        log.error("-" * 80)
+        log.debug("-" * 80)
+        log.debug("-" * 80)
+        self.print_summary()
         return self.wrong_keys
 
     def process_yutta_verse(self, i: int, verses: YuttaVerses):
@@ -89,16 +98,20 @@ class TextMatcher:
             ratio_map = {}
             matcher = SequenceMatcher()
             matcher.set_seq1(verses.verse.tokens)
-            for root_tokens in self.roots_uid_tokens_index.values():
+            # Only root segments that can match are scored
+            candidates = self.candidate_index.get_candidates(tokens=verses.verse.tokens)
+            for candidate in candidates:
+                root_tokens = self.roots_uid_tokens[candidate]
                 matcher.set_seq2(root_tokens.tokens)
                 ratio = matcher.quick_ratio()
-                if ratio > 0.7:
+                if ratio > self.MATCH_RATIO:
                     omg = "Ratio for yt: '%s' root: '%s', ratio: %s"
-                    log.error(omg, verses.ms_id, root_tokens.uid, ratio)
+                    log.debug(omg, verses.ms_id, root_tokens.uid, ratio)
                     ratio_map[root_tokens.uid] = ratio
             if not ratio_map:
+                self.c["error"] += 1
                 omg = "Couldn't find a match ms_uid: '%s' tokes: %s"
-                log.error(omg, verses.ms_id, verses.verse.tokens)
+                log.debug(omg, verses.ms_id, verses.verse.tokens)
             return ratio_map
 
         self.ratios: Dict[MsId, Dict[RootUID, float]] = defaultdict(dict)
@@ -127,10 +140,19 @@ class TextMatcher:
 class CheckText(ServiceBase):
     reference: SCReferenceService
 
-    def __init__(self, cfg):
+    def __init__(self, cfg, reference: SCReferenceService = None):
         super().__init__(cfg=cfg)
-        self.reference = SCReferenceService(cfg=cfg)
+        self.reference = reference or SCReferenceService(cfg=cfg)
+
+    def release(self, root: BilaraRootAggregate, pali: YuttaAggregate):
+        """
+        Drop tokens and text indexes the checks built on the aggregates. Text checks
+        share them, call it once after the last one.
+        """
+        root.release_text_index()
+        pali.release_text_index()
 
+    @profiled_check
     def get_missing_text(
         self, root: BilaraRootAggregate, pali: YuttaAggregate
     ) -> Set[UID]:
@@ -210,12 +232,13 @@ class CheckText(ServiceBase):
             )
         return wrong_keys
 
+    @profiled_check
     def get_missing_root_text_from_ms(
         self, root: BilaraRootAggregate, pali: YuttaAggregate
     ):
-        result = TextMatcher(root=root, pali=pali).get_missing_root_text_from_ms()
-        return result
+        return TextMatcher(root=root, pali=pali).get_missing_root_text_from_ms()
 
+    @profiled_check
     def get_missing_text_ms_source(
         self, root: BilaraRootAggregate, pali: YuttaAggregate
     ) -> Set[UID]:
@@ -1,7 +1,7 @@
 import logging
 from typing import Optional
 
-from sutta_processor.application.check_service.base import ServiceBase
+from sutta_processor.application.check_service.base import ServiceBase, profiled_check
 from sutta_processor.application.domain_models import (
     BilaraHtmlAggregate,
     BilaraReferenceAggregate,
@@ -22,6 +22,7 @@ class UidRenumber(ServiceBase):
     bilara: BilaraRootAggregate
     html: BilaraHtmlAggregate
 
+    @profiled_check
     def fix_missing_tassudanam(self):
         for file_aggregate in self.bilara.file_aggregates:
             self.process_file_aggregate(file_aggregate=file_aggregate)
@@ -45,7 +46,7 @@ class UidRenumber(ServiceBase):
             for uid, verses in html_f_aggregate.index.items():
                 if uid == next_uid:
                     verse = HtmlVerses(
-                        raw_uid=foo_uid_to_replace,
+                        uid=foo_uid_to_replace,
                         verse="<p class='uddana-intro'>{}</p>",
                     )
                     prev_verse = new_index.pop(prev_uid)
@@ -1,36 +1,41 @@
 import json
 import logging
-import os
 import pprint
 from abc import ABC, abstractmethod
 from collections import Counter
 from copy import deepcopy
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
 import attr
 from natsort import natsorted, ns
 
-from sutta_processor.application.value_objects import UID, RawUID, Verse
+from sutta_processor.application.domain_models.loader import (
+    FileAggregateLoader,
+    LoadResult,
+)
+from sutta_processor.application.value_objects import UID, Verse
 from sutta_processor.application.value_objects.verse import VerseTokens
 from sutta_processor.shared.exceptions import (
     NoTokensError,
     SegmentIdError,
     SkipFileError,
 )
+from sutta_processor.shared.findings import findings
+from sutta_processor.shared.profiler import profiler
 
 log = logging.getLogger(__name__)
 
 
-@attr.s(frozen=True, auto_attribs=True)
+@attr.s(frozen=True, auto_attribs=True, slots=True)
 class BaseVerses(ABC):
-    uid: UID = attr.ib(converter=UID, init=False)
-    verse: Verse = attr.ib(converter=Verse)
+    """
+    One record per segment, so subclasses have to keep `slots=True`, to avoid
+    the `__dict__` of every instance.
+    """
 
-    raw_uid: RawUID = attr.ib(converter=RawUID)
-
-    def __attrs_post_init__(self):
-        object.__setattr__(self, "uid", UID(self.raw_uid))
+    uid: UID = attr.ib(converter=UID)
+    verse: Verse = attr.ib(converter=Verse)
 
 
 @attr.s(frozen=True, auto_attribs=True)
@@ -42,6 +47,8 @@ class BaseFileAggregate(ABC):
     f_pth: Path
     verses_class = BaseVerses
 
+    _LOST_ENTRIES = "Lost '%s' entries during domain model conversion: %s"
+
     @classmethod
     @abstractmethod
     def from_dict(cls, in_dto: dict, f_pth: Path):
@@ -53,22 +60,27 @@ class BaseFileAggregate(ABC):
         errors = {}
         for k, v in in_dto.items():
             try:
-                mn = cls.verses_class(raw_uid=k, verse=v)
+                mn = cls.verses_class(uid=k, verse=v)
                 index[mn.uid] = mn
             except SegmentIdError as e:
                 log.trace(e)
                 errors[k] = v
-        if not (len(in_dto) == len(index)):
-            diff = in_dto.keys() - index.keys()
-            msg = "Lost '%s' entries during domain model conversion: %s"
-            log.error(msg, len(diff), diff)
         return index, errors
 
+    def log_lost_entries(self):
+        """Conversion report, given when the file is merged, wherever it was parsed."""
+        if self.errors:
+            log.error(self._LOST_ENTRIES, len(self.errors), set(self.errors))
+
     @classmethod
     def from_file(cls, f_pth: Path) -> "BaseFileAggregate":
-        with open(f_pth) as f:
-            data = json.load(f)
-        return cls.from_dict(in_dto=data, f_pth=f_pth)
+        with profiler.measure(kind="load", name=f"{cls.__name__}.json_load"):
+            with open(f_pth) as f:
+                data = json.load(f)
+        with profiler.measure(kind="load", name=f"{cls.__name__}.from_dict") as measurement:
+            file_aggregate = cls.from_dict(in_dto=data, f_pth=f_pth)
+            measurement.items = len(data)
+        return file_aggregate
 
     def _replace_index(self, index: Dict[UID, BaseVerses]):
         """
@@ -126,6 +138,14 @@ class TextCompareMixin:
             object.__setattr__(self, "_text_head_index", get_head_index())
         return self._text_head_index
 
+    def release_text_index(self):
+        """Drop text indexes and tokens cached by verses, they are built again on use."""
+        object.__setattr__(self, "_text_index", None)
+        object.__setattr__(self, "_text_head_index", None)
+        for verses in self.index.values():
+            if isinstance(verses, BaseVerses):
+                verses.verse.release_tokens()
+
 
 @attr.s(frozen=True, auto_attribs=True)
 class BaseRootAggregate(ABC, TextCompareMixin):
@@ -139,26 +159,41 @@ class BaseRootAggregate(ABC, TextCompareMixin):
     _ERR_MSG = "Lost data, some indexes were duplicated after merging file: '{f_pth}'"
 
     @classmethod
-    def _file_paths_from_dir(cls, exclude_dirs: List[Path], root_pth: Path) -> List[Path]:
-        """A helper function to get the paths to files contained in the root_path directory."""
-        temp_files = []
-        for root_dir, sub_dirs, dir_files in os.walk(root_pth):
-            sub_dirs[:] = [d for d in sub_dirs if d not in exclude_dirs]
-            temp_files.extend([Path(root_dir + '/' + file) for file in dir_files])
-
-        return temp_files
+    def _file_aggregates_from_files(
+        cls, all_files: List[Path], file_aggregate_cls, loader: FileAggregateLoader = None
+    ) -> Tuple[tuple, dict, dict]:
+        """
+        Files can be parsed by the loader in any way, but they are always merged here,
+        one by one in the all_files order.
+        """
+        with profiler.measure(kind="aggregate", name=cls.name()) as measurement:
+            file_aggregates, index, errors = cls._merge_file_aggregates(
+                all_files=all_files, file_aggregate_cls=file_aggregate_cls, loader=loader
+            )
+            measurement.items = sum(len(f.index) for f in file_aggregates)
+        return file_aggregates, index, errors
 
     @classmethod
-    def _file_aggregates_from_files(cls, all_files: List[Path], file_aggregate_cls) -> Tuple[tuple, dict, dict]:
+    def _merge_file_aggregates(
+        cls, all_files: List[Path], file_aggregate_cls, loader: FileAggregateLoader = None
+    ) -> Tuple[tuple, dict, dict]:
+        loader = loader or FileAggregateLoader()
         file_aggregates = []
         index = {}
         errors = {}
+        update_name = f"{cls.name()}._update_index"
 
         c: Counter = Counter(ok=0, error=0, all=len(all_files))
-        for i, f_pth in enumerate(all_files):  # type: int, Path
+        loaded = loader.load(all_files=all_files, file_aggregate_cls=file_aggregate_cls)
+        for i, (f_pth, result) in enumerate(loaded):  # type: int, (Path, LoadResult)
             try:
-                file_aggregate = file_aggregate_cls.from_file(f_pth=f_pth)
-                cls._update_index(index=index, file_aggregate=file_aggregate)
+                if isinstance(result, Exception):
+                    raise result
+                file_aggregate = result
+                file_aggregate.log_lost_entries()
+                with profiler.measure(kind="load", name=update_name) as measurement:
+                    cls._update_index(index=index, file_aggregate=file_aggregate)
+                    measurement.items = len(file_aggregate.index)
                 errors.update(file_aggregate.errors)
                 file_aggregates.append(file_aggregate)
                 c["ok"] += 1
@@ -170,6 +205,7 @@ class BaseRootAggregate(ABC, TextCompareMixin):
             log.trace("Processing file: %s/%s", i, c["all"])
         ratio = (c["error"] / c["all"]) * 100 if c["all"] else 0
         log.info(cls._PROCESS_INFO, cls.name(), c["all"], c["ok"], c["error"], ratio)
+        UID.intern_table.log_stats(name=cls.name())
 
         return tuple(file_aggregates), index, errors
 
@@ -179,19 +215,16 @@ class BaseRootAggregate(ABC, TextCompareMixin):
         exclude_dirs: List[Path],
         root_pth: Path,
         file_aggregate_cls,
+        loader: FileAggregateLoader = None,
     ) -> Tuple[tuple, dict, dict]:
         """This function operates at the directory level, meaning it will get all files in the root_path directory."""
 
-        temp_files = cls._file_paths_from_dir(exclude_dirs=exclude_dirs, root_pth=root_pth)
-
-        all_files = natsorted(temp_files, alg=ns.PATH)
+        loader = loader or FileAggregateLoader()
+        all_files = loader.get_files(root_pths=[root_pth], exclude_dirs=exclude_dirs)
         file_aggregates, index, errors = cls._file_aggregates_from_files(
-            all_files=all_files, file_aggregate_cls=file_aggregate_cls
+            all_files=all_files, file_aggregate_cls=file_aggregate_cls, loader=loader
         )
-        if errors:
-            msg = "[%s] There are '%s' wrong ids: \n%s"
-            keys = pprint.pformat(sorted(errors.keys()))
-            log.error(msg, cls.name(), len(errors), keys)
+        cls.log_wrong_ids(file_aggregates=file_aggregates, errors=errors)
 
         return tuple(file_aggregates), index, errors
 
@@ -209,39 +242,32 @@ class BaseRootAggregate(ABC, TextCompareMixin):
 
     @classmethod
     def _from_file_paths(cls, exclude_dirs: List[Path], file_paths: List[Path],
-                         file_aggregate_cls) -> Tuple[tuple, dict, dict]:
+                         file_aggregate_cls, loader: FileAggregateLoader = None) -> Tuple[tuple, dict, dict]:
         """This function only operates on the files contained in file_paths, as opposed to all files in a directory,
         as is done by _from_path. This was added to allow running tests exclusively on files changed as part of a
         commit, instead of all files in a commit."""
-        file_aggregates = []
-        index = {}
-        errors = {}
-
         filtered_files = cls._filter_exclude_dirs(exclude_dirs=exclude_dirs, file_paths=file_paths)
 
         all_files = natsorted(filtered_files, alg=ns.PATH)
-        c: Counter = Counter(ok=0, error=0, all=len(all_files))
-        for i, f_pth in enumerate(all_files):  # type: int, Path
-            try:
-                file_aggregate = file_aggregate_cls.from_file(f_pth=f_pth)
-                cls._update_index(index=index, file_aggregate=file_aggregate)
-                errors.update(file_aggregate.errors)
-                file_aggregates.append(file_aggregate)
-                c["ok"] += 1
-            except SkipFileError:
-                c["all"] -= 1
-            except Exception as e:
-                log.warning("Error processing: %s, file: '%s', ", e, f_pth)
-                c["error"] += 1
-            log.trace("Processing file: %s/%s", i, c["all"])
-        ratio = (c["error"] / c["all"]) * 100 if c["all"] else 0
-        log.info(cls._PROCESS_INFO, cls.name(), c["all"], c["ok"], c["error"], ratio)
-        if errors:
-            msg = "[%s] There are '%s' wrong ids: \n%s"
-            keys = pprint.pformat(sorted(errors.keys()))
-            log.error(msg, cls.name(), len(errors), keys)
+        file_aggregates, index, errors = cls._file_aggregates_from_files(
+            all_files=all_files, file_aggregate_cls=file_aggregate_cls, loader=loader
+        )
+        cls.log_wrong_ids(file_aggregates=file_aggregates, errors=errors)
         return tuple(file_aggregates), index, errors
 
+    @classmethod
+    def log_wrong_ids(cls, file_aggregates: Tuple[BaseFileAggregate], errors: dict):
+        if not errors:
+            return
+        msg = "[%s] There are '%s' wrong ids: \n%s"
+        keys = pprint.pformat(sorted(errors.keys()))
+        log.error(msg, cls.name(), len(errors), keys)
+        for file_aggregate in file_aggregates:
+            for key in file_aggregate.errors:
+                findings.add(
+                    check=cls.name(), message="Wrong id", uid=key, file=file_aggregate.f_pth
+                )
+
     @classmethod
     def _update_index(cls, index: dict, file_aggregate: BaseFileAggregate):
         len_before = len(index)
@@ -250,6 +276,19 @@ class BaseRootAggregate(ABC, TextCompareMixin):
         if len_after - len_before != len(file_aggregate.index):
             raise RuntimeError(cls._ERR_MSG.format(f_pth=file_aggregate.f_pth))
 
+    def get_file(self, uid: UID, lang: str = None) -> Optional[Path]:
+        """File of the text the uid belongs to, files are mapped by the text on first use."""
+        if getattr(self, "_text_files", None) is None:
+            object.__setattr__(self, "_text_files", self._get_text_files())
+        return self._text_files.get((lang, uid.partition(":")[0]))
+
+    def _get_text_files(self) -> Dict[Tuple[Optional[str], str], Path]:
+        text_files = {}
+        for file_aggregate in self.file_aggregates:
+            for uid in file_aggregate.index:
+                text_files.setdefault((None, uid.partition(":")[0]), file_aggregate.f_pth)
+        return text_files
+
     @classmethod
     def name(cls) -> str:
         return cls.__name__
@@ -9,11 +9,12 @@ from sutta_processor.application.domain_models.base import (
     BaseRootAggregate,
     BaseVerses,
 )
+from sutta_processor.application.domain_models.loader import FileAggregateLoader
 
 log = logging.getLogger(__name__)
 
 
-@attr.s(frozen=True, auto_attribs=True)
+@attr.s(frozen=True, auto_attribs=True, slots=True)
 class CommentVerses(BaseVerses):
     pass
 
@@ -31,21 +32,26 @@ class BilaraCommentFileAggregate(BaseFileAggregate):
 @attr.s(frozen=True, auto_attribs=True, str=False)
 class BilaraCommentAggregate(BaseRootAggregate):
     @classmethod
-    def from_path(cls, exclude_dirs: List[Path], root_pth: Path) -> "BilaraCommentAggregate":
+    def from_path(
+        cls, exclude_dirs: List[Path], root_pth: Path, loader: FileAggregateLoader = None
+    ) -> "BilaraCommentAggregate":
         file_aggregates, index, errors = cls._from_path(
             exclude_dirs=exclude_dirs,
             root_pth=root_pth,
             file_aggregate_cls=BilaraCommentFileAggregate,
+            loader=loader,
         )
         log.info(cls._LOAD_INFO, cls.__name__, len(index))
         return cls(file_aggregates=tuple(file_aggregates), index=index)
 
     @classmethod
-    def from_file_paths(cls, exclude_dirs: List[Path], file_paths: List[Path]) -> "BilaraCommentAggregate":
+    def from_file_paths(cls, exclude_dirs: List[Path], file_paths: List[Path],
+                        loader: FileAggregateLoader = None) -> "BilaraCommentAggregate":
         file_aggregates, index, errors = cls._from_file_paths(
             exclude_dirs=exclude_dirs,
             file_paths=file_paths,
             file_aggregate_cls=BilaraCommentFileAggregate,
+            loader=loader,
         )
         log.info(cls._LOAD_INFO, cls.__name__, len(index))
         return cls(file_aggregates=tuple(file_aggregates), index=index)
\ No newline at end of file
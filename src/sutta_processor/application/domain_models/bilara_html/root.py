@@ -9,12 +9,13 @@ from sutta_processor.application.domain_models.base import (
     BaseRootAggregate,
     BaseVerses,
 )
+from sutta_processor.application.domain_models.loader import FileAggregateLoader
 from sutta_processor.application.value_objects import UID, HtmlVerse
 
 log = logging.getLogger(__name__)
 
 
-@attr.s(frozen=True, auto_attribs=True)
+@attr.s(frozen=True, auto_attribs=True, slots=True)
 class HtmlVerses(BaseVerses):
     verse: HtmlVerse = attr.ib(converter=HtmlVerse)
 
@@ -39,11 +40,14 @@ class BilaraHtmlAggregate(BaseRootAggregate):
     _ERR_MSG = "Lost data, some indexes were duplicated after merging file: '{f_pth}'"
 
     @classmethod
-    def from_path(cls, exclude_dirs: List[Path], root_pth: Path) -> "BilaraHtmlAggregate":
+    def from_path(
+        cls, exclude_dirs: List[Path], root_pth: Path, loader: FileAggregateLoader = None
+    ) -> "BilaraHtmlAggregate":
         file_aggregates, index, errors = cls._from_path(
             exclude_dirs=exclude_dirs,
             root_pth=root_pth,
             file_aggregate_cls=BilaraHtmlFileAggregate,
+            loader=loader,
         )
         log.info(cls._LOAD_INFO, cls.__name__, len(index))
         file_index = {
@@ -57,12 +61,14 @@ class BilaraHtmlAggregate(BaseRootAggregate):
         return cls(file_aggregates=file_aggregates, index=index, file_index=file_index)
 
     @classmethod
-    def from_file_paths(cls, exclude_dirs: List[Path], file_paths: List[Path]) -> "BilaraHtmlAggregate":
+    def from_file_paths(cls, exclude_dirs: List[Path], file_paths: List[Path],
+                        loader: FileAggregateLoader = None) -> "BilaraHtmlAggregate":
         """A version of the from_path function that works on a list of files as a pathlib.Path obect."""
         file_aggregates, index, errors = cls._from_file_paths(
             exclude_dirs=exclude_dirs,
             file_paths=file_paths,
             file_aggregate_cls=BilaraHtmlFileAggregate,
+            loader=loader,
         )
         log.info(cls._LOAD_INFO, cls.__name__, len(index))
         file_index = {
@@ -10,22 +10,18 @@ from sutta_processor.application.domain_models.base import (
     BaseRootAggregate,
     BaseVerses,
 )
-from sutta_processor.application.value_objects import UID, References, Verse
+from sutta_processor.application.domain_models.loader import FileAggregateLoader
+from sutta_processor.application.value_objects import UID, References
 
 log = logging.getLogger(__name__)
 
 
-@attr.s(frozen=True, auto_attribs=True)
+@attr.s(frozen=True, auto_attribs=True, slots=True)
 class ReferenceVerses(BaseVerses):
-    uid: UID = attr.ib(init=False)
-    verse: Verse
-
     references: References = attr.ib(init=False)
 
     def __attrs_post_init__(self):
         object.__setattr__(self, "references", References(self.verse))
-        object.__setattr__(self, "verse", Verse(self.verse))
-        object.__setattr__(self, "uid", UID(self.raw_uid))
 
 
 @attr.s(frozen=True, auto_attribs=True)
@@ -55,21 +51,26 @@ class BilaraReferenceAggregate(BaseRootAggregate):
     index: Dict[UID, ReferenceVerses]
 
     @classmethod
-    def from_path(cls, exclude_dirs: List[Path], root_pth: Path) -> "BilaraReferenceAggregate":
+    def from_path(
+        cls, exclude_dirs: List[Path], root_pth: Path, loader: FileAggregateLoader = None
+    ) -> "BilaraReferenceAggregate":
         file_aggregates, index, errors = cls._from_path(
             exclude_dirs=exclude_dirs,
             root_pth=root_pth,
             file_aggregate_cls=BilaraReferenceFileAggregate,
+            loader=loader,
         )
         log.info(cls._LOAD_INFO, cls.__name__, len(index))
         return cls(file_aggregates=tuple(file_aggregates), index=index)
 
     @classmethod
-    def from_file_paths(cls, exclude_dirs: List[Path], file_paths: List[Path]) -> "BilaraReferenceAggregate":
+    def from_file_paths(cls, exclude_dirs: List[Path], file_paths: List[Path],
+                        loader: FileAggregateLoader = None) -> "BilaraReferenceAggregate":
         file_aggregates, index, errors = cls._from_file_paths(
             exclude_dirs=exclude_dirs,
             file_paths=file_paths,
             file_aggregate_cls=BilaraReferenceFileAggregate,
+            loader=loader,
         )
         log.info(cls._LOAD_INFO, cls.__name__, len(index))
         return cls(file_aggregates=tuple(file_aggregates), index=index)
\ No newline at end of file
@@ -1,6 +1,6 @@
 import logging
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import attr
 
@@ -9,12 +9,13 @@ from sutta_processor.application.domain_models.base import (
     BaseRootAggregate,
     BaseVerses,
 )
+from sutta_processor.application.domain_models.loader import FileAggregateLoader
 from sutta_processor.application.value_objects import UID
 
 log = logging.getLogger(__name__)
 
 
-@attr.s(frozen=True, auto_attribs=True)
+@attr.s(frozen=True, auto_attribs=True, slots=True)
 class TranslationVerses(BaseVerses):
     pass
 
@@ -35,13 +36,17 @@ class BilaraTranslationAggregate(BaseRootAggregate):
     file_aggregates: Tuple[BilaraTranslationFileAggregate]
 
     _ERR_MSG = "Lost data, some indexes were duplicated after merging file: '{f_pth}'"
+    LANGS = {"cs", "de", "en", "id", "jpn", "my", "pl", "pt", "vi"}
 
     @classmethod
-    def from_path(cls, exclude_dirs: List[Path], root_pth: Path) -> "BilaraCommentAggregate":
+    def from_path(
+        cls, exclude_dirs: List[Path], root_pth: Path, loader: FileAggregateLoader = None
+    ) -> "BilaraCommentAggregate":
         file_aggregates, index, errors = cls._from_path(
             exclude_dirs=exclude_dirs,
             root_pth=root_pth,
             file_aggregate_cls=BilaraTranslationFileAggregate,
+            loader=loader,
         )
         length = 0
         for lang_dict in index.values():
@@ -50,11 +55,13 @@ class BilaraTranslationAggregate(BaseRootAggregate):
         return cls(file_aggregates=file_aggregates, index=index)
 
     @classmethod
-    def from_file_paths(cls, exclude_dirs: List[Path], file_paths: List[Path]) -> "BilaraCommentAggregate":
+    def from_file_paths(cls, exclude_dirs: List[Path], file_paths: List[Path],
+                        loader: FileAggregateLoader = None) -> "BilaraCommentAggregate":
         file_aggregates, index, errors = cls._from_file_paths(
             exclude_dirs=exclude_dirs,
             file_paths=file_paths,
             file_aggregate_cls=BilaraTranslationFileAggregate,
+            loader=loader,
         )
         length = 0
         for lang_dict in index.values():
@@ -63,14 +70,15 @@ class BilaraTranslationAggregate(BaseRootAggregate):
         return cls(file_aggregates=file_aggregates, index=index)
 
     @classmethod
-    def _update_index(cls, index: dict, file_aggregate):
-        def get_lang() -> str:
-            for part in file_aggregate.f_pth.parts:
-                if part in {'cs', 'de', 'en', 'id', 'jpn', 'my', 'pl', 'pt', 'vi'}:
-                    return part
-            raise RuntimeError('No language detected')
+    def get_lang(cls, f_pth: Path) -> str:
+        for part in f_pth.parts:
+            if part in cls.LANGS:
+                return part
+        raise RuntimeError('No language detected')
 
-        lang = get_lang()
+    @classmethod
+    def _update_index(cls, index: dict, file_aggregate):
+        lang = cls.get_lang(f_pth=file_aggregate.f_pth)
         lang_index = index.get(lang, {})
         if not lang_index:
             index[lang] = lang_index
@@ -80,6 +88,14 @@ class BilaraTranslationAggregate(BaseRootAggregate):
         if len_after - len_before != len(file_aggregate.index):
             raise RuntimeError(cls._ERR_MSG.format(f_pth=file_aggregate.f_pth))
 
+    def _get_text_files(self) -> Dict[Tuple[Optional[str], str], Path]:
+        text_files = {}
+        for file_aggregate in self.file_aggregates:
+            lang = self.get_lang(f_pth=file_aggregate.f_pth)
+            for uid in file_aggregate.index:
+                text_files.setdefault((lang, uid.partition(":")[0]), file_aggregate.f_pth)
+        return text_files
+
     def __str__(self):
         length = 0
         for lang_dict in self.index.values():
@@ -0,0 +1,132 @@
+import logging
+import multiprocessing
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Iterator, List, Tuple, Union
+
+from sutta_processor.application.domain_models.scanner import CorpusScanner
+from sutta_processor.shared.config import Logging
+
+log = logging.getLogger(__name__)
+
+LoadResult = Union["BaseFileAggregate", Exception]
+
+
+def _load_file(file_aggregate_cls, f_pth: Path) -> LoadResult:
+    """
+    Exceptions are returned instead of raised, so that the merging side can handle
+    them in the file order, the same way as when loading in a single process.
+    """
+    try:
+        return file_aggregate_cls.from_file(f_pth=f_pth)
+    except Exception as e:
+        return e
+
+
+def _load_file_in_worker(file_aggregate_cls, f_pth: Path) -> LoadResult:
+    result = _load_file(file_aggregate_cls=file_aggregate_cls, f_pth=f_pth)
+    if isinstance(result, Exception):
+        try:
+            pickle.dumps(result)
+        except Exception:
+            # Not every exception can travel back from the worker
+            result = RuntimeError(str(result))
+    return result
+
+
+class FileAggregateLoader:
+    """
+    Turn list of (natsorted) file paths into file aggregates.
+
+    File lists come from the shared `scanner`, so the corpus is walked only once.
+
+    With `workers > 1` files are parsed in a process pool. With `cache` only files
+    that are not in the cache (or were changed) are parsed, the rest is taken from
+    the cache. Results are always returned in the order of the input paths, so
+    merging them into the root aggregate gives the same index as the serial load.
+
+    Workers are not forked from the loading process: run_all_checks loads next to
+    the check threads, and a fork would copy the locks they hold. They don't log,
+    the merging side reports what was lost in the conversion.
+    """
+
+    CHUNKS_PER_WORKER = 4
+    START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+    def __init__(
+        self,
+        workers: int = 1,
+        cache: "FileAggregateCache" = None,
+        scanner: CorpusScanner = None,
+    ):
+        self.workers = max(1, workers or 1)
+        self.cache = cache
+        self.scanner = scanner
+
+    @classmethod
+    def get_mp_context(cls):
+        context = multiprocessing.get_context(cls.START_METHOD)
+        if cls.START_METHOD == "forkserver":
+            # Workers are forked from the server with the aggregates already imported
+            context.set_forkserver_preload(["sutta_processor.application.domain_models"])
+        return context
+
+    def get_files(self, root_pths: List[Path], exclude_dirs: List[str]) -> List[Path]:
+        """Natsorted paths of all the files under the root_pths."""
+        scanner = self.scanner or CorpusScanner(trees={}, exclude_dirs=exclude_dirs)
+        return scanner.get_paths(root_pths=root_pths)
+
+    def load(
+        self, all_files: List[Path], file_aggregate_cls
+    ) -> Iterator[Tuple[Path, LoadResult]]:
+        if self.cache is None:
+            yield from self.parse(all_files=all_files, file_aggregate_cls=file_aggregate_cls)
+            return
+
+        cached = {}
+        for f_pth in all_files:
+            st = self.scanner and self.scanner.stat(f_pth=f_pth)
+            file_aggregate = self.cache.get(
+                f_pth=f_pth, file_aggregate_cls=file_aggregate_cls, st=st
+            )
+            if file_aggregate is not None:
+                cached[f_pth] = file_aggregate
+        self.cache.log_stats(name=file_aggregate_cls.__name__)
+
+        changed_files = [f_pth for f_pth in all_files if f_pth not in cached]
+        parsed = self.parse(all_files=changed_files, file_aggregate_cls=file_aggregate_cls)
+        for f_pth in all_files:
+            if f_pth in cached:
+                yield f_pth, cached[f_pth]
+                continue
+            _, result = next(parsed)
+            if not isinstance(result, Exception):
+                st = self.scanner and self.scanner.stat(f_pth=f_pth)
+                self.cache.put(f_pth=f_pth, file_aggregate=result, st=st)
+            yield f_pth, result
+
+    def parse(
+        self, all_files: List[Path], file_aggregate_cls
+    ) -> Iterator[Tuple[Path, LoadResult]]:
+        if self.workers == 1 or len(all_files) < 2:
+            for f_pth in all_files:
+                yield f_pth, _load_file(file_aggregate_cls=file_aggregate_cls, f_pth=f_pth)
+            return
+
+        chunksize = max(1, len(all_files) // (self.workers * self.CHUNKS_PER_WORKER))
+        log.debug(
+            "Loading '%s' files with '%s' workers, chunksize: %s",
+            len(all_files),
+            self.workers,
+            chunksize,
+        )
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=self.get_mp_context(),
+            initializer=Logging.add_trace_level,
+        ) as executor:
+            load = partial(_load_file_in_worker, file_aggregate_cls)
+            results = executor.map(load, all_files, chunksize=chunksize)
+            yield from zip(all_files, results)
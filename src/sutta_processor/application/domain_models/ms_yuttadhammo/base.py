@@ -6,6 +6,7 @@ import attr
 from lxml.etree import _Element
 
 from sutta_processor.application.value_objects import MsId, MsVerse
+from sutta_processor.shared.profiler import profiler
 
 from ..base import BaseFileAggregate, BaseVerses
 from .extractors import YuttaExtractor
@@ -13,14 +14,12 @@ from .extractors import YuttaExtractor
 log = logging.getLogger(__name__)
 
 
-@attr.s(frozen=True, auto_attribs=True)
+@attr.s(frozen=True, auto_attribs=True, slots=True)
 class YuttaVerses(BaseVerses):
-    ms_id: MsId
+    # Yuttadhammo segments are indexed by ms_id only
+    uid: None = attr.ib(init=False, default=None)
     verse: MsVerse = attr.ib(converter=MsVerse)
-    raw_uid: None = attr.ib(init=False, default=None)
-
-    def __attrs_post_init__(self):
-        pass
+    ms_id: MsId
 
 
 @attr.s(frozen=True, auto_attribs=True)
@@ -40,14 +39,18 @@ class YuttaFileAggregate(BaseFileAggregate):
         """
         :param f_pth: Must be path to cleaned html file
         """
-        raw_html = cls.get_raw_source(f_pth=f_pth)
-        page = cls.extractor.get_page_from_html(html=raw_html)
-        index: Dict[MsId, YuttaVerses] = cls.get_index(page=page)
-
+        with profiler.measure(kind="load", name=f"{cls.__name__}.parse_html"):
+            raw_html = cls.get_raw_source(f_pth=f_pth)
+            page = cls.extractor.get_page_from_html(html=raw_html)
+        with profiler.measure(kind="load", name=f"{cls.__name__}.get_index") as measurement:
+            index: Dict[MsId, YuttaVerses] = cls.get_index(page=page)
+            measurement.items = len(index)
+
+        # Only the verses are kept, the source html is not needed after extraction
         kwargs = {
             "f_pth": f_pth,
             "index": index,
-            "raw_html": raw_html,
+            "raw_html": "",
             "raw_xml": "",
             "versets": tuple(index.values()),
             "errors": tuple(),
@@ -20,31 +20,29 @@ class YuttaExtractor:
         html: str = data.xpath(".//text()")[0]
         return html
 
-    @classmethod
-    def get_page_from_html(cls, html: str) -> _Element:
-        first_letter_regex = '<span class="firstLetter">.<\/span>'
-        first_letter_spans = re.findall(first_letter_regex, html)
-
-        for first_letter_span in first_letter_spans:
-            letter = first_letter_span[26:-7]
-            html = html.replace(first_letter_span, letter, 1)
-
-        quoted_text_regex = '<span class="gathaQuote">.+?(?=>)>'
-        quoted_text_spans = re.findall(quoted_text_regex, html)
-
-        for quoted_text_span in quoted_text_spans:
-            quoted_text = quoted_text_span[25:-7]
-            html = html.replace(quoted_text_span, quoted_text, 1)
+    # All unwrapped spans in one pattern, so the document is scanned once. Nested spans
+    # (eg. gathaQuote inside of bold) are unwrapped from the inside, in the next scan.
+    span_regex = re.compile(
+        r'<span class="firstLetter">(?P<letter>.)</span>'
+        r'|<span class="(?:gathaQuote|bold)">(?P<text>[^<>\n]+?)</span>'
+    )
 
-        bold_text_regex = '<span class="bold">.+?(?=>)>'
-        bold_text_spans = re.findall(bold_text_regex, html)
+    @classmethod
+    def unwrap_span(cls, match) -> str:
+        letter = match.group("letter")
+        return letter if letter is not None else match.group("text")
 
-        for bold_text_span in bold_text_spans:
-            #print(html)
-            bold_text = bold_text_span[19:-7]
-            html = html.replace(bold_text_span, bold_text, 1)
-            #print(html)
+    @classmethod
+    def unwrap_spans(cls, html: str) -> str:
+        """Replace firstLetter, gathaQuote and bold spans with their text."""
+        count = 1
+        while count:
+            html, count = cls.span_regex.subn(cls.unwrap_span, html)
+        return html
 
+    @classmethod
+    def get_page_from_html(cls, html: str) -> _Element:
+        html = cls.unwrap_spans(html=html)
         return fromstring(html.replace("<br>", "<br/>"))
 
     @classmethod
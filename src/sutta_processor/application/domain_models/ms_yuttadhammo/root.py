@@ -7,6 +7,7 @@ import attr
 from natsort import natsorted, ns
 
 from sutta_processor.application.domain_models.base import BaseRootAggregate
+from sutta_processor.application.domain_models.loader import FileAggregateLoader
 from sutta_processor.application.value_objects import MsId
 
 from ...value_objects.verse import VerseTokens
@@ -24,11 +25,14 @@ class YuttaAggregate(BaseRootAggregate):
     _text_head_index: Dict[VerseTokens.HeadKey, Set[VerseTokens]] = attr.ib(init=False)
 
     @classmethod
-    def from_path(cls,  exclude_dirs: List[Path], root_pth: Path) -> "YuttaAggregate":
+    def from_path(
+        cls, exclude_dirs: List[Path], root_pth: Path, loader: FileAggregateLoader = None
+    ) -> "YuttaAggregate":
         file_aggregates, index, errors = cls._from_path(
             root_pth=root_pth,
             file_aggregate_cls=YuttaFileAggregate,
-            exclude_dirs=exclude_dirs
+            exclude_dirs=exclude_dirs,
+            loader=loader,
         )
         return cls(file_aggregates=tuple(file_aggregates), index=index)
 
@@ -39,6 +43,10 @@ class YuttaAggregate(BaseRootAggregate):
     def __str__(self):
         return f"<{self.__class__.__name__}, loaded_UIDs: '{len(self.index):,}'>"
 
+    def get_last_ms_ids(self) -> Set[MsId]:
+        """Last ms id of every file."""
+        return {list(f.index)[-1] for f in self.file_aggregates if f.index}
+
     @classmethod
     def convert_to_html(cls, root_pth: Path) -> "YuttaAggregate":
         """
@@ -0,0 +1,118 @@
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import attr
+from natsort import natsorted, ns
+
+log = logging.getLogger(__name__)
+
+
+@attr.s(frozen=True, auto_attribs=True)
+class ScannedFile:
+    f_pth: Path
+    # Name of the tree the file was found in: root, html, comment, ...
+    tree: str
+    # Language from the file name, eg. 'pli' for 'mn1_root-pli-ms.json', empty if absent
+    lang: str
+    # 'mn1' for 'mn1_root-pli-ms.json'
+    file_key: str
+    st: Optional[os.stat_result] = attr.ib(repr=False, eq=False)
+
+    @classmethod
+    def from_entry(cls, entry: os.DirEntry, tree: str) -> "ScannedFile":
+        try:
+            st = entry.stat()
+        except OSError:
+            st = None
+        file_key, lang = cls.parse_name(name=entry.name, tree=tree)
+        return cls(f_pth=Path(entry.path), tree=tree, lang=lang, file_key=file_key, st=st)
+
+    @classmethod
+    def parse_name(cls, name: str, tree: str) -> Tuple[str, str]:
+        """'mn1_root-pli-ms.json' -> ('mn1', 'pli')"""
+        file_key, _, suffix = name.partition(f"_{tree}")
+        lang = suffix[1:].split(".")[0].split("-")[0] if suffix.startswith("-") else ""
+        return file_key, lang
+
+    @classmethod
+    def get_file_key(cls, name: str, tree: str) -> str:
+        return cls.parse_name(name=name, tree=tree)[0]
+
+
+class CorpusScanner:
+    """
+    Every tree of the corpus is walked once (on first use), and kept as natsorted tuple
+    of scanned files. Loaders take their file lists from here instead of walking the
+    directory again.
+
+    Paths that are outside of all the known trees are scanned as separate trees.
+    """
+
+    def __init__(self, trees: Dict[str, Path], exclude_dirs: List[str]):
+        self.trees = {name: Path(pth) for name, pth in trees.items()}
+        self.exclude_dirs = set(exclude_dirs or [])
+        self._scanned: Dict[str, Tuple[ScannedFile, ...]] = {}
+        self._stat_index: Dict[Path, Optional[os.stat_result]] = {}
+
+    def get_tree(self, tree: str) -> Tuple[ScannedFile, ...]:
+        if tree not in self._scanned:
+            root_pth = self.trees.get(tree) or Path(tree)
+            scanned = natsorted(
+                self._scan(root_pth=root_pth, tree=tree), key=lambda f: f.f_pth, alg=ns.PATH
+            )
+            self._scanned[tree] = tuple(scanned)
+            self._stat_index.update((f.f_pth, f.st) for f in scanned)
+            log.debug("Scanned '%s' files of '%s' tree: '%s'", len(scanned), tree, root_pth)
+        return self._scanned[tree]
+
+    def get_files(self, root_pths: Iterable[Path]) -> List[ScannedFile]:
+        """Files under any of the root_pths, in the natsorted order."""
+        by_tree: Dict[str, List[Path]] = {}
+        for pth in root_pths:
+            by_tree.setdefault(self.get_tree_name(pth=Path(pth)), []).append(Path(pth))
+
+        files = []
+        for tree, pths in by_tree.items():
+            root_pth = self.trees.get(tree) or Path(tree)
+            scanned = self.get_tree(tree=tree)
+            if root_pth in pths:
+                files.extend(scanned)
+                continue
+            prefixes = tuple(f"{pth}{os.sep}" for pth in pths)
+            files.extend(f for f in scanned if str(f.f_pth).startswith(prefixes))
+        if len(by_tree) > 1:
+            files = natsorted(files, key=lambda f: f.f_pth, alg=ns.PATH)
+        return files
+
+    def get_paths(self, root_pths: Iterable[Path]) -> List[Path]:
+        return [f.f_pth for f in self.get_files(root_pths=root_pths)]
+
+    def get_tree_name(self, pth: Path) -> str:
+        for tree, root_pth in self.trees.items():
+            if pth == root_pth or root_pth in pth.parents:
+                return tree
+        return str(pth)
+
+    def stat(self, f_pth: Path) -> Optional[os.stat_result]:
+        return self._stat_index.get(f_pth)
+
+    def _scan(self, root_pth: Path, tree: str) -> List[ScannedFile]:
+        """Same rules as `os.walk`: excluded dir names are skipped at any level."""
+        scanned = []
+        to_scan = [str(root_pth)]
+        while to_scan:
+            try:
+                with os.scandir(to_scan.pop()) as it:
+                    entries = list(it)
+            except OSError as e:
+                log.debug("Can't scan directory: %s", e)
+                continue
+            for entry in entries:
+                if entry.is_dir():
+                    if entry.name not in self.exclude_dirs and not entry.is_symlink():
+                        to_scan.append(entry.path)
+                else:
+                    scanned.append(ScannedFile.from_entry(entry=entry, tree=tree))
+        return scanned
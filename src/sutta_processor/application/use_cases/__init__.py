@@ -6,7 +6,10 @@ from .bilara_check_references import bilara_check_references
 from .bilara_check_root import bilara_check_root
 from .bilara_check_translation import bilara_check_translation
 from .bilara_check_variant import bilara_check_variant
+from .bilara_check_duplicated_indexes import bilara_check_duplicated_indexes
 from .bilara_load import bilara_load
+from .build_yutta_corpus import build_yutta_corpus
+from .convert_yutta_html import convert_yutta_html
 from .fix_headers_uid import fix_headers_uid
 from .renumber_uids import renumber_uids
 from .run_all_checks import run_all_checks
@@ -29,7 +32,9 @@ __all__ = [
     "bilara_check_variant",
     "bilara_load",
     "bilara_check_duplicated_indexes",
+    "build_yutta_corpus",
     "check_all_changes",
+    "convert_yutta_html",
     "fix_headers_uid",
     "noop",
     "renumber_uids",
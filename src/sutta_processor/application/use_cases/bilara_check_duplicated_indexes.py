@@ -2,24 +2,23 @@ import collections
 import json
 import logging
 import ntpath
-import os
 from fnmatch import fnmatch
 from pathlib import Path
 from typing import List
 
 from sutta_processor.shared.config import Config
+from sutta_processor.shared.findings import findings
 
 log = logging.getLogger(__name__)
 
 
-def get_reference_paths(directory):
+def get_reference_paths(cfg: Config):
     reference_file_pattern = "*_reference.json"
     reference_files = []
 
-    for path, _, files in os.walk(directory):
-        for file in files:
-            if fnmatch(file, reference_file_pattern):
-                reference_files.append(os.path.join(path, file))
+    for scanned in cfg.repo.bilara.scanner.get_tree(tree="reference"):
+        if fnmatch(scanned.f_pth.name, reference_file_pattern):
+            reference_files.append(str(scanned.f_pth))
 
     return reference_files
 
@@ -40,6 +39,17 @@ def get_duplicated_indexes(file_content):
     return [index for index, count in collections.Counter(all_indexes).items() if count > 1]
 
 
+def add_duplicated_index_findings(file_path, file_content, duplicated_index):
+    for uid, indexes in file_content.items():
+        if duplicated_index in indexes:
+            findings.add(
+                check="bilara_check_duplicated_indexes",
+                message=f"Duplicated index '{duplicated_index}'",
+                uid=uid,
+                file=file_path,
+            )
+
+
 def remove_duplicated_index(file_content, duplicated_index):
     """ Removing the first apperance of duplicated index """
     for reference, indexes in file_content.items():
@@ -57,7 +67,7 @@ def save_file_content(file_path, file_content):
 
 
 def bilara_check_duplicated_indexes(cfg: Config):
-    reference_paths = get_reference_paths(directory=cfg.reference_root_path)
+    reference_paths = get_reference_paths(cfg=cfg)
 
     for reference_path in reference_paths:
         file_content = get_file_content(reference_path)
@@ -65,6 +75,7 @@ def bilara_check_duplicated_indexes(cfg: Config):
 
         for duplicated_index in duplicated_indexes:
             log.error(f"Found duplicated index {duplicated_index} in the {reference_path}")
+            add_duplicated_index_findings(reference_path, file_content, duplicated_index)
             # Uncomment to remove duplicated indexes from files.
             # remove_duplicated_index(file_content, duplicated_index)
             # save_file_content(reference_path, file_content)
@@ -77,6 +88,7 @@ def bilara_check_duplicated_indexes_from_files(cfg: Config, ref_file_paths: List
 
         for duplicated_index in duplicated_indexes:
             log.error(f"Found duplicated index {duplicated_index} in the {file_path}")
+            add_duplicated_index_findings(file_path, file_content, duplicated_index)
             # Uncomment to remove duplicated indexes from files.
             # remove_duplicated_index(file_content, duplicated_index)
             # save_file_content(reference_path, file_content)
@@ -17,6 +17,7 @@ def bilara_check_references(cfg: Config):
     reference: BilaraReferenceAggregate = cfg.repo.bilara.get_reference()
     cfg.check.reference.get_duplicated_ms_id(reference=reference)
     cfg.check.reference.get_wrong_segments_based_on_nya(reference=reference)
+    cfg.check.reference.get_unrecognized_references(reference=reference)
 
 
 # noinspection PyDataclass
@@ -26,3 +27,4 @@ def bilara_check_references_from_files(cfg: Config, ref_file_paths: List[Path]):
     reference: BilaraReferenceAggregate = cfg.repo.bilara.get_reference_from_files(file_paths=ref_file_paths)
     cfg.check.reference.get_duplicated_ms_id(reference=reference)
     cfg.check.reference.get_wrong_segments_based_on_nya(reference=reference)
+    cfg.check.reference.get_unrecognized_references(reference=reference)
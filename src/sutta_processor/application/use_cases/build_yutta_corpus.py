@@ -0,0 +1,15 @@
+import logging
+
+from sutta_processor.infrastructure.repository.repo import FileRepository
+from sutta_processor.shared.config import NULL_PTH, Config
+
+log = logging.getLogger(__name__)
+
+
+def build_yutta_corpus(cfg: Config):
+    """Parse Yuttadhammo html files and compile them into `yutta_corpus_path`."""
+    cfg.repo: FileRepository
+    if cfg.yutta_corpus_path == NULL_PTH:
+        log.error("To build the Yuttadhammo corpus, add 'yutta_corpus_path' to your settings.")
+        return
+    cfg.repo.yutta.build_corpus()
@@ -1,12 +1,21 @@
-from sutta_processor.shared.config import Config
-import os
-import logging
-from sutta_processor.application.domain_models import YuttaAggregate
-import pickle
-from collections import OrderedDict
+import hashlib
 import json
+import logging
+import multiprocessing
+import os
 import re
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Tuple
+
+import attr
+
+from sutta_processor.application.domain_models import YuttaAggregate
+from sutta_processor.application.domain_models.scanner import ScannedFile
+from sutta_processor.shared.config import Config
+from sutta_processor.shared.findings import WARNING, findings
 
 log = logging.getLogger(__name__)
 
@@ -14,51 +23,185 @@ log = logging.getLogger(__name__)
 # Text cleaning global function.
 
 
+@attr.s(frozen=True, auto_attribs=True)
+class NormalizationProfile:
+    """ What normalization does with the text. It's compiled once into the Normalizer. """
+
+    lower: bool = True
+    # Characters replaced with whitespace
+    spaced: str = ""
+    # Characters removed without the whitespace
+    deleted: str = ""
+    mapped: Dict[str, str] = attr.ib(factory=dict)
+    strip_digits: bool = False
+
+    def compile(self) -> "Normalizer":
+        return Normalizer(profile=self)
+
+
+class Normalizer:
+    """
+    Replacements of the profile as one flat list of steps. Every character is replaced
+    at most once, so the steps can go in any order, the same as in single translate pass.
+    Steps are applied with `str.replace`, as it's faster than `str.translate` or regex
+    for non ascii text.
+    """
+
+    def __init__(self, profile: NormalizationProfile):
+        spaced = profile.spaced + ("0123456789" if profile.strip_digits else "")
+        replacements = {ch: " " for ch in spaced}
+        replacements.update((ch, "") for ch in profile.deleted)
+        replacements.update(profile.mapped)
+        chained = set(replacements).intersection("".join(replacements.values()))
+        if chained:
+            raise ValueError(f"Characters can't be both replaced and replacement: {sorted(chained)}")
+        self.lower = profile.lower
+        self.steps = tuple(replacements.items())
+        self.normalize = self.compile_steps(lower=self.lower, steps=self.steps)
+
+    @classmethod
+    def compile_steps(cls, lower: bool, steps: Tuple[Tuple[str, str], ...]) -> Callable[[str], str]:
+        def normalize(text: str) -> str:
+            if lower:
+                text = text.lower()
+            for old, new in steps:
+                text = text.replace(old, new)
+            return " ".join(text.split())
+
+        return normalize
+
+    def normalize_many(self, texts: Iterable[str]) -> List[str]:
+        """ Normalized texts in the same order, every distinct text is normalized once. """
+        memo = {}
+        normalized = []
+        for text in texts:
+            clean = memo.get(text)
+            if clean is None:
+                clean = memo[text] = self.normalize(text)
+            normalized.append(clean)
+        return normalized
+
+
+MIGRATION_PROFILE = NormalizationProfile(
+    spaced="—:….()“”–-?,;☑๐×☒|#[]",
+    deleted="*»«’‘",
+    mapped={"ṅ": "ṁ"},
+    strip_digits=True,
+)
+_normalizer = MIGRATION_PROFILE.compile()
+
+
 def clean_verse(verse):
     """ Cleans input text from unwanted characters. """
-    verse = (
-        verse.rstrip()
-        .lower()
-        .replace("—", " ")
-        .replace(":", " ")
-        .replace("…", " ")
-        .replace(".", " ")
-        .replace("(", " ")
-        .replace(")", " ")
-        .replace("ṅ", "ṁ")
-        .replace("“", " ")
-        .replace("”", " ")
-        .replace("–", " ")
-        .replace("-", " ")
-        .replace("?", " ")
-        .replace(",", " ")
-        .replace(";", " ")
-        .replace("0", " ")
-        .replace("1", " ")
-        .replace("2", " ")
-        .replace("3", " ")
-        .replace("4", " ")
-        .replace("5", " ")
-        .replace("6", " ")
-        .replace("7", " ")
-        .replace("8", " ")
-        .replace("9", " ")
-        .replace("☑", " ")
-        .replace("๐", " ")
-        .replace("×", " ")
-        .replace("☒", " ")
-        .replace("*", "")
-        .replace("|", " ")
-        .replace("#", " ")
-        .replace("[", " ")
-        .replace("]", " ")
-        .replace("»", "")
-        .replace("«", "")
-        .replace("’", "")
-        .replace("‘", "")
-    )
+    return _normalizer.normalize(verse)
+
+
+def clean_verses(verses):
+    """ Same as clean_verse for many verses at once. """
+    return _normalizer.normalize_many(verses)
+
+
+# Comparing texts
 
-    return " ".join(verse.split())
+# Above this number of edits the rest of the texts is reported as a single difference
+MAX_EDIT_DISTANCE = 1000
+
+
+def get_owned_tokens(clean_verses):
+    """
+    Tokens of all (id, cleaned verse) pairs and the id of every token.
+    Verses are separated by whitespace, so the tokens are the same as of the clean_verse of the joined text.
+    """
+    tokens = []
+    owners = []
+    for owner, verse in clean_verses:
+        verse_tokens = verse.split()
+        tokens.extend(verse_tokens)
+        owners.extend([owner] * len(verse_tokens))
+    return tokens, owners
+
+
+def get_extra_words(tokens, other_tokens):
+    """ Tokens without the ones that are also in the other_tokens (every occurrence counts once). """
+    to_skip = Counter(other_tokens)
+    extra_words = []
+    for token in tokens:
+        if to_skip[token]:
+            to_skip[token] -= 1
+        else:
+            extra_words.append(token)
+    return extra_words
+
+
+def diff_tokens(a, b, max_edit_distance=MAX_EDIT_DISTANCE):
+    """
+    Myers diff of two token lists, O((N+M)D) for D edits.
+    Returns list of the differing runs as (a_start, a_end, b_start, b_end) slices, in the text order.
+    """
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    a_end, b_end = len(a), len(b)
+    while a_end > start and b_end > start and a[a_end - 1] == b[b_end - 1]:
+        a_end -= 1
+        b_end -= 1
+    n, m = a_end - start, b_end - start
+    if not n and not m:
+        return []
+    if not n or not m:
+        return [(start, a_end, start, b_end)]
+
+    # Furthest reaching x on every diagonal k = x - y, kept for every d to walk the path back
+    v = {1: 0}
+    trace = []
+    for d in range(min(n + m, max_edit_distance) + 1):
+        trace.append(v.copy())
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[k - 1] < v[k + 1]):
+                x = v[k + 1]
+            else:
+                x = v[k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[start + x] == b[start + y]:
+                x += 1
+                y += 1
+            v[k] = x
+            if x >= n and y >= m:
+                return _get_diff_runs(trace=trace, n=n, m=m, offset=start)
+    log.debug("More than '%s' edits, rest of the text is one difference", max_edit_distance)
+    return [(start, a_end, start, b_end)]
+
+
+def _get_diff_runs(trace, n, m, offset):
+    """ Walk the edit path back from (n, m) and merge the consecutive edits into runs. """
+    runs = []
+    x, y = n, m
+    for d in range(len(trace) - 1, 0, -1):
+        v = trace[d]
+        k = x - y
+        if k == -d or (k != d and v[k - 1] < v[k + 1]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = v[prev_k]
+        prev_y = prev_x - prev_k
+        # Single edit from (prev_x, prev_y): the token of a removed or of b inserted, the rest is a snake
+        x, y = (prev_x + 1, prev_y) if prev_k == k - 1 else (prev_x, prev_y + 1)
+        if runs and runs[-1][0] == x and runs[-1][2] == y:
+            runs[-1] = (prev_x, runs[-1][1], prev_y, runs[-1][3])
+        else:
+            runs.append((prev_x, x, prev_y, y))
+        x, y = prev_x, prev_y
+    return [(a1 + offset, a2 + offset, b1 + offset, b2 + offset) for a1, a2, b1, b2 in reversed(runs)]
+
+
+def get_run_owners(owners, run_start, run_end):
+    """ Ids of the tokens in the run. For an empty run it's the id of the token it was found at. """
+    if run_start == run_end:
+        if not owners:
+            return []
+        return [owners[min(run_start, len(owners) - 1)]]
+    return list(OrderedDict.fromkeys(owners[run_start:run_end]))
 
 
 #############################################
@@ -68,15 +211,25 @@ def clean_verse(verse):
 
 class Yutta:
     def __init__(self, yutta_aggregate):
-        self.unused_msids_list, self.msids_list = self.generate_msids_lists(yutta_aggregate)
+        self.msids_list = self.generate_msids_list(yutta_aggregate)
+        # ms* id -> position in the msids_list
+        self.msids_positions = {msid: i for i, msid in enumerate(self.msids_list)}
+        # 1 at the position of every ms* id that was marked with mark_used
+        self.used_msids = bytearray(len(self.msids_list))
         self.last_msids_list = self.generate_last_msids_list(yutta_aggregate)
         self.yutta_aggregate = yutta_aggregate
+        # Cleaned verse at every position of the msids_list, verses are cleaned once for all sutras
+        self.clean_verses_list = clean_verses(yutta_aggregate.index[msid].verse for msid in self.msids_list)
 
-    def generate_msids_lists(self, yutta_aggregate):
+    @property
+    def unused_msids_list(self):
+        """ ms* ids that were not used by any sutra, in the ascending order """
+        return [msid for msid, used in zip(self.msids_list, self.used_msids) if not used]
+
+    def generate_msids_list(self, yutta_aggregate):
         """ Generate list of all ms* ids and placed them in the ascending order """
         msids_list = [msid for msid in yutta_aggregate.index.keys()]
-        sorted_msids_list = sorted(msids_list, key=lambda index: (index.rsplit("_", 1)[0], int(index.rsplit("_", 1)[1])))
-        return sorted_msids_list, sorted_msids_list.copy()
+        return sorted(msids_list, key=lambda index: (index.rsplit("_", 1)[0], int(index.rsplit("_", 1)[1])))
 
     def generate_last_msids_list(self, yutta_aggregate):
         """
@@ -84,50 +237,61 @@ class Yutta:
         Otherwise it will be False as default value.
         """
 
-        last_msids_list = {msid: False for msid in yutta_aggregate.index.keys()}
-
-        for aggregated_file in yutta_aggregate.file_aggregates:
-            if aggregated_file.index:
-                last_msid = list(aggregated_file.index)[-1]
-                last_msids_list[last_msid] = True
-
-        return last_msids_list
+        last_msids = yutta_aggregate.get_last_ms_ids()
+        return {msid: msid in last_msids for msid in yutta_aggregate.index.keys()}
 
-    def get_verses(self, headers, start_msid, end_msid):
+    def collect_verses(self, headers, start_msid, end_msid):
         """
-        Generates full sutra by combining all verses from Yuttadhammo html files.
+        Collects full sutra from verses of Yuttadhammo html files.
         It starts from given start_msid and add verses by selecting next ms* ids.
         Adding new verses will stop if end_msid was found.
         If the end_msid was not the last index in the html file all verses after them till the end of the file also will be added.
         All verses which text is included in header will be ignored.
+        Returns positions of the sutra verses in the msids_list and the range of used positions, they are marked
+        with mark_used.
         """
-
-        full_sutra = ""
-        msid_index = self.msids_list.index(start_msid)
-        cutted_msids_list = self.msids_list[(msid_index):]
+        positions = []
+        try:
+            msid_position = self.msids_positions[start_msid]
+        except KeyError:
+            raise ValueError(f"'{start_msid}' is not in Yuttadhammo ms* ids")
         found_last_msid = False
 
-        for msid in cutted_msids_list:
+        position = msid_position
+        for position in range(msid_position, len(self.msids_list)):
+            msid = self.msids_list[position]
             if msid == end_msid:
                 found_last_msid = True
 
-            if clean_verse(self.yutta_aggregate.index[msid].verse) not in headers:
-                full_sutra += " " + self.yutta_aggregate.index[msid].verse
-
-            if msid in self.unused_msids_list: self.unused_msids_list.remove(msid)
+            if self.clean_verses_list[position] not in headers:
+                positions.append(position)
 
             if self.last_msids_list[msid] and found_last_msid:
                 break
 
-        return full_sutra.lstrip()
+        return positions, range(msid_position, position + 1)
+
+    def mark_used(self, used_msids):
+        """ used_msids is a range of positions in the msids_list """
+        if used_msids:
+            self.used_msids[used_msids.start:used_msids.stop] = b"\x01" * len(used_msids)
 
 
 class BilaraSutra:
-    def __init__(self, bilara_file_path, reference_file_path, yutta):
-        self.references = self.get_formatted_references(reference_file_path)
-        self.headers = self.get_headers(bilara_file_path)
-        self.content = self.get_formatted_content(bilara_file_path)
+    def __init__(self, bilara_file, reference_file, yutta):
+        """ bilara_file and reference_file are file aggregates loaded by the BilaraRepo """
+        # Why the reference file can't be used, when it can't
+        self.reference_error = None
+        self.references = self.get_formatted_references(reference_file)
+        self.headers = self.get_headers(bilara_file)
+        self.content = self.get_formatted_content(bilara_file)
+        self.bilara_file = bilara_file
+        self.reference_file = reference_file
         self.yutta = yutta
+        # Positions of the Yuttadhammo verses that were compared with this sutra
+        self.used_msids = None
+        # Positions of the Yuttadhammo verses of this sutra (without headers)
+        self.yutta_positions = None
 
     def remove_headers(self, data):
         """ Removes headers from reference file """
@@ -151,15 +315,25 @@ class BilaraSutra:
                 del references[index]
 
     # LOOK AT ME
-    def get_formatted_references(self, reference_file_path):
+    def get_data(self, file_aggregate):
         """
-        Load data from reference file, removes headers indexes and non ms* ids.
+        Raw data of the file, in the file order.
+        Segments with wrong ids are not in the aggregate index, so such files are read again.
+        """
+        if file_aggregate.errors:
+            with open(file_aggregate.f_pth, "r") as file:
+                return json.load(file)
+        return {uid: verses.verse for uid, verses in file_aggregate.index.items()}
+
+    def get_formatted_references(self, reference_file):
+        """
+        Get data from reference file, removes headers indexes and non ms* ids.
         By the end it returns the first and last msid in the reference data.
         If there is just one msisd in the references it will be returned as the first and last one twice.
         If there is no msid in the references, the empty list will be returned.
         """
-        with open(reference_file_path, "r") as file:
-            references = json.load(file)
+        reference_file_path = reference_file.f_pth
+        references = self.get_data(reference_file)
 
         self.remove_headers(references)
         self.remove_non_ms_indexes(references)
@@ -171,55 +345,78 @@ class BilaraSutra:
 
         if not msids_list:
             log.error(f"This reference file does not contain ms* ids: {reference_file_path}")
+            self.reference_error = "Reference file does not contain ms* ids"
             return []
         elif msids_list != sorted_msids_list:
             log.error(f"In this file, the ms* ids are not in order: {reference_file_path}")
+            self.reference_error = "Reference file has ms* ids that are not in order"
             return []
         else:
             return [msids_list[0], msids_list[-1]]
 
-    def get_headers(self, bilara_file_path):
-        """ Create list with texts of all headers in the sutra. """
-        with open(bilara_file_path, "r") as file:
-            content = json.load(file)
+    def get_headers(self, bilara_file):
+        """ Create set with texts of all headers in the sutra. """
+        content = self.get_data(bilara_file)
 
-        headers = []
+        headers = set()
 
         for index, text in content.items():
             if "0" in index.split(":")[1].split("."):
-                headers.append(clean_verse(text))
+                headers.add(clean_verse(text))
 
         return headers
 
-    def get_formatted_content(self, bilara_file_path):
-        """ Load and clean data from bilara file. All headers are removed from the dictionary. """
-        with open(bilara_file_path, "r") as file:
-            content = json.load(file)
+    def get_formatted_content(self, bilara_file):
+        """ Get and clean data from bilara file. All headers are removed from the dictionary. """
+        content = self.get_data(bilara_file)
 
         self.remove_headers(content)
         return content
 
-    def generate_bilara_sutra(self):
-        """ Join all verses from bilara content together. Some versers do not have the extra whitespace at the end."""
-        sutra = ""
-
-        for text in self.content.values():
-            if not text:
-                continue
-            text = text if text[-1] == " " else text + " "
-            sutra += text
-
-        return sutra
-
-    def format_output(self, msids, bilara_sutra, bilara_extra_words, yutthadammo_sutra, yutthadamo_extra_words):
+    def format_output(
+        self, msids, bilara_sutra, bilara_extra_words, yutthadammo_sutra, yutthadamo_extra_words, differences
+    ):
         return {
             "msids": msids,
             "bilara_sutra": bilara_sutra,
             "bilara_extra_words": " ".join(bilara_extra_words),
             "yutthadammo_sutra": yutthadammo_sutra,
             "yutthadamo_extra_words": " ".join(yutthadamo_extra_words),
+            "differences": differences,
         }
 
+    def get_text_differences(self, bilara_tokens, bilara_uids, yutta_tokens, yutta_msids):
+        """ Every differing run of tokens with the bilara ids and the Yuttadhammo ms* ids it was found in. """
+        differences = []
+        for bilara_start, bilara_end, yutta_start, yutta_end in diff_tokens(bilara_tokens, yutta_tokens):
+            differences.append(
+                {
+                    "uids": get_run_owners(bilara_uids, bilara_start, bilara_end),
+                    "msids": get_run_owners(yutta_msids, yutta_start, yutta_end),
+                    "bilara_text": " ".join(bilara_tokens[bilara_start:bilara_end]),
+                    "yutthadammo_text": " ".join(yutta_tokens[yutta_start:yutta_end]),
+                }
+            )
+        return differences
+
+    def collect_yutta_verses(self):
+        """ Find the Yuttadhammo verses of the sutra, once. """
+        if self.references and self.yutta_positions is None:
+            self.yutta_positions, self.used_msids = self.yutta.collect_verses(
+                self.headers, self.references[0], self.references[1]
+            )
+
+    def get_digest(self):
+        """ Hash of everything the result depends on: root and reference files and the Yuttadhammo verses they cover. """
+        self.collect_yutta_verses()
+        digest = hashlib.sha1()
+        for file_aggregate in (self.bilara_file, self.reference_file):
+            digest.update(hashlib.sha1(Path(file_aggregate.f_pth).read_bytes()).digest())
+        for position in self.used_msids or ():
+            msid = self.yutta.msids_list[position]
+            digest.update(f"{msid}\0{self.yutta.yutta_aggregate.index[msid].verse}\0".encode())
+        return digest.hexdigest()
+
     def get_differences(self):
         """ Checks if sutras form Bilara-data and Yuttadhammo match together. """
 
@@ -227,27 +424,24 @@ class BilaraSutra:
         if not self.references:
             return None
 
-        bilara_sutra = self.generate_bilara_sutra()
-        yutta_sutra = self.yutta.get_verses(self.headers, self.references[0], self.references[1])
-
-        clean_bilara_sutra = clean_verse(bilara_sutra)
-        clean_yutta_sutra = clean_verse(yutta_sutra)
-
-        if clean_bilara_sutra != clean_yutta_sutra:
-
-            bilara_difference = clean_bilara_sutra.split()
-            for word in clean_yutta_sutra.split():
-                if word in bilara_difference:
-                    bilara_difference.remove(word)
-
-            yuta_difference = clean_yutta_sutra.split()
-            for word in clean_bilara_sutra.split():
-                if word in yuta_difference:
-                    yuta_difference.remove(word)
+        bilara_tokens, bilara_uids = get_owned_tokens(
+            (uid, clean_verse(text)) for uid, text in self.content.items() if text
+        )
+        self.collect_yutta_verses()
+        self.yutta.mark_used(self.used_msids)
+        yutta_tokens, yutta_msids = get_owned_tokens(
+            (self.yutta.msids_list[position], self.yutta.clean_verses_list[position])
+            for position in self.yutta_positions
+        )
 
+        if bilara_tokens != yutta_tokens:
             return self.format_output(
-                msids=self.references, bilara_sutra=clean_bilara_sutra, bilara_extra_words=bilara_difference,
-                yutthadammo_sutra=clean_yutta_sutra, yutthadamo_extra_words=yuta_difference
+                msids=self.references,
+                bilara_sutra=" ".join(bilara_tokens),
+                bilara_extra_words=get_extra_words(bilara_tokens, yutta_tokens),
+                yutthadammo_sutra=" ".join(yutta_tokens),
+                yutthadamo_extra_words=get_extra_words(yutta_tokens, bilara_tokens),
+                differences=self.get_text_differences(bilara_tokens, bilara_uids, yutta_tokens, yutta_msids),
             )
 
         return None
@@ -260,78 +454,55 @@ class BilaraSutra:
 # Getting BilaraSutra objects
 
 
-def get_file_paths(directory, key_separator, exclude_dirs):
+def get_file_aggregates(file_aggregates, tree, directory):
     """
-    Returns file key - file path pair for every file in the directory.
-    E.g. "an10.48": "/bilara-data/reference/pli/ms/sutta/an/an10/an10.48_reference.json"
-         "an10.48": "/bilara-data/root/pli/ms/sutta/an/an10/an10.48_root-pli-ms.json
+    Returns file key - file aggregate pair for every file in the directory.
+    E.g. "an10.48": aggregate of "/bilara-data/reference/pli/ms/sutta/an/an10/an10.48_reference.json"
+         "an10.48": aggregate of "/bilara-data/root/pli/ms/sutta/an/an10/an10.48_root-pli-ms.json
     """
-    file_paths = dict()
-
-    for path, sub_dirs, files in os.walk(directory):
-        sub_dirs[:] = [d for d in sub_dirs if d not in exclude_dirs]
-        for name in files:
-            file_key = name.split(key_separator)[0]
-            file_paths[file_key] = os.path.join(path, name)
-
-    return file_paths
+    prefix = f"{directory}{os.sep}"
+    return {
+        ScannedFile.get_file_key(name=file_aggregate.f_pth.name, tree=tree): file_aggregate
+        for file_aggregate in file_aggregates
+        if str(file_aggregate.f_pth).startswith(prefix)
+    }
 
 
 def get_matched_bilara_files(cfg):
-    """ Generates list of matching *root.json and *reference.json files from the Bilary-data directory. """
+    """ Generates list of matching *root.json and *reference.json files loaded by the BilaraRepo. """
     matched_files = list()
     # Don't want the Chinese root texts. palit_root = ./bilara-data/root/pli/ms/
     pali_root = cfg.bilara_root_path / Path(cfg.bilara_root_langs[0])
-    bilara_file_paths = get_file_paths(pali_root, "_root", cfg.exclude_dirs)
-    reference_file_paths = get_file_paths(cfg.reference_root_path, "_reference", cfg.exclude_dirs)
+    bilara_files = get_file_aggregates(cfg.repo.bilara.get_pali_root().file_aggregates, "root", pali_root)
+    reference_files = get_file_aggregates(
+        cfg.repo.bilara.get_reference().file_aggregates, "reference", cfg.reference_root_path
+    )
 
-    bilara_keys_set = set(bilara_file_paths)
-    reference_keys_set = set(reference_file_paths)
+    bilara_keys_set = set(bilara_files)
+    reference_keys_set = set(reference_files)
 
     missing_keys = bilara_keys_set.symmetric_difference(reference_keys_set)
     matched_keys = sorted(bilara_keys_set.intersection(reference_keys_set))
 
     for key in missing_keys:
         log.error("File with the key: '%s' is missing in the root or reference directory.", key)
+        f_pth = (bilara_files.get(key) or reference_files.get(key)).f_pth
+        message = "File is missing in the root or reference directory"
+        findings.add(check="check_migration", message=message, uid=key, file=f_pth)
 
     for key in matched_keys:
-        matched_files.append(
-            {"bilara_file_path": bilara_file_paths[key], "reference_file_path": reference_file_paths[key]}
-        )
+        matched_files.append({"bilara_file": bilara_files[key], "reference_file": reference_files[key]})
 
     return matched_files
 
 
-def get_bilara_sutras(cfg, yutta):
-    """ Creates BilaraSutra object for every sutra-reference file pairs in the Bilara-data """
-    matched_bilara_files = get_matched_bilara_files(cfg)
-    bilara_sutras = list()
-
-    for files in matched_bilara_files:
-        bilara_sutras.append(BilaraSutra(**files, yutta=yutta))
-
-    return bilara_sutras
-
-
 # Getting Yuta object
 
 
 def get_yutta(cfg):
     """ Generate Yutta class object using data from Yuthaddamo files. """
 
-    # Use this code to save yuthta_agregate data on local disc and speed up loading the Yuthadammo sutras for processing.
-
-    # yutta_aggregate = None
-
-    # if os.path.isfile("./yutta_aggregate.pickle"):
-    #     with open("./yutta_aggregate.pickle", "rb") as file:
-    #         yutta_aggregate = pickle.load(file)
-    # else:
-    #     yutta_aggregate = cfg.repo.yutta.get_aggregate()
-
-    #     with open("yutta_aggregate.pickle", "wb") as file:
-    #         pickle.dump(yutta_aggregate, file, protocol=pickle.HIGHEST_PROTOCOL)
-
+    # With 'yutta_corpus_path' set, Yuttadhammo verses are opened from the compiled corpus instead of parsing html.
     yutta_aggregate = cfg.repo.yutta.get_aggregate()
 
     return Yutta(yutta_aggregate)
@@ -354,11 +525,13 @@ def save_result(directory, sutra_differences):
         bilara_differences[msids] = {
             "text": sutra_difference["bilara_sutra"],
             "extra_words": sutra_difference["bilara_extra_words"],
+            "differences": sutra_difference["differences"],
         }
 
         yutta_differences[msids] = {
             "text": sutra_difference["yutthadammo_sutra"],
             "extra_words": sutra_difference["yutthadamo_extra_words"],
+            "differences": sutra_difference["differences"],
         }
 
         extra_words_summary[msids] = {
@@ -376,6 +549,100 @@ def save_result(directory, sutra_differences):
         json.dump(extra_words_summary, file, indent=2, ensure_ascii=False)
 
 
+# Comparing sutras in parallel
+
+# Set before the worker pool is forked. Workers inherit the loaded Yutta and bilara files,
+# so they are never pickled. Tasks are just positions in the matched files list.
+_worker_yutta = None
+_worker_matched_files = None
+
+
+def get_sutra_differences_in_worker(position):
+    bilara_sutra = BilaraSutra(**_worker_matched_files[position], yutta=_worker_yutta)
+    return bilara_sutra.get_differences(), bilara_sutra.used_msids, bilara_sutra.reference_error
+
+
+def compare_sutras(cfg, yutta, matched_files):
+    """
+    Yields differences of every matched sutra (None if the texts are the same) with the
+    reason its reference file can't be used, always in the matched_files order.
+    """
+    global _worker_yutta, _worker_matched_files
+
+    workers = cfg.migration_workers
+    if workers > 1 and "fork" not in multiprocessing.get_all_start_methods():
+        log.warning("Can't share Yuttadhammo data with workers on this platform, using 1 process.")
+        workers = 1
+
+    if workers <= 1:
+        for files in matched_files:
+            bilara_sutra = BilaraSutra(**files, yutta=yutta)
+            yield bilara_sutra.get_differences(), bilara_sutra.reference_error
+        return
+
+    chunksize = max(1, len(matched_files) // (workers * 4))
+    _worker_yutta = yutta
+    _worker_matched_files = matched_files
+    try:
+        context = multiprocessing.get_context("fork")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            positions = range(len(matched_files))
+            results = executor.map(get_sutra_differences_in_worker, positions, chunksize=chunksize)
+            for sutra_differences, used_msids, reference_error in results:
+                yutta.mark_used(used_msids)
+                yield sutra_differences, reference_error
+    finally:
+        _worker_yutta = None
+        _worker_matched_files = None
+
+
+def add_difference_findings(f_pth, sutra_differences):
+    """ Texts that differ are for checking, not errors. """
+    for difference in sutra_differences["differences"]:
+        uids = difference["uids"] or [""]
+        message = (
+            f"Differs from Yuttadhammo {difference['msids']}: "
+            f"'{difference['bilara_text']}' vs '{difference['yutthadammo_text']}'"
+        )
+        findings.add(
+            check="check_migration", message=message, uid=uids[0], file=f_pth, severity=WARNING
+        )
+
+
+def get_sutras_differences(cfg, yutta, matched_files, cache=None):
+    """
+    Same as compare_sutras, but with the cache only suttas whose root file, reference file or
+    Yuttadhammo verses have changed since the last run are compared. The rest is taken from the cache.
+    """
+    if cache is None:
+        yield from compare_sutras(cfg, yutta, matched_files)
+        return
+
+    keys = [str(files["bilara_file"].f_pth) for files in matched_files]
+    digests = []
+    results = {}
+    to_compare = []
+    for position, files in enumerate(matched_files):
+        bilara_sutra = BilaraSutra(**files, yutta=yutta)
+        digests.append(bilara_sutra.get_digest())
+        try:
+            result = cache.get(key=keys[position], digest=digests[position])
+            results[position] = result, bilara_sutra.reference_error
+            yutta.mark_used(bilara_sutra.used_msids)
+        except KeyError:
+            to_compare.append(position)
+    cache.log_stats(name="check_migration")
+
+    compared = compare_sutras(cfg, yutta, [matched_files[position] for position in to_compare])
+    for position, (sutra_differences, reference_error) in zip(to_compare, compared):
+        cache.put(key=keys[position], digest=digests[position], result=sutra_differences)
+        results[position] = sutra_differences, reference_error
+    cache.save()
+
+    for position in range(len(matched_files)):
+        yield results[position]
+
+
 ## ################## ##
 
 # MAIN SCRIPT
@@ -383,21 +650,36 @@ def save_result(directory, sutra_differences):
 
 def check_migration(cfg: Config):
     yutta = get_yutta(cfg)
-    bilara_sutras = get_bilara_sutras(cfg, yutta)
+    matched_files = get_matched_bilara_files(cfg)
     sutras_differences = list()
 
-    sutras_count = len(bilara_sutras)
+    sutras_count = len(matched_files)
     matched_sutras = 0
 
-    for index, bilara_sutra in enumerate(bilara_sutras):
+    start = time.perf_counter()
+    cache = cfg.repo.get_migration_cache()
+    all_differences = get_sutras_differences(cfg, yutta, matched_files, cache=cache)
+    for index, (sutra_differences, reference_error) in enumerate(all_differences):
         if index % 100 == 0:
             print(f"Processed: {sutras_count}/{index}")
 
-        sutra_differences = bilara_sutra.get_differences()
+        if reference_error:
+            f_pth = matched_files[index]["reference_file"].f_pth
+            findings.add(check="check_migration", message=reference_error, file=f_pth)
         if sutra_differences is None:
             matched_sutras += 1
         else:
             sutras_differences.append(sutra_differences)
+            add_difference_findings(
+                f_pth=matched_files[index]["bilara_file"].f_pth, sutra_differences=sutra_differences
+            )
+
+    elapsed = time.perf_counter() - start
+    throughput = sutras_count / elapsed if elapsed else 0
+    log.info(
+        "Compared '%s' sutras in %.1fs (%.1f suttas/s), workers: '%s'",
+        sutras_count, elapsed, throughput, cfg.migration_workers,
+    )
 
     if sutras_differences:
         save_result(cfg.migration_differences_path, sutras_differences)
@@ -0,0 +1,12 @@
+import logging
+
+from sutta_processor.infrastructure.repository.repo import FileRepository
+from sutta_processor.shared.config import Config
+
+log = logging.getLogger(__name__)
+
+
+def convert_yutta_html(cfg: Config):
+    """Convert Yuttadhammo xml files from `ms_yuttadhammo_path` to the cleaned html."""
+    cfg.repo: FileRepository
+    cfg.repo.yutta.convert_yutta_html_files()
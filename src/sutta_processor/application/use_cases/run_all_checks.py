@@ -1,6 +1,8 @@
 import logging
+from functools import partial
 
 from sutta_processor.application.check_service import CheckService
+from sutta_processor.application.check_service.scheduler import CheckScheduler
 from sutta_processor.infrastructure.repository.repo import FileRepository
 from sutta_processor.shared.config import Config
 
@@ -20,11 +22,35 @@ def run_all_checks(cfg: Config):
     cfg.repo: FileRepository
     cfg.check: CheckService
 
-    bilara_check_comment(cfg=cfg)
-    bilara_check_html(cfg=cfg)
-    bilara_check_references(cfg=cfg)
-    bilara_check_root(cfg=cfg)
-    bilara_check_translation(cfg=cfg)
-    bilara_check_variant(cfg=cfg)
-    bilara_check_duplicated_indexes(cfg=cfg)
-
+    # Checks take their aggregates from the repo, after the scheduler has loaded them.
+    # Findings are reported in this order.
+    bilara = cfg.repo.bilara
+    scheduler = CheckScheduler(workers=cfg.check_workers)
+    scheduler.add_load("root", bilara.get_root)
+    scheduler.add_load("comment", bilara.get_comment)
+    scheduler.add_check(
+        "bilara_check_comment", partial(bilara_check_comment, cfg=cfg), inputs=("root", "comment")
+    )
+    scheduler.add_load("html", bilara.get_html)
+    scheduler.add_check(
+        "bilara_check_html", partial(bilara_check_html, cfg=cfg), inputs=("root", "html")
+    )
+    scheduler.add_load("reference", bilara.get_reference)
+    scheduler.add_check(
+        "bilara_check_references", partial(bilara_check_references, cfg=cfg), inputs=("reference",)
+    )
+    scheduler.add_check("bilara_check_root", partial(bilara_check_root, cfg=cfg), inputs=("root",))
+    scheduler.add_load("translation", bilara.get_translation)
+    scheduler.add_check(
+        "bilara_check_translation",
+        partial(bilara_check_translation, cfg=cfg),
+        inputs=("html", "translation"),
+    )
+    scheduler.add_load("variant", bilara.get_variant)
+    scheduler.add_check(
+        "bilara_check_variant", partial(bilara_check_variant, cfg=cfg), inputs=("root", "variant")
+    )
+    scheduler.add_check(
+        "bilara_check_duplicated_indexes", partial(bilara_check_duplicated_indexes, cfg=cfg)
+    )
+    scheduler.run()
@@ -1,3 +1,4 @@
+from .reference import ParsedReferences, ReferenceParser
 from .uid import (
     UID,
     BaseTextKey,
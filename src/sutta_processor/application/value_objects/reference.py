@@ -0,0 +1,66 @@
+from typing import Dict, Iterable, List, Optional, Tuple, Type, Union
+
+import attr
+
+from .uid import BaseUID, MsId, Nya, PtsCs, PtsPli, ScID
+
+ReferencePart = Union[BaseUID, MsId, Nya, PtsCs, PtsPli, ScID]
+
+
+@attr.s(frozen=True, auto_attribs=True, slots=True)
+class ParsedReferences:
+    # All parts in the order of the reference string, typed when recognized
+    parts: Tuple[ReferencePart, ...]
+    # Parts that are not one of the known id types, eg. 'pts-vp-en1.1', 'msdiv114'
+    unrecognized: Tuple[BaseUID, ...]
+
+
+class ReferenceParser:
+    """
+    Reference parts are classified by their first two characters, so every part is
+    checked against its own candidates only, without trying every id type.
+
+    Accepts the same parts as the id constructors: sc + digit, pts-vp-pli, pts-cs, nya
+    and ms without div.
+    """
+
+    # {first two chars: ((prefix, id class), ...)}
+    PREFIXES: Dict[str, Tuple[Tuple[str, Type[BaseUID]], ...]] = {
+        "sc": (("sc", ScID),),
+        "pt": ((PtsPli.pts_pli_start, PtsPli), (PtsCs.pts_cs_start, PtsCs)),
+        "ny": ((Nya.nya_start, Nya),),
+        "ms": ((MsId.MS_ID, MsId),),
+    }
+
+    @classmethod
+    def classify(cls, part: str) -> Optional[Type[BaseUID]]:
+        for prefix, id_class in cls.PREFIXES.get(part[:2], ()):
+            if not part.startswith(prefix):
+                continue
+            elif id_class is ScID and not part[2:3].isdecimal():
+                return None
+            elif id_class is MsId and "div" in part:
+                return None
+            return id_class
+        return None
+
+    @classmethod
+    def split(cls, reference: Union[str, Iterable[str]]) -> List[str]:
+        ids = reference.split(",") if isinstance(reference, str) else reference
+        return [part for part in (part.strip() for part in ids) if part]
+
+    @classmethod
+    def parse(cls, reference: Union[str, Iterable[str]]) -> ParsedReferences:
+        """
+        :param reference: 'sc2, pts-cs1.1, pts-vp-en1.1, pts-vp-pli3.1, ms1V_2'
+        """
+        parts, unrecognized = [], []
+        for part in cls.split(reference=reference):
+            id_class = cls.classify(part=part)
+            if id_class is None:
+                part = BaseUID(part)
+                unrecognized.append(part)
+            else:
+                part = id_class(part)
+            parts.append(part)
+        return ParsedReferences(parts=tuple(parts), unrecognized=tuple(unrecognized))
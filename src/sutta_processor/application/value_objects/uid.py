@@ -2,7 +2,7 @@ import logging
 import re
 import string
 from itertools import zip_longest
-from typing import Optional, Union
+from typing import Dict, Optional, Union
 
 import attr
 
@@ -209,20 +209,92 @@ class Nya(BaseUID):
         return nya
 
 
+class UidInternTable:
+    """
+    Process-wide index of already parsed UIDs.
+
+    The same segment id is found in root, html, comment, variant, every translation
+    and reference. It's parsed once, and all the aggregates share the same instance.
+    """
+
+    _STATS_INFO = "* [%s] Interned UIDs: '%s', hits: '%s', misses: '%s'"
+
+    def __init__(self):
+        self.index: Dict[str, "UID"] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, content: str) -> Optional["UID"]:
+        uid = self.index.get(content)
+        if uid is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return uid
+
+    def add(self, uid: "UID"):
+        self.index[str(uid)] = uid
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {"interned": len(self.index), "hits": self.hits, "misses": self.misses}
+
+    def log_stats(self, name: str):
+        log.debug(self._STATS_INFO, name, len(self.index), self.hits, self.misses)
+
+    def clear(self):
+        self.index.clear()
+        self.hits = 0
+        self.misses = 0
+
+
 class UID(BaseUID):
     ALLOWED_SET = set(string.ascii_letters + string.digits + "-:.")
+    # Same ids as accepted by ALLOWED_SET, UidKey and Sequence.from_str together,
+    # ASCII only like ALLOWED_SET (\d would take any unicode digit)
+    _SEGMENT = r"(?:-?\d+|\d+-\d[a-zA-Z\d-]*)"
+    valid_uid = re.compile(rf"[a-zA-Z\d.-]*:{_SEGMENT}(?:\.{_SEGMENT})*", re.ASCII)
 
-    root: RootUID  # uid: mn143:20.3 -> base: mn143:20
+    _key: UidKey
+    _root: RootUID
+
+    intern_table = UidInternTable()
 
     def __new__(cls, content: str):
-        if not set(content).issubset(cls.ALLOWED_SET):
-            raise SegmentIdError(f"Invalid uid: '{content}'")
+        uid = cls.intern_table.get(content)
+        if uid is not None:
+            return uid
+        if not cls.valid_uid.fullmatch(content):
+            # Parse it to get the same error as before
+            if not set(content).issubset(cls.ALLOWED_SET):
+                raise SegmentIdError(f"Invalid uid: '{content}'")
+            UidKey(raw=content)
         uid = super().__new__(cls, content)
-        key = UidKey(raw=content)
-        uid.key = key
-        uid.root = f"{key.key}{key.seq.head}"
+        cls.intern_table.add(uid)
         return uid
 
+    @property
+    def key(self) -> UidKey:
+        """Parsed on first use, most of the checks only compare the ids."""
+        if getattr(self, "_key", None) is None:
+            self._key = UidKey(raw=self)
+        return self._key
+
+    @property
+    def seq(self) -> Sequence:
+        return self.key.seq
+
+    @property
+    def root(self) -> RootUID:
+        """uid: mn143:20.3 -> base: mn143:20"""
+        if getattr(self, "_root", None) is None:
+            self._root = f"{self.key.key}{self.key.seq.head}"
+        return self._root
+
+    def __reduce__(self):
+        # Unpickled UIDs go through the intern table as well
+        return self.__class__, (str(self),)
+
     def strip_last_parts(self, parts_to_skip: int = 1) -> str:
         """
         Help with creating new uids.
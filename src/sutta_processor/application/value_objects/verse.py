@@ -1,15 +1,8 @@
 from abc import ABC
 from collections import namedtuple
 
-from sutta_processor.shared.exceptions import (
-    MsIdError,
-    NyaError,
-    PtsCsError,
-    PtsPliError,
-    ScIdError,
-)
-
-from .uid import UID, BaseUID, MsId, Nya, PtsCs, PtsPli, ScID
+from .reference import ReferenceParser
+from .uid import Nya, PtsCs, PtsPli, ScID
 
 
 class RawVerse(str):
@@ -19,9 +12,10 @@ class RawVerse(str):
 
 class References(set):
     sc_id: ScID
-    sc_id: PtsPli
+    pts_pli: PtsPli
     pts_cs: PtsCs
     nya: Nya
+    unrecognized: tuple
 
     def __init__(self, *a):
         """
@@ -31,54 +25,25 @@ class References(set):
         pts_pli = ""
         pts_cs = ""
         nya = ""
+        unrecognized = ()
         if len(a) == 1:
-            parts = set()
-            ids = a[0]
-            if isinstance(ids, str):
-                if "," in ids:
-                    ids = ids.split(",")
-                else:
-                    ids = [ids]
-            for part in ids:
-                part = BaseUID(part.strip())
-                if not part:
-                    continue
-                try:
-                    part = ScID(part)
+            parsed = ReferenceParser.parse(reference=a[0])
+            for part in parsed.parts:
+                if isinstance(part, ScID):
                     if not sc_id:
                         # It might happen that there are several sc_ids in
                         # references. That will set the first as the reference
                         # eg. "mn10:34.1": "msdiv114, sc39, sc48,.." will set sc39
                         sc_id = part
-                except ScIdError:
-                    pass
-                try:
-                    part = PtsPli(part)
+                elif isinstance(part, PtsPli):
                     if not pts_pli:
-                        # It might happen that there are several sc_ids in
-                        # references. That will set the first as the reference
-                        # eg. "mn10:34.1": "msdiv114, sc39, sc48,.." will set sc39
                         pts_pli = part
-                except PtsPliError:
-                    pass
-                try:
-                    part = PtsCs(part)
+                elif isinstance(part, PtsCs):
                     pts_cs = part
-                except PtsCsError:
-                    pass
-
-                try:
-                    part = Nya(part)
-
+                elif isinstance(part, Nya):
                     nya = part
-                except NyaError:
-                    pass
-                try:
-                    part = MsId(part)
-                    pts_cs = part
-                except MsIdError:
-                    pass
-                parts.add(part)
+            parts = parsed.parts
+            unrecognized = parsed.unrecognized
         else:
             parts = a
         super().__init__(parts)
@@ -86,6 +51,7 @@ class References(set):
         self.pts_pli = pts_pli
         self.pts_cs = pts_cs
         self.nya = nya
+        self.unrecognized = unrecognized
 
     @property
     def data(self) -> str:
@@ -114,12 +80,25 @@ class VerseTokens(tuple):
 
 
 class BaseVerse(ABC, str):
+    _tokens: VerseTokens = None
+
     @property
     def tokens(self) -> VerseTokens:
-        from sutta_processor.application.check_service.tokenizer import VersetTokenizer
+        """Tokenized on first use. Call `release_tokens` when they are not needed."""
+        if self._tokens is None:
+            from sutta_processor.application.check_service.tokenizer import (
+                VersetTokenizer,
+            )
 
-        tokens = VersetTokenizer.get_tokens(txt=self)
-        return tokens
+            self._tokens = VersetTokenizer.get_tokens(txt=self)
+        return self._tokens
+
+    def release_tokens(self):
+        self.__dict__.pop("_tokens", None)
+
+    def __reduce__(self):
+        # Don't pickle cached tokens
+        return self.__class__, (str(self),)
 
 
 class Verse(BaseVerse):
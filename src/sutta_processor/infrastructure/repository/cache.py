@@ -0,0 +1,208 @@
+import hashlib
+import logging
+import os
+import pickle
+import shutil
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import sutta_processor
+from sutta_processor.application.domain_models.base import BaseFileAggregate
+
+log = logging.getLogger(__name__)
+
+PACKAGE_ROOT = Path(sutta_processor.__file__).parent
+
+
+def get_sources_version(sources: Tuple[str, ...], cache_format: int) -> str:
+    """Hash of the package sources (dirs or files) that shape the cached data."""
+    version = hashlib.sha1()
+    stamp = (cache_format, sutta_processor.__version__, sys.version_info[:2])
+    version.update(repr(stamp).encode())
+    for source in sources:
+        source_pth = PACKAGE_ROOT / source
+        f_pths = [source_pth] if source_pth.is_file() else sorted(source_pth.glob("**/*.py"))
+        for f_pth in f_pths:
+            version.update(str(f_pth.relative_to(PACKAGE_ROOT)).encode())
+            version.update(f_pth.read_bytes())
+    return version.hexdigest()[:16]
+
+
+class FileAggregateCache:
+    """
+    Parsed file aggregates stored on disk, one pickle per data file.
+
+    Entry is valid when size and mtime of the data file are the same as when the entry
+    was written. When only the mtime differs (eg. fresh git checkout) the content hash
+    decides. All entries live in a directory named after the cache version, so any
+    change to the pickled classes makes the old entries unreachable.
+    """
+
+    CACHE_FORMAT = 1
+    DIR_NAME = "file_aggregates"
+    EXTENSION = "pickle"
+    # Sources of everything that ends up in the pickled file aggregates
+    MODEL_SOURCES = (
+        "application/domain_models",
+        "application/value_objects",
+    )
+
+    def __init__(self, cache_dir: Path):
+        self.base_dir = cache_dir / self.DIR_NAME
+        self.version = self.get_version()
+        self.root = self.base_dir / self.version
+        self.c: Counter = Counter(hit=0, rehash=0, miss=0, error=0)
+        self.root.mkdir(exist_ok=True, parents=True)
+        self.remove_stale_versions()
+
+    @classmethod
+    def get_version(cls) -> str:
+        return get_sources_version(sources=cls.MODEL_SOURCES, cache_format=cls.CACHE_FORMAT)
+
+    @classmethod
+    def get_digest(cls, f_pth: Path) -> str:
+        with open(f_pth, "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()
+
+    def remove_stale_versions(self):
+        for pth in self.base_dir.iterdir():
+            if pth.is_dir() and pth.name != self.version:
+                log.info("Removing stale cache: '%s'", pth)
+                shutil.rmtree(pth, ignore_errors=True)
+
+    def get_entry_path(self, f_pth: Path, file_aggregate_cls) -> Path:
+        key = hashlib.sha1(str(Path(f_pth).resolve()).encode()).hexdigest()
+        return self.root / file_aggregate_cls.__name__ / f"{key}.{self.EXTENSION}"
+
+    def get(
+        self, f_pth: Path, file_aggregate_cls, st: os.stat_result = None
+    ) -> Optional[BaseFileAggregate]:
+        entry_pth = self.get_entry_path(f_pth=f_pth, file_aggregate_cls=file_aggregate_cls)
+        try:
+            st = st or os.stat(f_pth)
+            with open(entry_pth, "rb") as f:
+                meta = pickle.load(f)
+                if meta["size"] != st.st_size:
+                    self.c["miss"] += 1
+                    return None
+                is_touched = meta["mtime_ns"] != st.st_mtime_ns
+                if is_touched and meta["digest"] != self.get_digest(f_pth=f_pth):
+                    self.c["miss"] += 1
+                    return None
+                file_aggregate = pickle.load(f)
+        except FileNotFoundError:
+            self.c["miss"] += 1
+            return None
+        except Exception as e:
+            log.debug("Broken cache entry '%s' for: '%s'. Error: %s", entry_pth, f_pth, e)
+            self.c["error"] += 1
+            return None
+
+        if is_touched:
+            # Same content, store the new mtime so that next time hash is not needed
+            self.c["rehash"] += 1
+            self.put(f_pth=f_pth, file_aggregate=file_aggregate, st=st)
+        else:
+            self.c["hit"] += 1
+        return file_aggregate
+
+    def put(
+        self, f_pth: Path, file_aggregate: BaseFileAggregate, st: os.stat_result = None
+    ):
+        entry_pth = self.get_entry_path(f_pth=f_pth, file_aggregate_cls=type(file_aggregate))
+        tmp_pth = entry_pth.with_name(f"{entry_pth.name}.{os.getpid()}.tmp")
+        try:
+            st = st or os.stat(f_pth)
+            meta = {
+                "f_pth": str(f_pth),
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+                "digest": self.get_digest(f_pth=f_pth),
+            }
+            entry_pth.parent.mkdir(exist_ok=True, parents=True)
+            with open(tmp_pth, "wb") as f:
+                pickle.dump(meta, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(file_aggregate, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_pth, entry_pth)
+        except Exception as e:
+            log.warning("Can't cache file: '%s'. Error: %s", f_pth, e)
+            if tmp_pth.exists():
+                tmp_pth.unlink()
+
+    def log_stats(self, name: str):
+        msg = "* [%s] Cache hits: '%s', rehashed: '%s', misses: '%s', broken: '%s'"
+        log.info(msg, name, self.c["hit"], self.c["rehash"], self.c["miss"], self.c["error"])
+        self.c.clear()
+
+
+class MigrationResultCache:
+    """
+    check_migration result of every sutta from the last run, all in one pickle file.
+
+    Result is valid as long as the digest of the sutta inputs (root and reference files
+    and the Yuttadhammo verses they cover) is the same. Results of suttas that were not
+    checked in this run are dropped on save.
+    """
+
+    CACHE_FORMAT = 1
+    DIR_NAME = "migration_results"
+    FILE_NAME = "results.pickle"
+    SOURCES = FileAggregateCache.MODEL_SOURCES + ("application/use_cases/check_migration.py",)
+
+    def __init__(self, cache_dir: Path):
+        self.f_pth = cache_dir / self.DIR_NAME / self.FILE_NAME
+        self.version = get_sources_version(sources=self.SOURCES, cache_format=self.CACHE_FORMAT)
+        self.c: Counter = Counter(hit=0, miss=0)
+        # key: (digest, result)
+        self.entries: Dict[str, Tuple[str, Any]] = self.load()
+        self.checked: Dict[str, Tuple[str, Any]] = {}
+
+    def load(self) -> Dict[str, Tuple[str, Any]]:
+        try:
+            with open(self.f_pth, "rb") as f:
+                data = pickle.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            log.debug("Broken cache file '%s'. Error: %s", self.f_pth, e)
+            return {}
+        if data.get("version") != self.version:
+            log.info("Stale check_migration results, all suttas will be compared")
+            return {}
+        return data["entries"]
+
+    def get(self, key: str, digest: str) -> Any:
+        """Cached result, raises KeyError when there is no valid one."""
+        entry = self.entries.get(key)
+        if entry is None or entry[0] != digest:
+            self.c["miss"] += 1
+            raise KeyError(key)
+        self.c["hit"] += 1
+        self.checked[key] = entry
+        return entry[1]
+
+    def put(self, key: str, digest: str, result: Any):
+        self.checked[key] = (digest, result)
+
+    def save(self):
+        if self.checked == self.entries:
+            return
+        tmp_pth = self.f_pth.with_name(f"{self.f_pth.name}.{os.getpid()}.tmp")
+        try:
+            self.f_pth.parent.mkdir(exist_ok=True, parents=True)
+            with open(tmp_pth, "wb") as f:
+                data = {"version": self.version, "entries": self.checked}
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_pth, self.f_pth)
+            self.entries = dict(self.checked)
+        except Exception as e:
+            log.warning("Can't save check_migration results: '%s'. Error: %s", self.f_pth, e)
+            if tmp_pth.exists():
+                tmp_pth.unlink()
+
+    def log_stats(self, name: str):
+        msg = "* [%s] Cached results: '%s', to compare: '%s'"
+        log.info(msg, name, self.c["hit"], self.c["miss"])
+        self.c.clear()
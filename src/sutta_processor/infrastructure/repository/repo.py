@@ -4,7 +4,7 @@ import os
 import pickle
 import stat
 from pathlib import Path
-from typing import List, Set
+from typing import List, Optional, Set
 
 from sutta_processor.application.domain_models import (
     BilaraCommentAggregate,
@@ -22,18 +22,48 @@ from sutta_processor.application.domain_models.base import (
 from sutta_processor.application.domain_models.bilara_translation.root import (
     BilaraTranslationFileAggregate,
 )
+from sutta_processor.application.domain_models.loader import FileAggregateLoader
+from sutta_processor.application.domain_models.scanner import CorpusScanner
 from sutta_processor.shared.config import NULL_PTH, Config
 
+from .cache import FileAggregateCache, MigrationResultCache
+from .yutta_conversion import YuttaHtmlConverter
+from .yutta_corpus import YuttaCorpusArtifact
+
 log = logging.getLogger(__name__)
 
 
+def get_cache(cfg: Config) -> Optional[FileAggregateCache]:
+    if cfg.cache_dir == NULL_PTH:
+        return None
+    return FileAggregateCache(cache_dir=cfg.cache_dir)
+
+
 class YuttadhammoRepo:
     def __init__(self, cfg: Config):
         self.cfg = cfg
+        self.loader = FileAggregateLoader(workers=cfg.load_workers, cache=get_cache(cfg=cfg))
 
     def get_aggregate(self) -> YuttaAggregate:
+        if self.cfg.yutta_corpus_path != NULL_PTH:
+            root_aggregate = YuttaCorpusArtifact.read(f_pth=self.cfg.yutta_corpus_path,
+                                                      root_pth=self.cfg.ms_yuttadhammo_path,
+                                                      exclude_dirs=self.cfg.exclude_dirs)
+            return root_aggregate or self.build_corpus()
+        return self.parse_aggregate()
+
+    def parse_aggregate(self) -> YuttaAggregate:
         root_aggregate = YuttaAggregate.from_path(exclude_dirs=self.cfg.exclude_dirs,
-                                                  root_pth=self.cfg.ms_yuttadhammo_path)
+                                                  root_pth=self.cfg.ms_yuttadhammo_path,
+                                                  loader=self.loader)
+        return root_aggregate
+
+    def build_corpus(self) -> YuttaAggregate:
+        root_aggregate = self.parse_aggregate()
+        YuttaCorpusArtifact.write(aggregate=root_aggregate,
+                                  f_pth=self.cfg.yutta_corpus_path,
+                                  root_pth=self.cfg.ms_yuttadhammo_path,
+                                  exclude_dirs=self.cfg.exclude_dirs)
         return root_aggregate
 
     def get_xml_data_for_conversion(self) -> YuttaAggregate:
@@ -44,18 +74,19 @@ class YuttadhammoRepo:
 
     @classmethod
     def save_yutta_html_files(cls, aggregate: YuttaAggregate):
-        def save_file(f_aggregate):
-            f_pth = str(f_aggregate.f_pth).replace("xml", "html")
-            with open(f_pth, "w") as f:
-                f.write(f_aggregate.html_cleaned)
-
         for file_aggregate in aggregate.file_aggregates:
             log.trace("Saving html file for xml: '%s'", file_aggregate.f_pth.name)
-            save_file(f_aggregate=file_aggregate)
+            YuttaHtmlConverter.save(file_aggregate=file_aggregate)
+
+    def convert_yutta_html_files(self):
+        """Same as get_xml_data_for_conversion + save_yutta_html_files, streamed file by file."""
+        converter = YuttaHtmlConverter(workers=self.cfg.load_workers)
+        return converter.convert(root_pth=self.cfg.ms_yuttadhammo_path)
 
 
 class BilaraRepo:
     _root: BilaraRootAggregate = None
+    _pali_root: BilaraRootAggregate = None
     _html: BilaraHtmlAggregate = None
     _comment: BilaraCommentAggregate = None
     _variant: BilaraVariantAggregate = None
@@ -64,6 +95,20 @@ class BilaraRepo:
 
     def __init__(self, cfg: Config):
         self.cfg = cfg
+        self.scanner = CorpusScanner(
+            trees={
+                "root": cfg.bilara_root_path,
+                "html": cfg.bilara_html_path,
+                "comment": cfg.bilara_comment_path,
+                "variant": cfg.bilara_variant_path,
+                "translation": cfg.bilara_translation_path,
+                "reference": cfg.reference_root_path,
+            },
+            exclude_dirs=cfg.exclude_dirs,
+        )
+        self.loader = FileAggregateLoader(
+            workers=cfg.load_workers, cache=get_cache(cfg=cfg), scanner=self.scanner
+        )
 
     def get_root(self) -> BilaraRootAggregate:
         if not self._root:
@@ -71,9 +116,23 @@ class BilaraRepo:
                 exclude_dirs=self.cfg.exclude_dirs,
                 root_pth=self.cfg.bilara_root_path,
                 root_langs=self.cfg.bilara_root_langs,
+                loader=self.loader,
             )
         return self._root
 
+    def get_pali_root(self) -> BilaraRootAggregate:
+        """Only the pali root texts (first of the root langs), all of them when already loaded."""
+        if self._root:
+            return self._root
+        if not self._pali_root:
+            self._pali_root = BilaraRootAggregate.from_path(
+                exclude_dirs=self.cfg.exclude_dirs,
+                root_pth=self.cfg.bilara_root_path,
+                root_langs=self.cfg.bilara_root_langs[:1],
+                loader=self.loader,
+            )
+        return self._pali_root
+
     def get_root_from_files(self, file_paths: List[Path]) -> BilaraRootAggregate:
         """A version of the get_root function that works on a list of files as a pathlib.Path obect."""
         if not self._root:
@@ -81,6 +140,7 @@ class BilaraRepo:
                 exclude_dirs=self.cfg.exclude_dirs,
                 file_paths=file_paths,
                 root_langs=self.cfg.bilara_root_langs,
+                loader=self.loader,
             )
         return self._root
 
@@ -88,7 +148,8 @@ class BilaraRepo:
         if not self._html:
             self._html = BilaraHtmlAggregate.from_path(
                 exclude_dirs=self.cfg.exclude_dirs,
-                root_pth=self.cfg.bilara_html_path
+                root_pth=self.cfg.bilara_html_path,
+                loader=self.loader,
             )
         return self._html
 
@@ -97,7 +158,8 @@ class BilaraRepo:
         if not self._html:
             self._html = BilaraHtmlAggregate.from_file_paths(
                 exclude_dirs=self.cfg.exclude_dirs,
-                file_paths=file_paths
+                file_paths=file_paths,
+                loader=self.loader,
             )
         return self._html
 
@@ -105,7 +167,8 @@ class BilaraRepo:
         if not self._comment:
             self._comment = BilaraCommentAggregate.from_path(
                 exclude_dirs=self.cfg.exclude_dirs,
-                root_pth=self.cfg.bilara_comment_path
+                root_pth=self.cfg.bilara_comment_path,
+                loader=self.loader,
             )
         return self._comment
 
@@ -114,6 +177,7 @@ class BilaraRepo:
             self._comment = BilaraCommentAggregate.from_file_paths(
                 exclude_dirs=self.cfg.exclude_dirs,
                 file_paths=file_paths,
+                loader=self.loader,
             )
         return self._comment
 
@@ -121,7 +185,8 @@ class BilaraRepo:
         if not self._variant:
             self._variant = BilaraVariantAggregate.from_path(
                 exclude_dirs=self.cfg.exclude_dirs,
-                root_pth=self.cfg.bilara_variant_path
+                root_pth=self.cfg.bilara_variant_path,
+                loader=self.loader,
             )
         return self._variant
 
@@ -130,6 +195,7 @@ class BilaraRepo:
             self._variant = BilaraVariantAggregate.from_file_paths(
                 exclude_dirs=self.cfg.exclude_dirs,
                 file_paths=file_paths,
+                loader=self.loader,
             )
         return self._variant
 
@@ -138,6 +204,7 @@ class BilaraRepo:
             self._translation = BilaraTranslationAggregate.from_path(
                 exclude_dirs=self.cfg.exclude_dirs,
                 root_pth=self.cfg.bilara_translation_path,
+                loader=self.loader,
             )
         return self._translation
 
@@ -146,6 +213,7 @@ class BilaraRepo:
             self._translation = BilaraTranslationAggregate.from_file_paths(
                 exclude_dirs=self.cfg.exclude_dirs,
                 file_paths=file_paths,
+                loader=self.loader,
             )
         return self._translation
 
@@ -153,7 +221,8 @@ class BilaraRepo:
         if not self._reference:
             self._reference = BilaraReferenceAggregate.from_path(
                 exclude_dirs=self.cfg.exclude_dirs,
-                root_pth=self.cfg.reference_root_path
+                root_pth=self.cfg.reference_root_path,
+                loader=self.loader,
             )
         return self._reference
 
@@ -162,6 +231,7 @@ class BilaraRepo:
             self._reference = BilaraReferenceAggregate.from_file_paths(
                 exclude_dirs=self.cfg.exclude_dirs,
                 file_paths=file_paths,
+                loader=self.loader,
             )
         return self._reference
 
@@ -180,6 +250,11 @@ class FileRepository:
         self.yutta: YuttadhammoRepo = YuttadhammoRepo(cfg=cfg)
         self.bilara: BilaraRepo = BilaraRepo(cfg=cfg)
 
+    def get_migration_cache(self) -> Optional[MigrationResultCache]:
+        if self.cfg.cache_dir == NULL_PTH:
+            return None
+        return MigrationResultCache(cache_dir=self.cfg.cache_dir)
+
     def dump_pickle(self, aggregate):
         out_pth = self.cfg.debug_dir / f"{aggregate.name()}.{self.PICKLE_EXTENSION}"
         out_pth.touch(exist_ok=True)
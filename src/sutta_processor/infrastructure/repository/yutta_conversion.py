@@ -0,0 +1,88 @@
+import logging
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+from natsort import natsorted, ns
+
+from sutta_processor.application.domain_models.ms_yuttadhammo.base import (
+    YuttaFileAggregate,
+)
+from sutta_processor.shared.config import Logging
+
+log = logging.getLogger(__name__)
+
+
+def _convert_file(f_pth: Path) -> Tuple[Path, str]:
+    """Extract, clean and write one file. Only the status goes back from the worker."""
+    try:
+        file_aggregate = YuttaFileAggregate.convert_to_html(f_pth=f_pth)
+        YuttaHtmlConverter.save(file_aggregate=file_aggregate)
+    except Exception as e:
+        return f_pth, f"{type(e).__name__}: {e}"
+    return f_pth, ""
+
+
+class YuttaHtmlConverter:
+    """
+    Yuttadhammo xml files converted to the cleaned html, one file at a time
+    (extract -> clean -> write), so only the files in progress are kept in memory.
+
+    Files are spread over a process pool with `workers > 1`. Files whose html is newer
+    than the xml are skipped.
+    """
+
+    CHUNKS_PER_WORKER = 4
+
+    def __init__(self, workers: int = 1):
+        self.workers = max(1, workers or 1)
+
+    @classmethod
+    def get_html_path(cls, f_pth: Path) -> Path:
+        return Path(str(f_pth).replace("xml", "html"))
+
+    @classmethod
+    def save(cls, file_aggregate: YuttaFileAggregate):
+        html_pth = cls.get_html_path(f_pth=file_aggregate.f_pth)
+        html_pth.parent.mkdir(exist_ok=True, parents=True)
+        # Replaced, not rewritten, so the directory mtime tells the corpus artifact is stale
+        tmp_pth = html_pth.with_name(f"{html_pth.name}.{os.getpid()}.tmp")
+        with open(tmp_pth, "w") as f:
+            f.write(file_aggregate.html_cleaned)
+        os.replace(tmp_pth, html_pth)
+
+    @classmethod
+    def is_up_to_date(cls, f_pth: Path) -> bool:
+        try:
+            html_mtime = os.stat(cls.get_html_path(f_pth=f_pth)).st_mtime_ns
+            return html_mtime >= os.stat(f_pth).st_mtime_ns
+        except OSError:
+            return False
+
+    def convert(self, root_pth: Path) -> Counter:
+        all_files = natsorted(root_pth.glob("**/*.xml"), alg=ns.PATH)
+        to_convert = [f_pth for f_pth in all_files if not self.is_up_to_date(f_pth=f_pth)]
+        c: Counter = Counter(ok=0, error=0, skipped=len(all_files) - len(to_convert))
+        for i, (f_pth, error) in enumerate(self.convert_files(all_files=to_convert)):
+            if error:
+                log.warning("Error processing: %s, file: '%s', ", error, f_pth)
+                c["error"] += 1
+            else:
+                c["ok"] += 1
+            log.trace("Converting file: %s/%s", i, len(to_convert))
+        msg = "* [%s] Converted: '%s' files. up to date: '%s', errors: '%s'"
+        log.info(msg, self.__class__.__name__, c["ok"], c["skipped"], c["error"])
+        return c
+
+    def convert_files(self, all_files: List[Path]) -> Iterator[Tuple[Path, str]]:
+        if self.workers == 1 or len(all_files) < 2:
+            yield from map(_convert_file, all_files)
+            return
+
+        chunksize = max(1, len(all_files) // (self.workers * self.CHUNKS_PER_WORKER))
+        with ProcessPoolExecutor(
+            max_workers=self.workers, initializer=Logging.add_trace_level
+        ) as executor:
+            yield from executor.map(_convert_file, all_files, chunksize=chunksize)
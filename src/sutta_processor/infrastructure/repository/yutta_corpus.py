@@ -0,0 +1,341 @@
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, Optional, Set, Union
+
+import attr
+
+from sutta_processor.application.domain_models import YuttaAggregate
+from sutta_processor.application.domain_models.ms_yuttadhammo.base import (
+    YuttaFileAggregate,
+    YuttaVerses,
+)
+from sutta_processor.application.value_objects import MsId
+from sutta_processor.shared.profiler import profiler
+
+from .cache import get_sources_version
+
+log = logging.getLogger(__name__)
+
+Section = Union[memoryview, array]
+
+
+class YuttaCorpus:
+    """
+    Sections of an opened artifact, used in place on the memory map. Ms ids and
+    verses are decoded on first access.
+    """
+
+    def __init__(
+        self,
+        data: mmap.mmap,
+        file_ends: Section,
+        last_flags: Section,
+        id_offsets: Section,
+        verse_offsets: Section,
+        id_order: Section,
+        ids_start: int,
+        verses_start: int,
+    ):
+        self.data = data
+        self.file_ends = file_ends
+        self.last_flags = last_flags
+        self.id_offsets = id_offsets
+        self.verse_offsets = verse_offsets
+        self.id_order = id_order
+        self.ids_start = ids_start
+        self.verses_start = verses_start
+        self.verses: Dict[int, YuttaVerses] = {}
+
+    def __len__(self) -> int:
+        return len(self.id_order)
+
+    def get_id_bytes(self, position: int) -> bytes:
+        start = self.ids_start + self.id_offsets[position]
+        return self.data[start : self.ids_start + self.id_offsets[position + 1]]
+
+    def get_ms_id(self, position: int) -> MsId:
+        return MsId(str(self.get_id_bytes(position=position), "utf-8"))
+
+    def get_verses(self, position: int) -> YuttaVerses:
+        verses = self.verses.get(position)
+        if verses is None:
+            start = self.verses_start + self.verse_offsets[position]
+            end = self.verses_start + self.verse_offsets[position + 1]
+            verse = str(self.data[start:end], "utf-8")
+            verses = YuttaVerses(ms_id=self.get_ms_id(position=position), verse=verse)
+            self.verses[position] = verses
+        return verses
+
+    def find(self, ms_id: str) -> Optional[int]:
+        """Position of the ms id, by bisection of the positions sorted by ms id."""
+        key = ms_id.encode()
+        lo, hi = 0, len(self.id_order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.get_id_bytes(position=self.id_order[mid]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self.id_order) and self.get_id_bytes(position=self.id_order[lo]) == key:
+            return self.id_order[lo]
+        return None
+
+    def get_last_ms_ids(self) -> Set[MsId]:
+        return {self.get_ms_id(position=p) for p, flag in enumerate(self.last_flags) if flag}
+
+
+class YuttaCorpusIndex(Mapping):
+    """MsId -> YuttaVerses of the corpus positions from start to end, in the file order."""
+
+    def __init__(self, corpus: YuttaCorpus, start: int, end: int):
+        self.corpus = corpus
+        self.start = start
+        self.end = end
+
+    def _find(self, ms_id) -> Optional[int]:
+        if not isinstance(ms_id, str):
+            return None
+        position = self.corpus.find(ms_id=ms_id)
+        if position is None or not self.start <= position < self.end:
+            return None
+        return position
+
+    def __getitem__(self, ms_id: MsId) -> YuttaVerses:
+        position = self._find(ms_id=ms_id)
+        if position is None:
+            raise KeyError(ms_id)
+        return self.corpus.get_verses(position=position)
+
+    def __contains__(self, ms_id) -> bool:
+        return self._find(ms_id=ms_id) is not None
+
+    def __iter__(self) -> Iterator[MsId]:
+        return (self.corpus.get_ms_id(position=p) for p in range(self.start, self.end))
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def values(self) -> Iterator[YuttaVerses]:
+        return (self.corpus.get_verses(position=p) for p in range(self.start, self.end))
+
+    def items(self) -> Iterator:
+        return ((verses.ms_id, verses) for verses in self.values())
+
+
+@attr.s(frozen=True, auto_attribs=True, str=False)
+class YuttaCorpusAggregate(YuttaAggregate):
+    """YuttaAggregate opened from the artifact, last ms ids come from its flags."""
+
+    corpus: YuttaCorpus = attr.ib(default=None, repr=False)
+
+    @classmethod
+    def name(cls) -> str:
+        return YuttaAggregate.name()
+
+    def get_last_ms_ids(self) -> Set[MsId]:
+        return self.corpus.get_last_ms_ids()
+
+
+class YuttaCorpusArtifact:
+    """
+    Yuttadhammo corpus compiled into one binary file, so it's not parsed from html on
+    every run.
+
+    Layout (little endian):
+        header: magic, format, files count, ids count, meta length
+        meta: json with the version, the directory stamps and relative file paths
+        u32 file_ends[files]: position after the last ms id of every file
+        u8 last_flags[ids]: 1 for the last ms id in the file
+        u32 id_offsets[ids + 1], u32 verse_offsets[ids + 1]: byte offsets in the blobs
+        u32 id_order[ids]: positions sorted by the ms id
+        ids blob, verses blob: utf-8, with their byte lengths before each
+    Sections start at 8 byte boundaries. The file is memory mapped and the sections are
+    used in place, nothing is decoded when it's opened (see YuttaCorpus).
+
+    Artifact is valid for the same format and extractor sources, and the same mtimes of
+    the html directories. Adding, removing or converting files (they are replaced)
+    changes them, html edited in place needs `build_yutta_corpus`.
+    """
+
+    MAGIC = b"YUTTACRP"
+    FORMAT = 3
+    HEADER = struct.Struct("<8sIIII")
+    ALIGN = 8
+    # Arrays are stored little endian, on such machines they are used in place
+    IN_PLACE = sys.byteorder == "little"
+    SOURCES = (
+        "application/domain_models/ms_yuttadhammo",
+        "application/value_objects",
+    )
+
+    @classmethod
+    def get_version(cls) -> str:
+        return get_sources_version(sources=cls.SOURCES, cache_format=cls.FORMAT)
+
+    @classmethod
+    def get_dir_stamps(cls, root_pth: Path, exclude_dirs: List[str]) -> Dict[str, int]:
+        """Mtimes of the html directories, taken when the artifact is built."""
+        exclude_dirs = set(exclude_dirs or [])
+        stamps = {}
+        for dir_pth, dir_names, _ in os.walk(root_pth):
+            dir_names[:] = [name for name in dir_names if name not in exclude_dirs]
+            stamps[os.path.relpath(dir_pth, root_pth)] = os.stat(dir_pth).st_mtime_ns
+        return stamps
+
+    @classmethod
+    def is_stamp_valid(cls, root_pth: Path, stamps: Dict[str, int]) -> bool:
+        """Only the directories of the build are checked, new ones change their parent."""
+        try:
+            return all(
+                os.stat(root_pth / rel_dir).st_mtime_ns == mtime
+                for rel_dir, mtime in stamps.items()
+            )
+        except OSError:
+            return False
+
+    @classmethod
+    def pad(cls, size: int) -> bytes:
+        return b"\0" * (-size % cls.ALIGN)
+
+    @classmethod
+    def write(
+        cls, aggregate: YuttaAggregate, f_pth: Path, root_pth: Path, exclude_dirs: List[str]
+    ):
+        # Taken first, so files changed during the build make the artifact stale
+        stamps = cls.get_dir_stamps(root_pth=root_pth, exclude_dirs=exclude_dirs)
+        files = []
+        file_ends, last_flags = array("I"), array("B")
+        id_offsets, verse_offsets = array("I", [0]), array("I", [0])
+        ids, verses_texts = [], []
+        for file_aggregate in aggregate.file_aggregates:
+            files.append(str(Path(file_aggregate.f_pth).relative_to(root_pth)))
+            for verses in file_aggregate.index.values():
+                ms_id, verse = verses.ms_id.encode(), verses.verse.encode()
+                ids.append(ms_id)
+                verses_texts.append(verse)
+                last_flags.append(0)
+                id_offsets.append(id_offsets[-1] + len(ms_id))
+                verse_offsets.append(verse_offsets[-1] + len(verse))
+            if file_aggregate.index:
+                last_flags[-1] = 1
+            file_ends.append(len(ids))
+        id_order = array("I", sorted(range(len(ids)), key=ids.__getitem__))
+
+        meta = {"version": cls.get_version(), "stamps": stamps, "files": files}
+        meta_bytes = json.dumps(meta, ensure_ascii=False).encode()
+        header = cls.HEADER.pack(
+            cls.MAGIC, cls.FORMAT, len(files), len(ids), len(meta_bytes)
+        )
+        sections = [header, meta_bytes]
+        for section in (file_ends, last_flags, id_offsets, verse_offsets, id_order):
+            if not cls.IN_PLACE:
+                section.byteswap()
+            sections.append(section.tobytes())
+        for blob in (b"".join(ids), b"".join(verses_texts)):
+            sections.extend([struct.pack("<Q", len(blob)), blob])
+
+        tmp_pth = f_pth.with_name(f"{f_pth.name}.{os.getpid()}.tmp")
+        f_pth.parent.mkdir(exist_ok=True, parents=True)
+        with open(tmp_pth, "wb") as f:
+            for section in sections:
+                f.write(section)
+                f.write(cls.pad(len(section)))
+        os.replace(tmp_pth, f_pth)
+        size = f_pth.stat().st_size
+        msg = "* [%s] Saved '%s' files, '%s' ms ids to: '%s' (%.1f MiB)"
+        log.info(msg, cls.__name__, len(files), len(ids), f_pth, size / 2 ** 20)
+
+    @classmethod
+    def read(
+        cls, f_pth: Path, root_pth: Path, exclude_dirs: List[str]
+    ) -> Optional[YuttaAggregate]:
+        """YuttaAggregate from the artifact, None when it's missing or not valid anymore."""
+        start = time.perf_counter()
+        try:
+            with profiler.measure(kind="aggregate", name=cls.__name__) as measurement:
+                with open(f_pth, "rb") as f:
+                    data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                aggregate = cls._read(data=data, root_pth=root_pth)
+                measurement.items = len(aggregate.index)
+        except FileNotFoundError:
+            log.info("Yuttadhammo corpus '%s' is not built yet", f_pth)
+            return None
+        except (OSError, ValueError) as e:
+            log.warning("Can't use Yuttadhammo corpus '%s': %s", f_pth, e)
+            return None
+        elapsed = time.perf_counter() - start
+        msg = "* [%s] Opened '%s' files, '%s' ms ids in %.3fs"
+        log.info(msg, cls.__name__, len(aggregate.file_aggregates), len(aggregate.index), elapsed)
+        return aggregate
+
+    @classmethod
+    def _read(cls, data: mmap.mmap, root_pth: Path) -> YuttaCorpusAggregate:
+        magic, fmt, files_count, ids_count, meta_len = cls.HEADER.unpack_from(data, 0)
+        if magic != cls.MAGIC or fmt != cls.FORMAT:
+            raise ValueError(f"unknown format: {magic!r}, {fmt}")
+        offset = cls.HEADER.size + len(cls.pad(cls.HEADER.size))
+        meta = json.loads(data[offset : offset + meta_len])
+        if meta["version"] != cls.get_version():
+            raise ValueError("built by a different version of the extractor, build it again")
+        if not cls.is_stamp_valid(root_pth=root_pth, stamps=meta["stamps"]):
+            raise ValueError(f"html files in '{root_pth}' have changed, build it again")
+        offset += meta_len + len(cls.pad(meta_len))
+
+        view = memoryview(data)
+        sections = []
+        for length, typecode in (
+            (files_count, "I"),
+            (ids_count, "B"),
+            (ids_count + 1, "I"),
+            (ids_count + 1, "I"),
+            (ids_count, "I"),
+        ):
+            size = length * array(typecode).itemsize
+            section = view[offset : offset + size].cast(typecode)
+            if not cls.IN_PLACE:
+                section = array(typecode, section)
+                section.byteswap()
+            sections.append(section)
+            offset += size + len(cls.pad(size))
+        blob_starts = []
+        for _ in range(2):
+            (size,) = struct.unpack_from("<Q", data, offset)
+            blob_starts.append(offset + 8)
+            offset += 8 + size + len(cls.pad(size))
+        file_ends, last_flags, id_offsets, verse_offsets, id_order = sections
+        corpus = YuttaCorpus(
+            data=data,
+            file_ends=file_ends,
+            last_flags=last_flags,
+            id_offsets=id_offsets,
+            verse_offsets=verse_offsets,
+            id_order=id_order,
+            ids_start=blob_starts[0],
+            verses_start=blob_starts[1],
+        )
+
+        file_aggregates = []
+        file_start = 0
+        for f_name, file_end in zip(meta["files"], file_ends):
+            file_aggregate = YuttaFileAggregate(
+                f_pth=root_pth / f_name,
+                index=YuttaCorpusIndex(corpus=corpus, start=file_start, end=file_end),
+                raw_html="",
+                raw_xml="",
+                # Verses are decoded on access through the index
+                versets=tuple(),
+                errors=tuple(),
+            )
+            file_aggregates.append(file_aggregate)
+            file_start = file_end
+        index = YuttaCorpusIndex(corpus=corpus, start=0, end=ids_count)
+        return YuttaCorpusAggregate(
+            file_aggregates=tuple(file_aggregates), index=index, corpus=corpus
+        )
@@ -1,18 +1,43 @@
 import logging
 import sys
+import tracemalloc
 from pathlib import Path
 from typing import Dict, List
 
 from sutta_processor.application import use_cases
-from sutta_processor.shared.config import Config, Logging, configure_argparse
+from sutta_processor.shared.config import NULL_PTH, Config, Logging, configure_argparse
+from sutta_processor.shared.findings import findings
+from sutta_processor.shared.profiler import RunProfiler, profiler
 
 log = logging.getLogger(__name__)
 
+ERROR_EXIT_STATUS = 10
+
+
+def get_exit_status():
+    """Status is based on the error findings and other error records of the run."""
+    return ERROR_EXIT_STATUS if findings.is_failed else 0
+
+
+def run_exec_module(cfg: Config, exec_module, **kwargs):
+    """Run the use case and save the run profile next to the app.log."""
+    if cfg.profile_memory:
+        tracemalloc.start()
+    try:
+        with profiler.measure(kind="use_case", name=exec_module.__name__, all_threads=True):
+            exec_module(cfg=cfg, **kwargs)
+        findings.log_summary()
+        cfg.exclude.log_unused()
+    finally:
+        if cfg.debug_dir != NULL_PTH:
+            profiler.save(
+                f_pth=cfg.debug_dir / RunProfiler.FILENAME,
+                exec_module=exec_module.__name__,
+                load_workers=cfg.load_workers,
+                check_workers=cfg.check_workers,
+            )
+        tracemalloc.stop()
 
-def get_exit_status(cfg: Config):
-    """Status is based on the length of report/error log."""
-    with open(cfg.debug_dir / Logging.REPORT_LOG_FILENAME) as f:
-        return len(f.read(10))
 
 def _sort_files(file_paths: List[Path]) -> Dict[str, List[Path]]:
     """Sort files based on the directory the belong to, like root or html, so the correct files can be easily passed to
@@ -68,16 +93,16 @@ def main() -> int:
                      "but exec_module was not 'check_all_changes'. Only 'check_all_changes' accepts files paths as"
                      " arguments.")
         all_files = _sort_files(file_paths=args.files)
-        exec_module(cfg=cfg, all_files=all_files)
-        return get_exit_status(cfg=cfg)
+        run_exec_module(cfg=cfg, exec_module=exec_module, all_files=all_files)
+        return get_exit_status()
 
     # Extra verification
     if not args.files and exec_module.__name__ == 'check_all_changes':
         sys.exit("File paths were not supplied as arguments to the application, "
                  "but exec_module was 'check_all_changes'. 'check_all_changes' requires files paths as arguments.")
 
-    exec_module(cfg=cfg)
-    return get_exit_status(cfg=cfg)
+    run_exec_module(cfg=cfg, exec_module=exec_module)
+    return get_exit_status()
 
 
 def run():
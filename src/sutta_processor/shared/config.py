@@ -8,6 +8,8 @@ from typing import List, Union
 import attr
 from ruamel import yaml
 
+from sutta_processor.shared.exclusion import ExclusionMatcher
+
 log = logging.getLogger(__name__)
 
 HERE = Path(__file__).parent
@@ -25,6 +27,15 @@ def create_dir(pth: Union[str, Path]) -> Path:
     return pth
 
 
+def get_file_path(pth: Union[str, Path]) -> Path:
+    """Like create_dir, but for a file that may not exist yet."""
+    if not pth or pth == NULL_PTH:
+        return NULL_PTH
+    pth = Path(expandvars(pth)).expanduser().resolve()
+    pth.parent.mkdir(exist_ok=True, parents=True)
+    return pth
+
+
 def touch_file(pth: Union[str, Path]) -> Path:
     pth = Path(expandvars(pth))
     pth.parent.mkdir(exist_ok=True, parents=True)
@@ -36,37 +47,54 @@ def touch_file(pth: Union[str, Path]) -> Path:
 
 @attr.s(frozen=True, auto_attribs=True)
 class ExcludeRepo:
-    headers_without_0: set = attr.ib(default=set())
-    get_comment_surplus_segments: set = attr.ib(default=set())
-    get_missing_segments: set = attr.ib(default=set())
-    get_unordered_segments: set = attr.ib(default=set())
-    check_uid_sequence_in_file: set = attr.ib(default=set())
-    get_unknown_variants: set = attr.ib(default=set())
-    get_wrong_uid_with_arrow: set = attr.ib(default=set())
-    get_duplicated_verses_next_to_each_other: set = attr.ib(default=set())
+    headers_without_0: ExclusionMatcher = attr.ib(factory=ExclusionMatcher)
+    get_comment_surplus_segments: ExclusionMatcher = attr.ib(factory=ExclusionMatcher)
+    get_missing_segments: ExclusionMatcher = attr.ib(factory=ExclusionMatcher)
+    get_unordered_segments: ExclusionMatcher = attr.ib(factory=ExclusionMatcher)
+    check_uid_sequence_in_file: ExclusionMatcher = attr.ib(factory=ExclusionMatcher)
+    get_unknown_variants: ExclusionMatcher = attr.ib(factory=ExclusionMatcher)
+    get_wrong_uid_with_arrow: ExclusionMatcher = attr.ib(factory=ExclusionMatcher)
+    get_duplicated_verses_next_to_each_other: ExclusionMatcher = attr.ib(
+        factory=ExclusionMatcher
+    )
+
+    _UNUSED = "[%s] There are '%s' of '%s' exclusions of '%s' that were not used: %s"
 
     @classmethod
     def from_dict(cls, data: dict) -> "ExcludeRepo":
         fields = [field.name for field in attr.fields(cls)]
-        kwargs = {k: set(v) for k, v in data.items() if k in fields}
+        kwargs = {k: ExclusionMatcher(entries=v or ()) for k, v in data.items() if k in fields}
         return cls(**kwargs)
 
     @classmethod
     def from_yaml(cls, f_pth: Union[str, Path] = None) -> "ExcludeRepo":
         """
-        Structure of yaml file:
+        Structure of yaml file, entries are ids, prefixes or ranges (see ExclusionMatcher):
         ```
         headers_without_0:
           - dhp416:5
-          - pli-tv-bi-pm:107.2
+          - pli-tv-bi-pm:107.*
+          - pli-tv-bi-pm:158.1..158.4
           ...
-          - pli-tv-bi-pm:158.4
         ```
         """
         with open(expandvars(f_pth)) as f:
             data = yaml.safe_load(stream=f) or {}
         return cls.from_dict(data=data)
 
+    def for_check(self, name: str) -> ExclusionMatcher:
+        """Exclusions of the check, it's marked as run for the unused entries report."""
+        return getattr(self, name).mark_checked()
+
+    def log_unused(self):
+        """Exclusions of the checks that ran, that didn't exclude anything."""
+        for field in attr.fields(self.__class__):
+            matcher: ExclusionMatcher = getattr(self, field.name)
+            unused = matcher.get_unused()
+            if unused:
+                name = self.__class__.__name__
+                log.warning(self._UNUSED, name, len(unused), len(matcher), field.name, unused)
+
 
 @attr.s(frozen=True, auto_attribs=True)
 class Config:
@@ -86,9 +114,22 @@ class Config:
     bilara_translation_path: Path = attr.ib(converter=create_dir, default=NULL_PTH)
     reference_root_path: Path = attr.ib(converter=create_dir, default=NULL_PTH)
     migration_differences_path: Path = attr.ib(converter=create_dir, default=NULL_PTH)
+    # Yuttadhammo corpus compiled by `build_yutta_corpus`. Html files are parsed when not set.
+    yutta_corpus_path: Path = attr.ib(converter=get_file_path, default=NULL_PTH)
+    # Parsed data files and check_migration results are kept there between runs.
+    # Caching is off when not set.
+    cache_dir: Path = attr.ib(converter=create_dir, default=NULL_PTH)
 
     debug_dir: Path = attr.ib(converter=create_dir, default=NULL_PTH)
     log_level: int = attr.ib(default=logging.INFO)
+    # Number of processes used to parse data files. 1 loads everything in the main process.
+    load_workers: int = attr.ib(default=1)
+    # Number of processes comparing suttas in check_migration.
+    migration_workers: int = attr.ib(default=1)
+    # Number of threads running the checks of run_all_checks.
+    check_workers: int = attr.ib(default=1)
+    # Peak memory in the run profile (debug_dir/run_profile.json), slows the run down.
+    profile_memory: bool = attr.ib(default=False)
 
     repo: "FileRepository" = attr.ib(init=False)
     check: "CheckService" = attr.ib(init=False)
@@ -99,8 +140,9 @@ class Config:
 
         from sutta_processor.application.check_service import CheckService
 
-        object.__setattr__(self, "check", CheckService(cfg=self))
+        # Repo goes first, check service takes the corpus scan from it
         object.__setattr__(self, "repo", FileRepository(cfg=self))
+        object.__setattr__(self, "check", CheckService(cfg=self))
         object.__setattr__(
             self, "exclude", ExcludeRepo.from_yaml(f_pth=self.exclude_filepath)
         )
@@ -132,6 +174,7 @@ class Config:
 class Logging:
     APP_LOG_FILENAME = "app.log"
     REPORT_LOG_FILENAME = "report.log"
+    FINDINGS_FILENAME = "findings.jsonl"
 
     FORMATTERS = {
         "verbose": {
@@ -142,6 +185,9 @@ class Logging:
         },
         "simple": {"format": "%(message)s",},
     }
+    FILTERS = {
+        "skip_findings": {"()": "sutta_processor.shared.findings.SkipFindings"},
+    }
 
     @classmethod
     def setup(cls, debug_dir: str = "", log_level=None):
@@ -157,12 +203,15 @@ class Logging:
             **cls.get_file_handlers(debug_dir=debug_dir, log_level=log_level),
         }
 
-        root_handler = ["console", "file", "file_report"] if debug_dir else ["console"]
+        root_handler = ["console", "error_records"]
+        if debug_dir:
+            root_handler += ["file", "file_report", "findings"]
 
         log_conf = {
             "version": 1,
             "disable_existing_loggers": False,
             "formatters": cls.FORMATTERS,
+            "filters": cls.FILTERS,
             "handlers": handlers,
             "loggers": {
                 "": {
@@ -189,6 +238,7 @@ class Logging:
                 "class": "logging.FileHandler",
                 "filename": str(debug_dir / cls.APP_LOG_FILENAME),
                 "formatter": "verbose",
+                "filters": ["skip_findings"],
                 "level": logging._levelToName.get(log_level, "TRACE"),
                 "mode": "w",
             },
@@ -196,9 +246,15 @@ class Logging:
                 "class": "logging.FileHandler",
                 "filename": str(debug_dir / cls.REPORT_LOG_FILENAME),
                 "formatter": "simple",
+                "filters": ["skip_findings"],
                 "level": "ERROR",
                 "mode": "w",
             },
+            "findings": {
+                "()": "sutta_processor.shared.findings.FindingsHandler",
+                "filename": str(debug_dir / cls.FINDINGS_FILENAME),
+                "level": "WARNING",
+            },
         }
         return handlers
 
@@ -208,8 +264,11 @@ class Logging:
             "level": logging._levelToName.get(log_level, "DEBUG"),
             "class": "logging.StreamHandler",
             "formatter": "simple",
+            "filters": ["skip_findings"],
         }
-        return {"console": console}
+        # Counted with or without the report.log, to give the exit status
+        error_records = {"()": "sutta_processor.shared.findings.ErrorRecordsCounter"}
+        return {"console": console, "error_records": error_records}
 
     @classmethod
     def add_trace_level(cls, trace_lvl=9):
@@ -0,0 +1,139 @@
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sutta_processor.shared.natural_key import NaturalKey, get_key_upper, get_natural_key
+
+# (start key, upper key, entry) of a range, the upper key is not in it
+Range = Tuple[NaturalKey, NaturalKey, str]
+
+
+class ExclusionMatcher:
+    """
+    Segments excluded from a check, compiled from its false positives entries:
+
+    - exact id: 'mn104:16.3'
+    - everything under a prefix in a text, ending with '*': 'pli-tv-bi-pm:107.*', 'dhp416:*'
+    - range in a text, both ends included with everything under the end:
+      'mn1:2.3..mn1:4' or 'mn1:2.3..4'
+
+    Exact ids are a set lookup. Natural keys are compared only for the texts that have
+    prefixes or ranges: prefixes by the key lengths they have, ranges by bisection of
+    the disjoint segments they are split into, each with the entry excluding it.
+    Entries that excluded something are kept, to report the ones a run didn't use. The
+    check marks when it ran, lookups alone don't say it: some checks look up only
+    the segments that failed.
+    """
+
+    PREFIX_END = "*"
+    RANGE_SEP = ".."
+
+    def __init__(self, entries: Iterable[str] = ()):
+        self.entries: Tuple[str, ...] = tuple(dict.fromkeys(str(e).strip() for e in entries))
+        self.exact: Set[str] = set()
+        self.prefixes: Dict[NaturalKey, str] = {}
+        self.prefix_lengths: Tuple[int, ...] = ()
+        # {text key: ([segment start key, ...], [entry or None, ...])} sorted by the key
+        self.ranges: Dict[str, Tuple[List[NaturalKey], List[Optional[str]]]] = {}
+        # Texts with prefixes or ranges
+        self.text_keys: Set[str] = set()
+        self.used: Set[str] = set()
+        self.is_checked = False
+        self._compile()
+
+    def _compile(self):
+        ranges = defaultdict(list)
+        for entry in self.entries:
+            if entry.endswith(self.PREFIX_END):
+                text_key, prefix = self.parse_prefix(entry=entry)
+                self.prefixes[get_natural_key(prefix)] = entry
+                self.text_keys.add(text_key)
+            elif self.RANGE_SEP in entry:
+                text_key, start, end = self.parse_range(entry=entry)
+                upper = get_key_upper(get_natural_key(end))
+                ranges[text_key].append((get_natural_key(start), upper, entry))
+                self.text_keys.add(text_key)
+            else:
+                self.exact.add(entry)
+        self.prefix_lengths = tuple(sorted({len(key) for key in self.prefixes}))
+        for text_key, text_ranges in ranges.items():
+            self.ranges[text_key] = self.get_segments(text_ranges=text_ranges)
+
+    @classmethod
+    def get_segments(
+        cls, text_ranges: List[Range]
+    ) -> Tuple[List[NaturalKey], List[Optional[str]]]:
+        """
+        Ranges split at all their bounds. Segment up to the next bound is excluded by
+        the covering range that starts last, None when no range covers it.
+        """
+        text_ranges = sorted(text_ranges, key=lambda item: item[0])
+        bounds = sorted({key for start, upper, _ in text_ranges for key in (start, upper)})
+        segment_entries = []
+        for bound in bounds:
+            entry = None
+            for start, upper, range_entry in text_ranges:
+                if start > bound:
+                    break
+                if bound < upper:
+                    entry = range_entry
+            segment_entries.append(entry)
+        return bounds, segment_entries
+
+    @classmethod
+    def parse_prefix(cls, entry: str) -> Tuple[str, str]:
+        """'pli-tv-bi-pm:107.*' -> ('pli-tv-bi-pm', 'pli-tv-bi-pm:107')"""
+        prefix = entry[: -len(cls.PREFIX_END)]
+        text_key, colon, _ = prefix.partition(":")
+        if not colon or cls.PREFIX_END in prefix or cls.RANGE_SEP in prefix:
+            raise ValueError(f"Wrong exclusion prefix: '{entry}', expected eg. 'mn1:2.*'")
+        return text_key, prefix.rstrip(".")
+
+    @classmethod
+    def parse_range(cls, entry: str) -> Tuple[str, str, str]:
+        """'mn1:2.3..4' -> ('mn1', 'mn1:2.3', 'mn1:4')"""
+        start, _, end = entry.partition(cls.RANGE_SEP)
+        text_key, colon, _ = start.partition(":")
+        if ":" not in end:
+            end = f"{text_key}:{end}"
+        if not colon or end.partition(":")[0] != text_key:
+            raise ValueError(f"Wrong exclusion range: '{entry}', expected eg. 'mn1:2.3..4'")
+        elif get_natural_key(start) > get_natural_key(end):
+            raise ValueError(f"Wrong exclusion range: '{entry}', start is after the end")
+        return text_key, start, end
+
+    def mark_checked(self) -> "ExclusionMatcher":
+        self.is_checked = True
+        return self
+
+    def __contains__(self, uid: str) -> bool:
+        entry = self.get_entry(uid=uid)
+        if entry is None:
+            return False
+        self.used.add(entry)
+        return True
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get_entry(self, uid: str) -> Optional[str]:
+        """Entry excluding the uid, None when it's not excluded."""
+        if uid in self.exact:
+            return str(uid)
+        text_key = uid.partition(":")[0]
+        if text_key not in self.text_keys:
+            return None
+        key = get_natural_key(uid)
+        for length in self.prefix_lengths:
+            entry = self.prefixes.get(key[:length])
+            if entry is not None:
+                return entry
+        bounds, segment_entries = self.ranges.get(text_key, ((), ()))
+        segment = bisect_right(bounds, key) - 1
+        return segment_entries[segment] if segment >= 0 else None
+
+    def get_unused(self) -> List[str]:
+        """Entries that didn't exclude anything, if the check was run."""
+        if not self.is_checked:
+            return []
+        return [entry for entry in self.entries if entry not in self.used]
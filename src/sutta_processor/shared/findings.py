@@ -0,0 +1,134 @@
+import json
+import logging
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+import attr
+
+log = logging.getLogger(__name__)
+
+ERROR = "error"
+WARNING = "warning"
+LEVELS = {ERROR: logging.ERROR, WARNING: logging.WARNING}
+
+
+@attr.s(frozen=True, auto_attribs=True, slots=True)
+class Finding:
+    check: str
+    message: str
+    uid: str = ""
+    file: str = ""
+    severity: str = ERROR
+
+
+class FindingsReport:
+    """
+    Typed findings of the checks, one for every wrong segment.
+
+    Findings are counted here and passed on as log records. FindingsHandler streams
+    them to findings.jsonl as they come, the text handlers skip them. Other error
+    records (loading, config, ...) are counted by ErrorRecordsCounter, they fail the
+    run the same as error findings.
+    """
+
+    _SUMMARY_INFO = "* [%s] Found '%s' errors and '%s' warnings: %s"
+
+    def __init__(self):
+        self.severities: Counter = Counter()
+        self.checks: Counter = Counter()
+        self.error_records = 0
+        self._lock = threading.Lock()
+
+    def add(
+        self,
+        check: str,
+        message: str,
+        uid: str = "",
+        file: Optional[Path] = None,
+        severity: str = ERROR,
+    ) -> Finding:
+        finding = Finding(
+            check=check,
+            message=message,
+            uid=uid or "",
+            file=str(file) if file else "",
+            severity=severity,
+        )
+        with self._lock:
+            self.severities[severity] += 1
+            self.checks[check] += 1
+        msg = "[%s] %s: '%s'"
+        log.log(LEVELS[severity], msg, check, message, uid, extra={"finding": finding})
+        return finding
+
+    @property
+    def errors(self) -> int:
+        return self.severities[ERROR]
+
+    @property
+    def is_failed(self) -> bool:
+        return bool(self.errors or self.error_records)
+
+    def count_error_record(self):
+        with self._lock:
+            self.error_records += 1
+
+    def log_summary(self):
+        with self._lock:
+            errors, warnings = self.severities[ERROR], self.severities[WARNING]
+            checks = dict(self.checks.most_common())
+        log.info(self._SUMMARY_INFO, self.__class__.__name__, errors, warnings, checks)
+
+
+findings = FindingsReport()
+
+
+class SkipFindings(logging.Filter):
+    """Findings are already in the report as the check messages."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return not hasattr(record, "finding")
+
+
+class ErrorRecordsCounter(logging.Handler):
+    """Counts the error records that are not findings."""
+
+    def __init__(self, level=logging.ERROR):
+        super().__init__(level=level)
+
+    def emit(self, record: logging.LogRecord):
+        if not hasattr(record, "finding"):
+            findings.count_error_record()
+
+
+class FindingsHandler(logging.Handler):
+    """Writes every finding as a json line when it's emitted, nothing is kept."""
+
+    def __init__(self, filename: str, level=logging.NOTSET):
+        super().__init__(level=level)
+        self.stream = open(filename, "w", encoding="utf-8")
+
+    def emit(self, record: logging.LogRecord):
+        finding = getattr(record, "finding", None)
+        if finding is None:
+            return
+        try:
+            line = json.dumps(attr.asdict(finding), ensure_ascii=False)
+            self.stream.write(f"{line}\n")
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        with self.lock:
+            if self.stream and not self.stream.closed:
+                self.stream.flush()
+
+    def close(self):
+        with self.lock:
+            try:
+                if self.stream and not self.stream.closed:
+                    self.stream.close()
+            finally:
+                super().close()
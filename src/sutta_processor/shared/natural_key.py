@@ -0,0 +1,49 @@
+import re
+
+NaturalKey = tuple
+
+split_numbers = re.compile(r"(\d+)").split
+
+
+def get_natural_key(txt: str) -> NaturalKey:
+    """
+    'pts-vp-pli3.1' -> ('pts-vp-pli', 3, '.', 1), 'mn1:2.3' -> ('mn', 1, ':', 2, '.', 3)
+
+    Text and numbers alternate, so keys always compare. Key of 'pts-vp-pli3' is a prefix
+    of the keys of 'pts-vp-pli3.1', 'pts-vp-pli3.2', but not of 'pts-vp-pli31'.
+    """
+    parts = split_numbers(txt)
+    parts[1::2] = map(int, parts[1::2])
+    if not parts[-1]:
+        parts.pop()
+    return tuple(parts)
+
+
+class _KeyMax:
+    """Part greater than any other part of a natural key."""
+
+    def __lt__(self, other) -> bool:
+        return False
+
+    def __le__(self, other) -> bool:
+        return other is self
+
+    def __gt__(self, other) -> bool:
+        return other is not self
+
+    def __ge__(self, other) -> bool:
+        return True
+
+    def __repr__(self) -> str:
+        return "KEY_MAX"
+
+
+KEY_MAX = _KeyMax()
+
+
+def get_key_upper(key: NaturalKey) -> NaturalKey:
+    """
+    Key after the given one and all the keys it's a prefix of, and before any other:
+    keys of 'mn1:2' and 'mn1:2.5' are below the upper of 'mn1:2', 'mn1:3' is above it.
+    """
+    return key + (KEY_MAX,)
@@ -0,0 +1,169 @@
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import attr
+
+log = logging.getLogger(__name__)
+
+
+def get_items_count(result) -> Optional[int]:
+    """Number of found items, for the results that are collections."""
+    if isinstance(result, (set, frozenset, list, dict)):
+        return len(result)
+    return None
+
+
+@attr.s(auto_attribs=True, slots=True)
+class Measurement:
+    # Set by the measured code, when it has something to count
+    items: Optional[int] = None
+    start_memory: int = 0
+    # Highest traced memory seen while it was running
+    peak_memory: int = 0
+
+
+@attr.s(auto_attribs=True, slots=True)
+class ProfileEntry:
+    kind: str
+    name: str
+    calls: int = 0
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    # Highest memory allocated during a single call, when tracing
+    peak_kib: Optional[float] = None
+    items: Optional[int] = None
+
+    def add(self, wall: float, cpu: float, peak: Optional[int], items: Optional[int]):
+        self.calls += 1
+        self.wall_s += wall
+        self.cpu_s += cpu
+        if peak is not None:
+            self.peak_kib = max(self.peak_kib or 0.0, peak / 1024)
+        if items is not None:
+            self.items = (self.items or 0) + items
+
+
+class RunProfiler:
+    """
+    Wall time, CPU time (of the calling thread by default), peak of the allocated memory and
+    item counts of the instrumented calls, summed up by kind and name, and saved as
+    json in the debug_dir.
+
+    Memory is measured only when tracemalloc is tracing (`profile_memory`), it slows
+    the run down. Peaks of calls running at the same time in other threads overlap.
+    Calls made in the worker processes are not in the profile.
+    """
+
+    FILENAME = "run_profile.json"
+    FORMAT = 1
+
+    def __init__(self):
+        self.entries: Dict[Tuple[str, str], ProfileEntry] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.started_at = time.time()
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+
+    def _get_stack(self) -> List[Measurement]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @classmethod
+    def _get_peak(cls, stack: List[Measurement]) -> int:
+        """Traced peak is reset for every measurement, outer ones keep the highest seen."""
+        _, peak = tracemalloc.get_traced_memory()
+        for measurement in stack:
+            measurement.peak_memory = max(measurement.peak_memory, peak)
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        return peak
+
+    @contextmanager
+    def measure(self, kind: str, name: str, all_threads=False) -> Iterator[Measurement]:
+        """
+        :param all_threads: CPU time of the whole process, for calls that spread the
+            work over threads
+        """
+        cpu_time = time.process_time if all_threads else time.thread_time
+        stack = self._get_stack()
+        is_tracing = tracemalloc.is_tracing()
+        measurement = Measurement()
+        if is_tracing:
+            self._get_peak(stack=stack)
+            measurement.start_memory = tracemalloc.get_traced_memory()[0]
+        stack.append(measurement)
+        start_wall, start_cpu = time.perf_counter(), cpu_time()
+        try:
+            yield measurement
+        finally:
+            wall = time.perf_counter() - start_wall
+            cpu = cpu_time() - start_cpu
+            peak = None
+            if is_tracing and tracemalloc.is_tracing():
+                self._get_peak(stack=stack)
+                peak = max(0, measurement.peak_memory - measurement.start_memory)
+            stack.pop()
+            with self._lock:
+                entry = self.entries.get((kind, name))
+                if entry is None:
+                    entry = self.entries[(kind, name)] = ProfileEntry(kind=kind, name=name)
+                entry.add(wall=wall, cpu=cpu, peak=peak, items=measurement.items)
+
+    def profiled(self, kind: str, name: str = None) -> Callable:
+        """Decorator measuring every call, results that are collections are counted."""
+
+        def decorator(fn: Callable) -> Callable:
+            entry_name = name or fn.__qualname__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.measure(kind=kind, name=entry_name) as measurement:
+                    result = fn(*args, **kwargs)
+                    measurement.items = get_items_count(result)
+                    return result
+
+            return wrapper
+
+        return decorator
+
+    def get_profile(self, **run_info) -> dict:
+        run = {
+            "format": self.FORMAT,
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started_at)),
+            "wall_s": time.perf_counter() - self.start_wall,
+            "cpu_s": time.process_time() - self.start_cpu,
+            "python": sys.version.split()[0],
+            "pid": os.getpid(),
+            "tracemalloc": tracemalloc.is_tracing(),
+            **run_info,
+        }
+        try:
+            import resource
+
+            # Kilobytes on Linux
+            run["max_rss_kib"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        except ImportError:
+            pass
+        with self._lock:
+            entries = [attr.asdict(entry) for entry in self.entries.values()]
+        return {"run": run, "entries": entries}
+
+    def save(self, f_pth: Path, **run_info):
+        with open(f_pth, "w") as f:
+            json.dump(self.get_profile(**run_info), f, indent=2, default=str)
+        log.info("* [%s] Saved run profile: '%s'", self.__class__.__name__, f_pth)
+
+
+profiler = RunProfiler()